@@ -0,0 +1,136 @@
+"""Headless batch mode: turns saved sessions into CSVs and PNGs without a display.
+
+Usage: py batch_render.py LOG_OR_DIR [...] [--out DIR] [--workers N] [--x-max 1600] [--y-max 306]
+                          [--no-csv] [--no-png] [--dpi 300] [--json results.json]
+
+Accepts raw .txt logs, exported .csv files and .tses session files (a
+directory means every such file inside it). Files are spread across a
+process pool; each worker renders with the same TouchRenderer the GUI uses,
+on an Agg canvas.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from event_store import EventStore, MAX_POINTERS
+from motion_parser import parse_lines
+from plot_renderer import TouchRenderer
+from session_file import load_session, EXTENSION as SESSION_EXT
+
+INPUT_EXTENSIONS = (".txt", ".csv", SESSION_EXT)
+
+
+def load_events(path, max_pointers=MAX_POINTERS):
+    """EventStore for a .txt / .csv / .tses file, the same way import_session reads it."""
+    lower = path.lower()
+    if lower.endswith(SESSION_EXT):
+        return load_session(path).events
+    if lower.endswith(".csv"):
+        return EventStore.from_frame(pd.read_csv(path), max_pointers=max_pointers)
+    with open(path, "rb") as f:
+        cols = parse_lines(f.read().splitlines(), max_pointers=max_pointers)
+    events = EventStore(max_pointers=max_pointers, capacity=len(cols['action']))
+    events.extend(cols)
+    return events
+
+
+def new_renderer():
+    # A fresh figure per file: a reused one would carry the previous file's pointer artists and legend
+    fig = Figure(figsize=(8, 5))
+    FigureCanvasAgg(fig)
+    return TouchRenderer(fig.add_subplot())
+
+
+def render_png(events, path, x_max, y_max, dpi=300):
+    renderer = new_renderer()
+    renderer.set_limits(x_max, y_max)
+    renderer.update(events, max(0, len(events) - 1))
+    renderer.fig.savefig(path, dpi=dpi)
+
+
+def process_file(path, out_dir, x_max, y_max, csv=True, png=True, dpi=300):
+    """Worker entry point. Returns a result dict; errors are reported, not raised."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    result = {"file": path, "events": 0, "parse_s": 0.0, "csv_s": 0.0, "png_s": 0.0, "error": None}
+    try:
+        t = time.perf_counter()
+        events = load_events(path)
+        result["events"] = len(events)
+        result["parse_s"] = time.perf_counter() - t
+
+        if csv and not path.lower().endswith(".csv"):
+            t = time.perf_counter()
+            events.to_frame().to_csv(os.path.join(out_dir, stem + ".csv"), index=False)
+            result["csv_s"] = time.perf_counter() - t
+        if png:
+            t = time.perf_counter()
+            render_png(events, os.path.join(out_dir, stem + ".png"), x_max, y_max, dpi)
+            result["png_s"] = time.perf_counter() - t
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def collect_inputs(paths):
+    files = []
+    for p in paths:
+        if os.path.isdir(p):
+            files += sorted(os.path.join(p, n) for n in os.listdir(p) if n.lower().endswith(INPUT_EXTENSIONS))
+        else:
+            files.append(p)
+    return files
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("inputs", nargs="+")
+    ap.add_argument("--out", default="batch_output")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--x-max", type=float, default=1600)
+    ap.add_argument("--y-max", type=float, default=306)
+    ap.add_argument("--dpi", type=int, default=300)
+    ap.add_argument("--no-csv", action="store_true")
+    ap.add_argument("--no-png", action="store_true")
+    ap.add_argument("--json", help="also write per-file results to this file")
+    args = ap.parse_args(argv)
+
+    files = collect_inputs(args.inputs)
+    if not files:
+        print("No input files found", file=sys.stderr)
+        return 2
+    os.makedirs(args.out, exist_ok=True)
+
+    start = time.perf_counter()
+    results = []
+    print(f"{'file':<40}{'events':>10}{'parse s':>9}{'csv s':>8}{'png s':>8}")
+    with ProcessPoolExecutor(max(1, min(args.workers, len(files)))) as pool:
+        futures = [pool.submit(process_file, f, args.out, args.x_max, args.y_max,
+                               not args.no_csv, not args.no_png, args.dpi) for f in files]
+        for fut in futures:
+            r = fut.result()
+            results.append(r)
+            name = os.path.basename(r["file"])[-40:]
+            if r["error"]:
+                print(f"{name:<40}  FAILED  {r['error']}")
+            else:
+                print(f"{name:<40}{r['events']:>10,}{r['parse_s']:>9.2f}{r['csv_s']:>8.2f}{r['png_s']:>8.2f}")
+
+    failed = sum(1 for r in results if r["error"])
+    total_events = sum(r["events"] for r in results)
+    print(f"{len(files)} files, {total_events:,} events, {failed} failed, "
+          f"{time.perf_counter() - start:.2f}s wall")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
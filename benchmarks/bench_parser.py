@@ -0,0 +1,83 @@
+"""Parse throughput: legacy per-line parse_line vs the batch parser in motion_parser.
+
+Usage: py benchmarks/bench_parser.py [--lines 2000000] [--legacy-lines 200000] [--log input_two_touch_new.txt]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import motion_parser
+from legacy_parser import parse_line
+
+
+def scaled_lines(path, count):
+    """Repeats the sample log until it has `count` lines (strings are shared, not copied)."""
+    with open(path, 'r') as f:
+        base = f.readlines()
+    reps = count // len(base) + 1
+    return (base * reps)[:count]
+
+
+def bench_legacy(lines):
+    start = time.perf_counter()
+    parsed = 0
+    for line in lines:
+        if parse_line(line):
+            parsed += 1
+    return time.perf_counter() - start, parsed
+
+
+def bench_batch(lines, batch=65536):
+    start = time.perf_counter()
+    parsed = 0
+    for i in range(0, len(lines), batch):
+        parsed += len(motion_parser.parse_lines(lines[i:i + batch])['action'])
+    return time.perf_counter() - start, parsed
+
+
+def bench_buffer(path, count, chunk_lines=65536):
+    """Raw bytes in, columns out: the path a chunked file reader would use."""
+    with open(path, 'rb') as f:
+        base = f.read().splitlines(keepends=True)
+    chunk = b''.join((base * (chunk_lines // len(base) + 1))[:chunk_lines])
+    start = time.perf_counter()
+    parsed = 0
+    for _ in range(count // chunk_lines):
+        parsed += len(motion_parser.parse_buffer(chunk)['action'])
+    return time.perf_counter() - start, parsed, (count // chunk_lines) * chunk_lines
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--log', default=os.path.join(ROOT, 'input_two_touch_new.txt'))
+    ap.add_argument('--lines', type=int, default=2_000_000)
+    ap.add_argument('--legacy-lines', type=int, default=200_000,
+                    help="the legacy parser is slow; it gets a smaller sample")
+    args = ap.parse_args()
+
+    results = []
+    lines = scaled_lines(args.log, args.legacy_lines)
+    secs, parsed = bench_legacy(lines)
+    results.append(("parse_line (legacy)", len(lines), parsed, secs))
+
+    lines = scaled_lines(args.log, args.lines)
+    secs, parsed = bench_batch(lines)
+    results.append(("parse_lines (batch)", len(lines), parsed, secs))
+
+    secs, parsed, total = bench_buffer(args.log, args.lines)
+    results.append(("parse_buffer (bytes)", total, parsed, secs))
+
+    print(f"{'parser':<24}{'lines':>12}{'events':>12}{'seconds':>10}{'lines/sec':>14}")
+    for name, n, parsed, secs in results:
+        print(f"{name:<24}{n:>12,}{parsed:>12,}{secs:>10.2f}{n / secs:>14,.0f}")
+    legacy_rate = results[0][1] / results[0][3]
+    for name, n, _, secs in results[1:]:
+        print(f"{name}: {n / secs / legacy_rate:.1f}x legacy")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Tails a file while fake_logcat.py writes it, and reports throughput, resets and idle CPU.
+
+Usage: py benchmarks/bench_tailer.py [--rate 50000] [--lines 500000] [--restart-every 0] [--idle 2]
+
+Runs the same FileTailer -> IngestPipeline path the live view uses (the
+queue is drained here instead of on a Tk tick). After the writer exits the
+tailer keeps following for --idle seconds so its idle CPU cost shows up.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ingest import IngestPipeline
+from tailer import FileTailer
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--log', default=os.path.join(ROOT, 'input_two_touch_new.txt'))
+    ap.add_argument('--rate', type=float, default=50000)
+    ap.add_argument('--lines', type=int, default=500_000)
+    ap.add_argument('--restart-every', type=int, default=0)
+    ap.add_argument('--idle', type=float, default=2.0)
+    args = ap.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'live_data.txt')
+    open(path, 'wb').close()
+    tailer = FileTailer(path, from_end=False)
+    pipeline = IngestPipeline(tailer).start()
+
+    writer = subprocess.Popen([sys.executable, os.path.join(ROOT, 'benchmarks', 'fake_logcat.py'),
+                               '--log', args.log, '--out', path, '--rate', str(args.rate),
+                               '--lines', str(args.lines), '--restart-every', str(args.restart_every)])
+    lines = events = resets = 0
+
+    def apply(batch):
+        nonlocal lines, events, resets
+        lines += len(batch.lines)
+        events += len(batch.columns['action'])
+        resets += sum(1 for l in batch.lines if l.startswith(b'--- LOG SOURCE'))
+
+    start = time.perf_counter()
+    while writer.poll() is None:
+        pipeline.drain(apply, budget_ms=50)
+        time.sleep(0.01)
+    write_secs = time.perf_counter() - start
+    # Let the tailer catch up with the last writes
+    while True:
+        time.sleep(0.3)
+        if not pipeline.drain(apply, budget_ms=1000) and pipeline.queue_depth == 0:
+            break
+    caught_up = time.perf_counter() - start
+
+    cpu = time.process_time()
+    time.sleep(args.idle)
+    pipeline.drain(apply)
+    idle_cpu = time.process_time() - cpu
+    tailer.stop()
+
+    print(f"lines written      {args.lines:>12,}")
+    print(f"lines received     {lines - resets:>12,}")
+    print(f"events parsed      {events:>12,}")
+    print(f"resets detected    {resets:>12,}")
+    print(f"writer seconds     {write_secs:>12.2f}")
+    print(f"caught up after    {caught_up:>12.2f}")
+    print(f"idle CPU ({args.idle:.0f}s)     {idle_cpu * 1000:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Simulates `adb logcat > live_data.txt`: replays a sample log at a fixed line rate.
+
+Usage: py benchmarks/fake_logcat.py [--out live_data.txt | --out -] [--rate 20000] [--lines 200000]
+                                    [--restart-every 50000] [--log input_two_touch_new.txt]
+
+--restart-every truncates the output file every N lines, the way controller.ps1
+does when it restarts the logcat stream. --out - writes to stdout for piping.
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--log', default=os.path.join(ROOT, 'input_two_touch_new.txt'))
+    ap.add_argument('--out', default=os.path.join(ROOT, 'live_data.txt'))
+    ap.add_argument('--rate', type=float, default=20000, help="lines per second")
+    ap.add_argument('--lines', type=int, default=200_000)
+    ap.add_argument('--restart-every', type=int, default=0)
+    ap.add_argument('--burst', type=int, default=200, help="lines per write")
+    args = ap.parse_args()
+
+    with open(args.log, 'rb') as f:
+        base = f.read().splitlines(keepends=True)
+
+    to_stdout = args.out == '-'
+    out = sys.stdout.buffer if to_stdout else open(args.out, 'wb')
+    start = time.perf_counter()
+    written = since_restart = 0
+    try:
+        while written < args.lines:
+            n = min(args.burst, args.lines - written)
+            if args.restart_every and not to_stdout and since_restart + n > args.restart_every:
+                n = args.restart_every - since_restart
+            out.write(b''.join(base[(written + i) % len(base)] for i in range(n)))
+            out.flush()
+            written += n
+            since_restart += n
+
+            if args.restart_every and not to_stdout and since_restart >= args.restart_every:
+                # Same effect as `adb logcat > live_data.txt` being started again
+                out.close()
+                out = open(args.out, 'wb')
+                since_restart = 0
+
+            ahead = written / args.rate - (time.perf_counter() - start)
+            if ahead > 0:
+                time.sleep(ahead)
+    finally:
+        if not to_stdout:
+            out.close()
+    secs = time.perf_counter() - start
+    print(f"wrote {written:,} lines in {secs:.2f}s ({written / secs:,.0f} lines/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Writes a synthetic MicroXrInputService MotionEvent log for benchmarks.
+
+Usage: py benchmarks/gen_motion_log.py --out synthetic.txt [--pointers 2] [--rate 120] [--duration 600]
+                                       [--lines 0] [--shapes swipe,circle,zigzag,tap,pinch] [--seed 0]
+
+Lines look exactly like `adb logcat -s MicroXrInputService:*` output: a
+threadtime prefix, then a MotionEvent with one id/x/y/toolType group per
+pointer. Gestures follow Android's pointer rules: the first finger is
+ACTION_DOWN, later ones ACTION_POINTER_DOWN(k), fingers lift in random order
+with ACTION_POINTER_UP(k) (the indices above k shift down), and the last one
+is ACTION_UP. Reports come at --rate Hz of device eventTime with a little
+jitter. The same --seed always gives the same log.
+"""
+import argparse
+import math
+import random
+import sys
+import time
+
+SHAPES = ("swipe", "circle", "zigzag", "tap", "pinch")
+MAX_POINTERS = 10
+
+_PREFIX = "{stamp} {pid:5d} {tid:5d} D MicroXrInputService: #inputFilter - filterInputEvent: MotionEvent {{ "
+_SUFFIX = (", buttonState=0, classification=NONE, metaState=0, flags=0x0, edgeFlags=0x0, pointerCount={n}, "
+           "historySize=0, eventTime={t}, downTime={down}, deviceId=4, source=0x300008, displayId=-1, eventId={eid} }}\n")
+
+
+class _Stamper:
+    """threadtime "MM-DD HH:MM:SS.mmm" stamps, formatting the seconds part once per second."""
+
+    def __init__(self):
+        self._sec = None
+        self._text = ""
+
+    def __call__(self, wall):
+        sec = int(wall)
+        if sec != self._sec:
+            self._sec, self._text = sec, time.strftime("%m-%d %H:%M:%S", time.localtime(sec))
+        return f"{self._text}.{int(wall * 1000) % 1000:03d}"
+
+
+class _Gesture:
+    """Where each finger of one gesture is at phase u in [0, 1]."""
+
+    def __init__(self, rng, shape, fingers, width, height):
+        self.shape = shape
+        self.width, self.height = width, height
+        self.cx = rng.uniform(width * 0.15, width * 0.85)
+        self.cy = rng.uniform(height * 0.25, height * 0.75)
+        spread = min(width, height) * 0.2
+        self.offsets = [(rng.uniform(-spread, spread), rng.uniform(-spread, spread)) for _ in range(fingers)]
+        angle = rng.uniform(0, 2 * math.pi)
+        length = rng.uniform(0.2, 0.8) * width
+        self.dx, self.dy = math.cos(angle) * length, math.sin(angle) * length * height / width
+        self.radius = rng.uniform(0.05, 0.25) * height
+        self.turns = rng.uniform(0.5, 2.0)
+        self.noise = rng
+
+    def position(self, finger, u):
+        ox, oy = self.offsets[finger]
+        if self.shape == "swipe":
+            x, y = self.cx + ox + self.dx * (u - 0.5), self.cy + oy + self.dy * (u - 0.5)
+        elif self.shape == "circle":
+            a = 2 * math.pi * self.turns * u + finger
+            x, y = self.cx + ox + self.radius * math.cos(a), self.cy + oy + self.radius * math.sin(a)
+        elif self.shape == "zigzag":
+            x = self.cx + ox + self.dx * (u - 0.5)
+            y = self.cy + oy + self.radius * (2 * abs((u * 4 * self.turns) % 2 - 1) - 1)
+        elif self.shape == "pinch":
+            scale = 0.3 + 1.4 * u
+            x, y = self.cx + ox * scale, self.cy + oy * scale
+        else: # tap: a finger that barely moves
+            x, y = self.cx + ox, self.cy + oy
+        x += self.noise.gauss(0, 0.5)
+        y += self.noise.gauss(0, 0.5)
+        return round(min(max(x, 0.0), self.width - 1)), round(min(max(y, 0.0), self.height - 1))
+
+
+def generate(pointers=2, rate=120.0, duration=None, lines=0, shapes=SHAPES, width=1600, height=306, seed=0,
+             start_uptime=280_000, start_wall=None):
+    """Yields log lines (str) until `duration` seconds of device time or `lines` lines, whichever comes first.
+
+    With neither set it stops after 600 s of device time.
+    """
+    if not 1 <= pointers <= MAX_POINTERS:
+        raise ValueError(f"pointers must be 1..{MAX_POINTERS}")
+    rng = random.Random(seed)
+    stamp = _Stamper()
+    start_wall = time.time() if start_wall is None else start_wall
+    period = 1000.0 / rate
+    t = float(start_uptime)
+    if duration is None:
+        duration = float("inf") if lines else 600.0
+    end = start_uptime + duration * 1000.0
+    written = 0
+    pid, tid = 1203, 1958
+
+    def emit(action, active, down):
+        ptrs = ", ".join(f"id[{i}]={fid}, x[{i}]={x}.0, y[{i}]={y}.0, toolType[{i}]=TOOL_TYPE_FINGER"
+                         for i, (fid, (x, y)) in enumerate(active))
+        wall = start_wall + (t - start_uptime) / 1000.0 + rng.uniform(0.0005, 0.003) # logcat lags the event a bit
+        return (_PREFIX.format(stamp=stamp(wall), pid=pid, tid=tid) + f"action={action}, actionButton=0, " + ptrs
+                + _SUFFIX.format(n=len(active), t=int(t), down=down, eid=rng.randrange(1, 2**31)))
+
+    while t < end and (not lines or written < lines):
+        shape = rng.choice(shapes)
+        fingers = rng.randint(1, pointers)
+        if shape == "pinch":
+            fingers = max(fingers, min(2, pointers))
+        span = rng.uniform(40, 120) if shape == "tap" else rng.uniform(150, 1500)
+        samples = max(fingers + 1, int(span / period))
+        g = _Gesture(rng, shape, fingers, width, height)
+
+        # Fingers land one report apart and lift in random order over the last reports
+        lift_order = rng.sample(range(fingers), fingers)
+        down = int(t)
+        active = [] # (finger id, position), in pointer-index order
+        for k in range(samples + fingers):
+            u = min(1.0, k / samples)
+            active = [(fid, g.position(fid, u)) for fid, _ in active]
+            lifted = None
+            if k < fingers:
+                active.append((k, g.position(k, u)))
+                action = "ACTION_DOWN" if k == 0 else f"ACTION_POINTER_DOWN({k})"
+            elif k >= samples:
+                fid = lift_order.pop(0)
+                lifted = next(i for i, (f, _) in enumerate(active) if f == fid)
+                action = "ACTION_UP" if len(active) == 1 else f"ACTION_POINTER_UP({lifted})"
+            else:
+                action = "ACTION_MOVE"
+            yield emit(action, active, down)
+            written += 1
+            if lines and written >= lines:
+                return
+            if lifted is not None:
+                del active[lifted] # The pointers above it shift down one index
+            t += period + rng.gauss(0, period * 0.05)
+        t += rng.uniform(100, 800) # Pause between gestures
+
+
+def write_log(path, **kwargs):
+    """Writes generate(**kwargs) to `path` ('-' for stdout) and returns the number of lines."""
+    out = sys.stdout if path == '-' else open(path, 'w', newline='\n')
+    count = 0
+    buf = []
+    try:
+        for line in generate(**kwargs):
+            buf.append(line)
+            if len(buf) >= 8192:
+                out.write("".join(buf))
+                count += len(buf)
+                buf = []
+        out.write("".join(buf))
+        count += len(buf)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return count
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--out', default='-')
+    ap.add_argument('--pointers', type=int, default=2)
+    ap.add_argument('--rate', type=float, default=120.0, help="reports per second")
+    ap.add_argument('--duration', type=float, default=None, help="seconds of device time (default 600 unless --lines is set)")
+    ap.add_argument('--lines', type=int, default=0, help="stop after this many lines (0 = no limit)")
+    ap.add_argument('--shapes', default=",".join(SHAPES))
+    ap.add_argument('--width', type=int, default=1600)
+    ap.add_argument('--height', type=int, default=306)
+    ap.add_argument('--seed', type=int, default=0)
+    args = ap.parse_args()
+
+    shapes = tuple(s for s in args.shapes.split(",") if s)
+    unknown = set(shapes) - set(SHAPES)
+    if unknown:
+        ap.error(f"unknown shape(s): {', '.join(sorted(unknown))}")
+    start = time.perf_counter()
+    n = write_log(args.out, pointers=args.pointers, rate=args.rate, duration=args.duration, lines=args.lines,
+                  shapes=shapes, width=args.width, height=args.height, seed=args.seed)
+    print(f"wrote {n:,} lines in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"""The original per-line MotionEvent parser, kept only as the baseline for bench_parser."""
+import re
+import time
+
+
+def parse_line(line, order=0):
+    match = re.search(r'MotionEvent \{ (.*) \}', line)
+    if not match: return None
+    kv = re.findall(r'(\w+)(?:\[(\d+)\])?=([^, ]+)', match.group(1))
+    row = { (f"{k}_{i}" if i else k): (float(v) if '.' in v else int(v) if v.isdigit() else v) for k, i, v in kv }
+    row['timestamp_order'] = order
+    row['pc_time'] = time.time() # Capture PC arrival time for playback deltas
+    return row
@@ -0,0 +1,339 @@
+"""Benchmark suite over a synthetic log: parse, ingest-to-pixel latency, plot update, CSV/session I/O, memory.
+
+Usage: py benchmarks/run_benchmarks.py [--lines 1000000] [--pointers 2] [--rate 120] [--seed 0]
+                                       [--sizes 10000,100000,1000000] [--log existing.txt]
+                                       [--out results.json] [--compare baseline.json] [--quick]
+
+Generates a reproducible log with gen_motion_log.py (or uses --log), runs
+every benchmark on it and writes a JSON file with the results plus enough
+machine/version info to tell runs apart (default benchmarks/results/).
+--compare prints each number next to the same number from an earlier run.
+
+  parse         parse_buffer over the whole log in 4 MB line-aligned chunks
+  ingest        lines paced through IngestPipeline at --live-rate; latency is
+                from the reader handing a chunk over to the Agg draw that shows it
+  plot_update   RenderWorker frames at each history size, drawn the way the app
+                draws them: a cold full render, live appends of 100 events, and
+                random scrubs (seeks, once the worker has its keyframes)
+  io            CSV export/import and .tses save/load of the whole session
+  memory        tracemalloc peak while parsing into an EventStore, and max RSS
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+import pandas as pd
+
+import gen_motion_log
+import motion_parser
+from event_store import EventStore, MAX_POINTERS
+from ingest import IngestPipeline, FRAME_BUDGET_MS, FRAME_INTERVAL_MS
+from log_view import LineStore
+from render_worker import FrameRequest, RenderWorker
+from session_file import save_session, load_session
+from spatial_index import SpatialIndex
+from stroke_index import StrokeIndex
+from timing_stats import TimingStats
+
+PARSE_CHUNK = 4 << 20
+# Frames as the GUI asks for them: its default X/Y MAX (the generated log's range) at its figure size
+PLOT_LIMITS = (1600, 306)
+PLOT_SIZE = (800, 500)
+PLOT_DPI = 100
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+
+def _chunks(buf, size=PARSE_CHUNK):
+    """Line-aligned slices of `buf` of about `size` bytes."""
+    start = 0
+    while start < len(buf):
+        end = buf.rfind(b'\n', start, start + size) + 1 if start + size < len(buf) else len(buf)
+        if end <= start:
+            end = min(len(buf), start + size)
+        yield buf[start:end]
+        start = end
+
+
+def _percentiles(values, qs=(50, 95, 99)):
+    if not len(values):
+        return {f"p{q}": None for q in qs}
+    p = np.percentile(values, qs)
+    return {f"p{q}": round(float(v), 3) for q, v in zip(qs, p)}
+
+
+def _draw(worker, store, limit, seek=False):
+    """One frame through the worker's own render path (synchronously); ms it took."""
+    t = time.perf_counter()
+    worker._render(FrameRequest(store, limit, None, None, None, PLOT_LIMITS, PLOT_SIZE, PLOT_DPI, seek))
+    return (time.perf_counter() - t) * 1000.0
+
+
+def _store_from(columns, n, max_pointers):
+    store = EventStore(max_pointers=max_pointers, capacity=n)
+    store.extend({k: v[..., :n] for k, v in columns.items()})
+    return store
+
+
+# --- BENCHMARKS ---
+def bench_parse(buf, max_pointers):
+    start = time.perf_counter()
+    events = 0
+    for chunk in _chunks(buf):
+        events += len(motion_parser.parse_buffer(chunk, max_pointers=max_pointers)['action'])
+    secs = time.perf_counter() - start
+    lines = buf.count(b'\n')
+    return {"lines": lines, "events": events, "seconds": round(secs, 4),
+            "lines_per_s": round(lines / secs), "mb_per_s": round(len(buf) / secs / 1e6, 1)}
+
+
+def bench_ingest(buf, max_pointers, rate, seconds, chunk_lines=64):
+    """Feeds lines at `rate` per second for `seconds` and measures chunk -> pixels latency.
+
+    The main loop does what MotionVisualizer.process_queue does each tick:
+    drain within the frame budget, sync the indexes, update and draw.
+    """
+    lines = buf.splitlines(keepends=True)[:int(rate * seconds)]
+    handed = [] # (perf_counter when the reader got the chunk, lines up to and including it)
+
+    def source():
+        t0 = time.perf_counter()
+        sent = 0
+        while sent < len(lines):
+            part = lines[sent:sent + chunk_lines]
+            ahead = (sent + len(part)) / rate - (time.perf_counter() - t0)
+            if ahead > 0:
+                time.sleep(ahead)
+            sent += len(part)
+            handed.append((time.perf_counter(), sent))
+            yield b''.join(part)
+
+    events = EventStore(max_pointers=max_pointers)
+    spatial, strokes, timing = SpatialIndex(), StrokeIndex(), TimingStats()
+    worker = RenderWorker()
+    applied = [0]
+
+    def apply(batch):
+        applied[0] += len(batch.lines)
+        if len(batch.columns['action']):
+            events.extend(batch.columns)
+
+    pipeline = IngestPipeline(source(), max_pointers=max_pointers).start()
+    latencies, frames = [], []
+    shown = 0
+    deadline = time.perf_counter() + seconds + 10
+    while applied[0] < len(lines) and time.perf_counter() < deadline:
+        tick = time.perf_counter()
+        before = len(events)
+        pipeline.drain(apply, FRAME_BUDGET_MS)
+        if len(events) > before:
+            spatial.sync(events)
+            strokes.sync(events)
+            timing.sync(events)
+            _draw(worker, events, len(events) - 1)
+        drawn = time.perf_counter()
+        while shown < len(handed) and handed[shown][1] <= applied[0]:
+            latencies.append((drawn - handed[shown][0]) * 1000.0)
+            shown += 1
+        frames.append((drawn - tick) * 1000.0)
+        pipeline.end_frame(frames[-1], FRAME_INTERVAL_MS)
+        rest = FRAME_INTERVAL_MS / 1000.0 - (time.perf_counter() - tick)
+        if rest > 0:
+            time.sleep(rest)
+    return {"rate_lines_per_s": rate, "lines": applied[0], "events": len(events),
+            "latency_ms": _percentiles(latencies), "frame_ms": _percentiles(frames),
+            "dropped_frames": pipeline.stats.dropped_frames}
+
+
+def bench_plot_update(columns, max_pointers, sizes, repeats=20, append=100):
+    total = len(columns['action'])
+    rng = random.Random(0)
+    out = {}
+    for n in sizes:
+        if n + append * repeats > total:
+            continue
+        store = _store_from(columns, n, max_pointers)
+        worker = RenderWorker()
+        cold = _draw(worker, store, n - 1)
+
+        grow, scrub = [], []
+        for i in range(repeats):
+            a = n + i * append
+            store.extend({k: v[..., a:a + append] for k, v in columns.items()})
+            grow.append(_draw(worker, store, len(store) - 1))
+        # The first seek starts a scrub; the worker renders the keyframes while the user holds the slider
+        _draw(worker, store, rng.randrange(len(store)), seek=True)
+        while worker.keyframes.missing() is not None:
+            worker._render_keyframe(worker.keyframes.missing())
+        for _ in range(repeats):
+            scrub.append(_draw(worker, store, rng.randrange(len(store)), seek=True))
+        out[str(n)] = {"cold_ms": round(cold, 2), "append_ms": _percentiles(grow, (50, 99)),
+                       "scrub_ms": _percentiles(scrub, (50, 99)), "lod": worker.renderer.lod_active}
+    return out
+
+
+def bench_io(buf, columns, max_pointers, tmp):
+    # The session as the app would hold it: events pointing at the raw log lines they came from
+    store = _store_from(dict(columns, log_line=columns['source_line']), len(columns['action']), max_pointers)
+    lines = LineStore()
+    lines.extend(buf.splitlines())
+    line_buf, line_offsets = lines.raw()
+    csv_path = os.path.join(tmp, "session.csv")
+    tses_path = os.path.join(tmp, "session.tses")
+    result = {"events": len(store), "lines": len(lines)}
+
+    t = time.perf_counter()
+    store.to_frame().to_csv(csv_path, index=False)
+    result["csv_export_s"] = round(time.perf_counter() - t, 4)
+    t = time.perf_counter()
+    loaded = EventStore.from_frame(pd.read_csv(csv_path), max_pointers=max_pointers)
+    result["csv_import_s"] = round(time.perf_counter() - t, 4)
+    assert len(loaded) == len(store)
+    result["csv_mb"] = round(os.path.getsize(csv_path) / 1e6, 1)
+
+    t = time.perf_counter()
+    save_session(tses_path, store, line_buf, line_offsets)
+    result["tses_save_s"] = round(time.perf_counter() - t, 4)
+    t = time.perf_counter()
+    session = load_session(tses_path)
+    result["tses_load_s"] = round(time.perf_counter() - t, 4)
+    assert len(session.events) == len(store) and len(session.line_offsets) == len(line_offsets)
+    result["tses_mb"] = round(os.path.getsize(tses_path) / 1e6, 1)
+    del session
+    return result
+
+
+def bench_memory(buf, max_pointers):
+    tracemalloc.start()
+    store = EventStore(max_pointers=max_pointers)
+    for chunk in _chunks(buf):
+        store.extend(motion_parser.parse_buffer(chunk, max_pointers=max_pointers))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result = {"events": len(store), "parse_peak_mb": round(peak / 1e6, 1),
+              "bytes_per_event": round(peak / max(1, len(store)))}
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        result["max_rss_mb"] = round(rss / (1e6 if sys.platform == "darwin" else 1e3), 1)
+    except ImportError: # Windows
+        pass
+    return result
+
+
+# --- RESULTS ---
+def machine_info():
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                             text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        rev = None
+    return {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "git": rev, "python": platform.python_version(),
+            "numpy": np.__version__, "pandas": pd.__version__, "matplotlib": matplotlib.__version__,
+            "platform": platform.platform(), "processor": platform.processor(), "cpus": os.cpu_count()}
+
+
+def _flatten(d, prefix=""):
+    for k, v in d.items():
+        key = f"{prefix}.{k}" if prefix else k
+        if isinstance(v, dict):
+            yield from _flatten(v, key)
+        elif isinstance(v, (int, float)) and not isinstance(v, bool):
+            yield key, v
+
+
+def compare(current, baseline):
+    base = dict(_flatten(baseline["results"]))
+    print(f"\n{'metric':<44}{'baseline':>14}{'current':>14}{'change':>10}")
+    for key, value in _flatten(current["results"]):
+        old = base.get(key)
+        if old is None:
+            continue
+        change = f"{(value - old) / old * 100:+.1f}%" if old else ""
+        print(f"{key:<44}{old:>14,.4g}{value:>14,.4g}{change:>10}")
+
+
+def run_all(args, sizes, tmp):
+    """Runs every benchmark; generated files go in `tmp`. Returns (params, results)."""
+    log = args.log
+    params = {"lines": args.lines, "pointers": args.pointers, "rate": args.rate, "seed": args.seed,
+              "sizes": sizes, "live_rate": args.live_rate, "live_seconds": args.live_seconds, "log": log}
+    if log is None:
+        log = os.path.join(tmp, "synthetic.txt")
+        t = time.perf_counter()
+        gen_motion_log.write_log(log, pointers=args.pointers, rate=args.rate, lines=args.lines, seed=args.seed)
+        print(f"generated {args.lines:,} lines in {time.perf_counter() - t:.1f}s", file=sys.stderr)
+    with open(log, 'rb') as f:
+        buf = f.read()
+
+    max_pointers = MAX_POINTERS # Same capacity as the app; --pointers only shapes the generated log
+    results = {}
+    # Memory first, so max RSS isn't inflated by the other benchmarks
+    print("memory...", file=sys.stderr)
+    results["memory"] = bench_memory(buf, max_pointers)
+    print("parse...", file=sys.stderr)
+    results["parse"] = bench_parse(buf, max_pointers)
+    columns = motion_parser.parse_buffer(buf, max_pointers=max_pointers)
+    print("ingest...", file=sys.stderr)
+    results["ingest"] = bench_ingest(buf, max_pointers, args.live_rate, args.live_seconds)
+    print("plot_update...", file=sys.stderr)
+    results["plot_update"] = bench_plot_update(columns, max_pointers, sizes)
+    print("io...", file=sys.stderr)
+    results["io"] = bench_io(buf, columns, max_pointers, tmp)
+    return params, results
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--log', help="benchmark this log instead of generating one")
+    ap.add_argument('--lines', type=int, default=1_000_000)
+    ap.add_argument('--pointers', type=int, default=2)
+    ap.add_argument('--rate', type=float, default=120.0, help="generated report rate (Hz)")
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--sizes', default="10000,100000,1000000", help="history sizes for plot_update")
+    ap.add_argument('--live-rate', type=float, default=20000, help="lines/s fed through the ingest benchmark")
+    ap.add_argument('--live-seconds', type=float, default=5.0)
+    ap.add_argument('--out', help="results file (default benchmarks/results/<timestamp>.json)")
+    ap.add_argument('--compare', help="earlier results file to compare against")
+    ap.add_argument('--quick', action='store_true', help="100k lines, small sizes, 2 s of live ingest")
+    args = ap.parse_args()
+    if args.quick:
+        args.lines, args.sizes, args.live_seconds = 100_000, "1000,10000,50000", 2.0
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    tmp = tempfile.mkdtemp(prefix="touchviz-bench-")
+    try:
+        params, results = run_all(args, sizes, tmp)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    report = {"meta": machine_info(), "params": params, "results": results}
+    out = args.out or os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for key, value in _flatten(results):
+        print(f"{key:<44}{value:>14,.4g}")
+    print(f"\nresults written to {out}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import os
+import queue
+from concurrent.futures import ProcessPoolExecutor
+
+from event_store import MAX_POINTERS
+from ingest import IngestPipeline, IngestBatch
+from motion_parser import parse_lines
+
+# Files at least this big are imported in the background through a process pool
+MIN_BYTES = 8 << 20
+CHUNK_BYTES = 4 << 20
+
+
+def split_ranges(path, chunk_bytes=CHUNK_BYTES):
+    """Byte ranges [(start, end), ...] covering the file, each ending just after a newline."""
+    size = os.path.getsize(path)
+    ranges = []
+    with open(path, 'rb') as f:
+        start = 0
+        while start < size:
+            end = start + chunk_bytes
+            if end < size:
+                f.seek(end)
+                f.readline() # Finish the line the cut landed in
+                end = f.tell()
+            end = min(end, size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def read_range(path, start, end):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return f.read(end - start)
+
+
+def parse_range(path, start, end, max_pointers=MAX_POINTERS):
+    """Worker side: parse one range. Only the columns travel back; the caller re-reads the text."""
+    return parse_lines(read_range(path, start, end).splitlines(), max_pointers=max_pointers)
+
+
+class ParallelImport(IngestPipeline):
+    """Imports a large raw log by parsing newline-aligned ranges in a process pool.
+
+    Results are queued strictly in file order, so draining it with the same
+    apply() as live data keeps timestamp_order identical to a sequential
+    parse. Only `window` ranges are in flight and the queue is bounded, so
+    memory stays flat however big the file is.
+    """
+
+    def __init__(self, path, max_pointers=MAX_POINTERS, workers=None, chunk_bytes=CHUNK_BYTES, cache=None):
+        super().__init__(None, max_pointers=max_pointers)
+        self.path = path
+        self.cache = cache  # SessionCache looked up (hash of the whole file) before parsing
+        self.cached = None  # Session from the cache on a hit; nothing is queued then
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.chunk_bytes = chunk_bytes
+        self.queue = queue.Queue(maxsize=8)
+        self.total_bytes = os.path.getsize(path)
+        self.done_bytes = 0
+        self.finished = False
+        self.cancelled = False
+        self.error = None
+
+    @property
+    def progress(self):
+        return self.done_bytes / self.total_bytes if self.total_bytes else 1.0
+
+    def _run(self):
+        try:
+            if self.cache is not None:
+                try:
+                    self.cached = self.cache.get(self.path)
+                except OSError:
+                    pass
+                if self.cached is not None:
+                    self.done_bytes = self.total_bytes
+                    return
+            ranges = split_ranges(self.path, self.chunk_bytes)
+            window = self.workers * 2
+            with ProcessPoolExecutor(self.workers) as pool:
+                futures = {}
+                for i, (start, end) in enumerate(ranges):
+                    # Keep the pool busy ahead of the range we're waiting on
+                    for j in range(i, min(i + window, len(ranges))):
+                        if j not in futures:
+                            futures[j] = pool.submit(parse_range, self.path, *ranges[j], self.max_pointers)
+                    columns = futures.pop(i).result()
+                    if self._cancel.is_set():
+                        break
+                    lines = read_range(self.path, start, end).splitlines()
+                    if not self._put(IngestBatch(lines, columns)):
+                        break
+                    self.done_bytes = end
+                for f in futures.values():
+                    f.cancel()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.cancelled = self._cancel.is_set()
+            self.finished = True
@@ -0,0 +1,159 @@
+import math
+
+import numpy as np
+
+from event_store import mask_pointers
+from plot_renderer import KIND_CODES, marker_kinds
+
+# Above this many cells per layer, a cell covers several sensor units (keeps a mistyped X MAX from eating RAM)
+MAX_CELLS = 4_000_000
+
+KIND_NAMES = {code: name for name, code in KIND_CODES.items()}
+
+
+class CoverageMap:
+    """Where touches landed: 2D hit histograms at sensor resolution, kept up to date incrementally.
+
+    One uint32 layer per (pointer, action kind) with one cell per sensor
+    unit across [0, X MAX) x [0, Y MAX), allocated the first time that
+    pointer/kind shows up. sync() only bins events appended since the last
+    call, so a soak test costs O(new events) per tick however long it runs.
+    Changing the size (resize) or swapping the store rebuilds from scratch,
+    except for the tail a RetentionPolicy leaves behind (higher base, same
+    capture), which carries on so the map still covers the whole capture.
+
+    `view` is the sum of the selected layers, maintained alongside them;
+    `version` changes whenever it does, so a renderer only re-uploads the
+    image when something new landed.
+    """
+
+    def __init__(self):
+        self.shape = None    # (rows, cols) of each layer, None until resize()
+        self.cell = 1        # Sensor units per cell
+        self.selection = (None, None)  # (pointer, kind); None = all
+        self.version = 0
+        self.clear()
+
+    def clear(self):
+        self._store = None
+        self._indexed = 0
+        self.layers = {}     # (pointer, kind) -> (rows, cols) uint32
+        self.outside = 0     # Samples beyond the limits
+        self._reset_view()
+
+    def _reset_view(self):
+        self.view = np.zeros(self.shape, dtype=np.uint32) if self.shape else None
+        self.peak = 0
+        self.version += 1
+
+    def resize(self, x_max, y_max):
+        """Sizes the histogram from the axis limits; a change drops the counts (the next sync rebuilds)."""
+        cell = max(1, math.ceil(math.sqrt(math.ceil(x_max) * math.ceil(y_max) / MAX_CELLS)))
+        shape = (max(1, math.ceil(y_max / cell)), max(1, math.ceil(x_max / cell)))
+        if shape == self.shape and cell == self.cell:
+            return False
+        self.shape, self.cell = shape, cell
+        self.clear()
+        return True
+
+    @property
+    def extent(self):
+        rows, cols = self.shape
+        return (0, cols * self.cell, 0, rows * self.cell)
+
+    def _layer(self, key):
+        if key not in self.layers:
+            self.layers[key] = np.zeros(self.shape, dtype=np.uint32)
+        return self.layers[key]
+
+    def _selected(self, pointer, kind):
+        sp, sk = self.selection
+        return (sp is None or sp == pointer) and (sk is None or sk == kind)
+
+    def continues(self, store):
+        """True if `store` holds the events after those already binned: the same store, or its spilled tail."""
+        old = self._store
+        if old is None or not store.base <= self._indexed <= store.base + len(store):
+            return False
+        return store is old or store.base > old.base
+
+    def sync(self, store):
+        if self.shape is None:
+            return
+        if not self.continues(store):
+            self.clear()
+            self._indexed = store.base # Spilled events before it only count if their segments were synced first
+        self._store = store
+        start, stop = self._indexed - store.base, len(store)
+        if stop <= start:
+            return
+        rows, cols = self.shape
+        action = store.column('action', stop)[start:]
+        index = store.column('action_index', stop)[start:]
+        mask = store.column('pointer_mask', stop)[start:]
+        touched = False
+        for p in mask_pointers(np.bitwise_or.reduce(mask)):
+            present = (mask >> p) & 1 == 1
+            ix = np.floor(store.x(p, stop)[start:][present] / self.cell)
+            iy = np.floor(store.y(p, stop)[start:][present] / self.cell)
+            inside = (ix >= 0) & (ix < cols) & (iy >= 0) & (iy < rows)
+            self.outside += int(len(inside) - np.count_nonzero(inside))
+            flat = iy[inside].astype(np.int64) * cols + ix[inside].astype(np.int64)
+            kinds = marker_kinds(action, index, p)[present][inside]
+            for k in KIND_NAMES:
+                hits = flat[kinds == k]
+                if not len(hits):
+                    continue
+                # Sort-and-count is O(hits log hits); a bincount would cost the whole grid every batch
+                cells, counts = np.unique(hits, return_counts=True)
+                self._layer((p, k)).reshape(-1)[cells] += counts.astype(np.uint32)
+                if self._selected(p, k):
+                    view = self.view.reshape(-1)
+                    view[cells] += counts.astype(np.uint32)
+                    self.peak = max(self.peak, int(view[cells].max()))
+                    touched = True
+        self._indexed = store.base + stop
+        if touched:
+            self.version += 1
+
+    def select(self, pointer=None, kind=None):
+        """Shows one pointer and/or one action kind (KIND_* code) in `view`; None means all."""
+        if (pointer, kind) == self.selection:
+            return
+        self.selection = (pointer, kind)
+        if self.shape is not None:
+            self._rebuild_view()
+
+    def _rebuild_view(self):
+        self._reset_view()
+        for (p, k), layer in self.layers.items():
+            if self._selected(p, k):
+                self.view += layer
+        self.peak = int(self.view.max())
+
+    # --- EXPORT ---
+    def arrays(self):
+        """Layers by name (coverage_p<pointer>_<kind>), for save_session / np.savez."""
+        return {f"coverage_p{p}_{KIND_NAMES[k]}": layer for (p, k), layer in sorted(self.layers.items())}
+
+    def meta(self):
+        if self.shape is None:
+            return None
+        return {"events": self._indexed, "cell": self.cell, "shape": list(self.shape), "outside": self.outside}
+
+    def restore(self, arrays, meta, store):
+        """Takes over layers saved with a session instead of re-binning it. False if they don't match the store."""
+        if not meta or meta.get("events") != store.base + len(store):
+            return False
+        self.shape, self.cell = tuple(meta["shape"]), meta["cell"]
+        self.clear()
+        for name, layer in arrays.items():
+            if not name.startswith("coverage_p"):
+                continue
+            p, kind = name[len("coverage_p"):].split("_", 1)
+            self.layers[(int(p), KIND_CODES[kind])] = layer
+        self._store = store
+        self._indexed = store.base + len(store)
+        self.outside = meta.get("outside", 0)
+        self._rebuild_view()
+        return True
@@ -0,0 +1,444 @@
+import numpy as np
+import pandas as pd
+
+# --- ANDROID ACTION CODES ---
+# Same numbering as android.view.MotionEvent so codes can be compared against
+# device-side docs. ACTION_POINTER_DOWN(n) / ACTION_POINTER_UP(n) keep the
+# pointer index in a separate column.
+ACTION_UNKNOWN = -1
+ACTION_DOWN = 0
+ACTION_UP = 1
+ACTION_MOVE = 2
+ACTION_CANCEL = 3
+ACTION_OUTSIDE = 4
+ACTION_POINTER_DOWN = 5
+ACTION_POINTER_UP = 6
+ACTION_HOVER_MOVE = 7
+ACTION_SCROLL = 8
+ACTION_HOVER_ENTER = 9
+ACTION_HOVER_EXIT = 10
+ACTION_BUTTON_PRESS = 11
+ACTION_BUTTON_RELEASE = 12
+
+ACTION_NAMES = {
+    ACTION_DOWN: "ACTION_DOWN",
+    ACTION_UP: "ACTION_UP",
+    ACTION_MOVE: "ACTION_MOVE",
+    ACTION_CANCEL: "ACTION_CANCEL",
+    ACTION_OUTSIDE: "ACTION_OUTSIDE",
+    ACTION_POINTER_DOWN: "ACTION_POINTER_DOWN",
+    ACTION_POINTER_UP: "ACTION_POINTER_UP",
+    ACTION_HOVER_MOVE: "ACTION_HOVER_MOVE",
+    ACTION_SCROLL: "ACTION_SCROLL",
+    ACTION_HOVER_ENTER: "ACTION_HOVER_ENTER",
+    ACTION_HOVER_EXIT: "ACTION_HOVER_EXIT",
+    ACTION_BUTTON_PRESS: "ACTION_BUTTON_PRESS",
+    ACTION_BUTTON_RELEASE: "ACTION_BUTTON_RELEASE",
+}
+ACTION_CODES = {name: code for code, name in ACTION_NAMES.items()}
+
+DOWN_CODES = (ACTION_DOWN, ACTION_POINTER_DOWN)
+UP_CODES = (ACTION_UP, ACTION_POINTER_UP)
+# Actions that concern a single pointer, the one in action_index; the rest concern every pointer
+INDEXED_CODES = (ACTION_POINTER_DOWN, ACTION_POINTER_UP)
+
+# Pointer indices stored per event. Panels report up to 10 simultaneous touches.
+MAX_POINTERS = 10
+
+
+def decode_action(name):
+    """Turns 'ACTION_POINTER_DOWN(1)' into (ACTION_POINTER_DOWN, 1)."""
+    name = str(name)
+    index = 0
+    if name.endswith(')') and '(' in name:
+        name, _, idx = name[:-1].partition('(')
+        index = int(idx) if idx.isdigit() else 0
+    return ACTION_CODES.get(name, ACTION_UNKNOWN), index
+
+
+def action_name(code, index=0):
+    """Inverse of decode_action, used for export and terminal reconstruction."""
+    name = ACTION_NAMES.get(int(code), "ACTION_UNKNOWN")
+    if code in (ACTION_POINTER_DOWN, ACTION_POINTER_UP):
+        return f"{name}({int(index)})"
+    return name
+
+
+def pointer_bits(x):
+    """Per-event bitmask of the pointer indices with a sample, from a (pointers, n) x column."""
+    weights = (1 << np.arange(len(x), dtype=np.uint16))[:, None]
+    return (~np.isnan(x) * weights).sum(axis=0, dtype=np.uint16)
+
+
+def mask_pointers(mask):
+    """Pointer indices whose bit is set in `mask`."""
+    mask = int(mask)
+    return [p for p in range(mask.bit_length()) if mask >> p & 1]
+
+
+# --- OTHER MOTIONEVENT FIELDS ---
+# Kept as the integers MotionEvent holds; toString() prints some of them as
+# names, flag sets or hex, which decode_field/field_text translate both ways.
+TOOL_TYPE_NAMES = {
+    0: "TOOL_TYPE_UNKNOWN",
+    1: "TOOL_TYPE_FINGER",
+    2: "TOOL_TYPE_STYLUS",
+    3: "TOOL_TYPE_MOUSE",
+    4: "TOOL_TYPE_ERASER",
+    5: "TOOL_TYPE_PALM",
+}
+CLASSIFICATION_NAMES = {
+    0: "NONE",
+    1: "AMBIGUOUS_GESTURE",
+    2: "DEEP_PRESS",
+    3: "TWO_FINGER_SWIPE",
+    4: "MULTI_FINGER_SWIPE",
+    5: "PINCH",
+}
+BUTTON_NAMES = {
+    0x01: "BUTTON_PRIMARY",
+    0x02: "BUTTON_SECONDARY",
+    0x04: "BUTTON_TERTIARY",
+    0x08: "BUTTON_BACK",
+    0x10: "BUTTON_FORWARD",
+    0x20: "BUTTON_STYLUS_PRIMARY",
+    0x40: "BUTTON_STYLUS_SECONDARY",
+}
+META_NAMES = {
+    0x01: "META_SHIFT_ON",
+    0x02: "META_ALT_ON",
+    0x04: "META_SYM_ON",
+    0x08: "META_FUNCTION_ON",
+    0x10: "META_ALT_LEFT_ON",
+    0x20: "META_ALT_RIGHT_ON",
+    0x40: "META_SHIFT_LEFT_ON",
+    0x80: "META_SHIFT_RIGHT_ON",
+    0x1000: "META_CTRL_ON",
+    0x2000: "META_CTRL_LEFT_ON",
+    0x4000: "META_CTRL_RIGHT_ON",
+    0x10000: "META_META_ON",
+    0x20000: "META_META_LEFT_ON",
+    0x40000: "META_META_RIGHT_ON",
+    0x100000: "META_CAPS_LOCK_ON",
+    0x200000: "META_NUM_LOCK_ON",
+    0x400000: "META_SCROLL_LOCK_ON",
+}
+ENUM_FIELDS = {"toolType": TOOL_TYPE_NAMES, "classification": CLASSIFICATION_NAMES}
+FLAG_FIELDS = {"actionButton": BUTTON_NAMES, "buttonState": BUTTON_NAMES, "metaState": META_NAMES}
+HEX_FIELDS = ("flags", "edgeFlags", "source")
+_FIELD_CODES = {field: {name: code for code, name in names.items()}
+                for field, names in {**ENUM_FIELDS, **FLAG_FIELDS}.items()}
+
+
+def decode_field(field, text):
+    """Integer value of a field as toString() prints it ('TOOL_TYPE_FINGER', 'BUTTON_PRIMARY|BUTTON_BACK', '0x300008', '-1').
+
+    None if it can't be read (e.g. an empty CSV cell).
+    """
+    codes = _FIELD_CODES.get(field, {})
+    value = 0
+    for token in str(text).strip().split('|'):
+        code = codes.get(token)
+        if code is None:
+            try:
+                code = int(token, 16) if token[:2].lower() == '0x' else int(float(token))
+            except ValueError:
+                return None
+        value |= code
+    return value
+
+
+def field_text(field, value):
+    """Inverse of decode_field, for the CSV export."""
+    value = int(value)
+    if field in ENUM_FIELDS:
+        return ENUM_FIELDS[field].get(value, str(value))
+    if field in HEX_FIELDS:
+        return f"0x{value & 0xffffffff:x}"
+    if field in FLAG_FIELDS and value:
+        names = [name for bit, name in FLAG_FIELDS[field].items() if value & bit]
+        rest = value & ~sum(bit for bit in FLAG_FIELDS[field] if value & bit)
+        return "|".join(names + ([f"0x{rest:08x}"] if rest else []))
+    return str(value)
+
+
+def _field_texts(field, values, present=None):
+    """field_text over a whole column, one call per distinct value; None where `present` is False."""
+    uniq, inverse = np.unique(values, return_inverse=True)
+    texts = np.array([field_text(field, u) for u in uniq], dtype=object)[inverse]
+    if present is not None:
+        texts[~present] = None
+    return texts
+
+
+def _read_column(field, values, dtype, fill):
+    """A CSV column back into `dtype`, decoding the fields written as text; unreadable cells get `fill`."""
+    if field not in TEXT_FIELDS:
+        return pd.to_numeric(values, errors='coerce').fillna(fill).to_numpy(dtype=dtype)
+    uniq, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    table = np.array([fill if v is None else v for v in (decode_field(field, u) for u in uniq)], dtype=dtype)
+    return table[inverse]
+
+
+# --- COLUMN LAYOUT ---
+# (name, dtype, fill value for rows that never set it)
+SCALAR_COLUMNS = [
+    ("action", np.int8, ACTION_UNKNOWN),
+    ("action_index", np.int8, 0),
+    ("pointerCount", np.int8, 0),
+    ("eventTime", np.int64, 0),
+    ("downTime", np.int64, 0),
+    ("eventId", np.int64, 0),
+    ("pc_time", np.float64, np.nan),
+    # Wall-clock time from the logcat line prefix (epoch seconds), NaN if the line had none
+    ("log_time", np.float64, np.nan),
+    # Line of the raw log (terminal) the event was read from, -1 if unknown
+    ("log_line", np.int64, -1),
+    # Bit p set when pointer index p has a sample in this event (see pointer_bits)
+    ("pointer_mask", np.uint16, 0),
+    # Rest of the MotionEvent, only carried through to the CSV export
+    ("actionButton", np.int32, 0),
+    ("buttonState", np.int32, 0),
+    ("classification", np.int8, 0),
+    ("metaState", np.int32, 0),
+    ("flags", np.uint32, 0),
+    ("edgeFlags", np.uint32, 0),
+    ("historySize", np.int32, 0),
+    ("deviceId", np.int32, 0),
+    ("source", np.uint32, 0),
+    ("displayId", np.int32, 0),
+]
+# Same, but one row per pointer index: (pointers, n) arrays
+POINTER_COLUMNS = [
+    ("x", np.float32, np.nan),
+    ("y", np.float32, np.nan),
+    # Pointer id (id[p]), which stays with a finger while its index p can shift; -1 without a sample
+    ("id", np.int8, -1),
+    ("toolType", np.int8, -1),
+]
+POINTER_NAMES = [name for name, _, _ in POINTER_COLUMNS]
+# Exported as the text toString() prints rather than the stored integer
+TEXT_FIELDS = list(ENUM_FIELDS) + list(FLAG_FIELDS) + list(HEX_FIELDS)
+
+
+class EventStore:
+    """Append-only, column-oriented storage for parsed MotionEvents.
+
+    Row i is the event with timestamp_order == base + i (base is 0 unless
+    older events were spilled to disk, see slice()). Columns are NumPy arrays
+    that grow by doubling, so appends are amortized O(1) and every accessor
+    below hands out views instead of copies.
+    """
+
+    CHUNK = 4096
+
+    def __init__(self, max_pointers=MAX_POINTERS, capacity=CHUNK):
+        self.max_pointers = max_pointers
+        self.base = 0
+        self.generation = 0 # Bumped by clear(), so holders of a snapshot can tell the rows were replaced
+        self._size = 0
+        self._capacity = 0
+        self._cols = {}
+        self._grow(capacity)
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    # --- ALLOCATION ---
+    def _grow(self, needed):
+        """Reallocates every column to hold at least `needed` rows."""
+        new_cap = max(self.CHUNK, self._capacity)
+        while new_cap < needed:
+            new_cap *= 2
+        if new_cap == self._capacity:
+            return
+
+        cols = {}
+        for name, dtype, fill in SCALAR_COLUMNS:
+            cols[name] = np.full(new_cap, fill, dtype=dtype)
+        for name, dtype, fill in POINTER_COLUMNS:
+            cols[name] = np.full((self.max_pointers, new_cap), fill, dtype=dtype)
+
+        n = self._size
+        for name, col in self._cols.items():
+            cols[name][..., :n] = col[..., :n]
+        self._cols = cols
+        self._capacity = new_cap
+
+    def clear(self):
+        self.base = 0
+        self.generation += 1
+        self._size = 0
+        self._capacity = 0
+        self._cols = {}
+        self._grow(self.CHUNK)
+
+    # --- WRITES ---
+    def extend(self, columns):
+        """Appends a batch given as {column: array}. Pointer columns are (pointers, n)."""
+        n = len(columns['action'])
+        if n == 0:
+            return
+        start = self._size
+        self._grow(start + n)
+        for name, values in columns.items():
+            if name not in self._cols:
+                continue
+            if name in POINTER_NAMES:
+                p = min(self.max_pointers, values.shape[0])
+                self._cols[name][:p, start:start + n] = values[:p]
+            else:
+                self._cols[name][start:start + n] = values
+        mask = self._cols['pointer_mask'][start:start + n]
+        if 'pointer_mask' in columns:
+            mask &= (1 << self.max_pointers) - 1 # Parsed for more pointers than this store keeps
+        elif 'x' in columns:
+            mask[:] = pointer_bits(self._cols['x'][:, start:start + n])
+        self._size = start + n
+
+    # --- READS (all views, no copies) ---
+    def column(self, name, stop=None):
+        n = self._size if stop is None else max(0, min(stop, self._size))
+        return self._cols[name][..., :n]
+
+    def x(self, pointer, stop=None):
+        return self.column('x', stop)[pointer]
+
+    def y(self, pointer, stop=None):
+        return self.column('y', stop)[pointer]
+
+    def pointers_used(self, stop=None):
+        """Pointer indices that have at least one sample among the first `stop` events."""
+        return mask_pointers(np.bitwise_or.reduce(self.column('pointer_mask', stop)) if self._size else 0)
+
+    def slice(self, start, stop=None, copy=False, capacity=0):
+        """Rows [start, stop) as a store of their own, with base moved along.
+
+        Without `copy` the new store shares this one's arrays (e.g. to write
+        them out); with it, the rows are copied into fresh arrays of at least
+        `capacity` rows, so the old arrays can be freed.
+        """
+        stop = self._size if stop is None else min(stop, self._size)
+        start = max(0, min(start, stop))
+        n = stop - start
+        if copy:
+            store = type(self)(max_pointers=self.max_pointers, capacity=max(n, capacity))
+            store.extend({name: col[..., start:stop] for name, col in self._cols.items()})
+        else:
+            store = type(self).from_arrays({name: col[..., start:stop] for name, col in self._cols.items()}, n,
+                                           max_pointers=self.max_pointers)
+        store.base = self.base + start
+        return store
+
+    def row(self, i):
+        """Rebuilds the old dict view of a single event (selection, terminal sync)."""
+        if not 0 <= i < self._size:
+            raise IndexError(i)
+        c = self._cols
+        row = {
+            'action': action_name(c['action'][i], c['action_index'][i]),
+            'timestamp_order': self.base + i,
+        }
+        for name in ("pointerCount", "eventTime", "downTime", "eventId"):
+            row[name] = int(c[name][i])
+        row['pc_time'] = float(c['pc_time'][i])
+        for p in mask_pointers(c['pointer_mask'][i]):
+            row[f"x_{p}"] = float(c['x'][p, i])
+            row[f"y_{p}"] = float(c['y'][p, i])
+        return row
+
+    # --- INTERCHANGE ---
+    def to_frame(self, stop=None, pointers=None):
+        """Flat DataFrame in the same column naming the CSV export has always used.
+
+        id_p/x_p/y_p/toolType_p columns are written for every pointer with data, or exactly for `pointers` if given.
+        The other fields are written as MotionEvent.toString() prints them, like the raw log.
+        """
+        n = self._size if stop is None else min(stop, self._size)
+        codes = self.column('action', n)
+        indices = self.column('action_index', n)
+        data = {
+            'action': [action_name(c, i) for c, i in zip(codes.tolist(), indices.tolist())],
+            'actionButton': _field_texts('actionButton', self.column('actionButton', n)),
+        }
+        for p in range(self.max_pointers) if pointers is None else pointers:
+            xs = self.x(p, n)
+            present = ~np.isnan(xs)
+            if pointers is not None or present.any():
+                data[f"id_{p}"] = pd.arrays.IntegerArray(self.column('id', n)[p].astype(np.int64), ~present)
+                data[f"x_{p}"] = xs
+                data[f"y_{p}"] = self.y(p, n)
+                data[f"toolType_{p}"] = _field_texts('toolType', self.column('toolType', n)[p], present)
+        for name in ("buttonState", "classification", "metaState", "flags", "edgeFlags"):
+            data[name] = _field_texts(name, self.column(name, n))
+        for name in ("pointerCount", "historySize", "eventTime", "downTime", "deviceId"):
+            data[name] = self.column(name, n)
+        data['source'] = _field_texts('source', self.column('source', n))
+        data['displayId'] = self.column('displayId', n)
+        data['eventId'] = self.column('eventId', n)
+        data['timestamp_order'] = self.base + np.arange(n)
+        data['pc_time'] = self.column('pc_time', n)
+        data['log_time'] = self.column('log_time', n)
+        return pd.DataFrame(data)
+
+    @classmethod
+    def from_arrays(cls, columns, n, max_pointers=MAX_POINTERS):
+        """Wraps existing column arrays (e.g. a memory-mapped session) without copying.
+
+        Columns missing from `columns` are filled with their defaults, and
+        pointer columns with fewer than max_pointers rows are filled below the rest. The
+        other arrays are only copied once the store needs to grow.
+        """
+        store = cls.__new__(cls)
+        store.max_pointers = max_pointers
+        store.base = 0
+        store.generation = 0
+        store._size = n
+        store._capacity = n
+        store._cols = {}
+        for name, dtype, fill in SCALAR_COLUMNS:
+            col = columns.get(name)
+            store._cols[name] = np.full(n, fill, dtype=dtype) if col is None else col
+        for name, dtype, fill in POINTER_COLUMNS:
+            col = columns.get(name)
+            if col is None or len(col) < max_pointers:
+                # Pointer rows that weren't stored (never used) hold only the fill value
+                full = np.full((max_pointers, n), fill, dtype=dtype)
+                if col is not None:
+                    full[:len(col)] = col
+                col = full
+            store._cols[name] = col
+        if columns.get('pointer_mask') is None:
+            store._cols['pointer_mask'] = pointer_bits(store._cols['x'])  # Saved before the mask existed
+        return store
+
+    @classmethod
+    def from_frame(cls, df, max_pointers=MAX_POINTERS):
+        """Builds a store from a DataFrame written by to_frame() or the old dict export."""
+        store = cls(max_pointers=max_pointers, capacity=len(df))
+        n = len(df)
+        if n == 0:
+            return store
+
+        decoded = [decode_action(a) for a in df.get('action', pd.Series(["ACTION_MOVE"] * n))]
+        cols = {
+            'action': np.array([d[0] for d in decoded], dtype=np.int8),
+            'action_index': np.array([d[1] for d in decoded], dtype=np.int8),
+        }
+        for name, dtype, fill in SCALAR_COLUMNS[2:]:
+            if name in df:
+                cols[name] = _read_column(name, df[name], dtype, fill)
+
+        for name, dtype, fill in POINTER_COLUMNS:
+            arr = np.full((max_pointers, n), fill, dtype=dtype)
+            for p in range(max_pointers):
+                key = f"{name}_{p}"
+                if key in df:
+                    arr[p] = _read_column(name, df[key], dtype, fill)
+            cols[name] = arr
+
+        store.extend(cols)
+        return store
@@ -0,0 +1,148 @@
+import queue
+import threading
+import time
+
+from event_store import MAX_POINTERS
+from motion_parser import parse_lines
+from profiler import PROFILER
+from tailer import TailReset
+
+# Tk-side defaults: how often the UI drains the pipeline and how much of each tick it may spend
+FRAME_INTERVAL_MS = 20
+FRAME_BUDGET_MS = 12
+
+# Upper bound on lines per batch so one big read can't blow a whole frame budget
+MAX_BATCH_LINES = 4096
+
+# Batches parsed ahead of the UI. When it falls behind, the reader blocks instead of
+# growing the queue, and the source backs up into its pipe / stays unread on disk.
+MAX_QUEUED_BATCHES = 64
+
+
+class IngestBatch:
+    """Raw lines plus their already-parsed columns, built entirely off the UI thread."""
+
+    __slots__ = ("lines", "columns")
+
+    def __init__(self, lines, columns):
+        self.lines = lines
+        self.columns = columns
+
+
+class IngestStats:
+    """Counters for the status bar (and anything else that wants to watch the pipeline)."""
+
+    def __init__(self):
+        self.batches = 0
+        self.lines = 0
+        self.events = 0
+        self.frames = 0
+        self.dropped_frames = 0   # UI ticks that overran the frame interval
+        self.last_frame_ms = 0.0
+
+
+class IngestPipeline:
+    """Reader thread -> parse -> queue of IngestBatch -> budgeted drain on the Tk thread.
+
+    `chunks` is any iterable of bytes (pipe reads, file tail reads). Chunks are
+    split at newline boundaries; a trailing partial line is held back until
+    the rest of it arrives. The queue is bounded: the reader waits for the UI
+    to drain it (backpressure) until cancel().
+    """
+
+    def __init__(self, chunks, max_pointers=MAX_POINTERS):
+        self.chunks = chunks
+        self.max_pointers = max_pointers
+        self.queue = queue.Queue(maxsize=MAX_QUEUED_BATCHES)
+        self.stats = IngestStats()
+        self._thread = None
+        self._cancel = threading.Event()
+
+    @property
+    def queue_depth(self):
+        return self.queue.qsize()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _put(self, batch):
+        # Bounded put that still notices a cancel while the UI is behind
+        while not self._cancel.is_set():
+            try:
+                self.queue.put(batch, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _run(self):
+        try:
+            self._read()
+        except Exception as e: # Say so in the log pane rather than leave the plot silently empty
+            self.submit([f"--- LOG SOURCE FAILED: {type(e).__name__}: {e} ---".encode()])
+
+    def _read(self):
+        pending = b''
+        for chunk in self.chunks:
+            if isinstance(chunk, TailReset):
+                # The source started over; a half-read line from before can't be completed
+                pending = b''
+                if not self.submit([f"--- LOG SOURCE {chunk.reason.upper()}, FOLLOWING FROM START ---".encode()]):
+                    return
+                continue
+            data = pending + chunk
+            cut = data.rfind(b'\n') + 1
+            pending = data[cut:]
+            if cut:
+                with PROFILER.stage("split"):
+                    lines = data[:cut].splitlines()
+                if not self.submit(lines):
+                    return
+        if pending:
+            self.submit([pending])
+
+    def submit(self, lines):
+        """Parses a list of raw (bytes) lines and hands the batch(es) to the UI thread.
+
+        Blocks while the queue is full; False if cancelled meanwhile.
+        """
+        for i in range(0, len(lines), MAX_BATCH_LINES):
+            part = lines[i:i + MAX_BATCH_LINES]
+            with PROFILER.stage("parse"):
+                columns = parse_lines(part, max_pointers=self.max_pointers)
+            PROFILER.count("lines", len(part))
+            if not self._put(IngestBatch(part, columns)):
+                return False
+        return True
+
+    def drain(self, apply, budget_ms=FRAME_BUDGET_MS):
+        """Calls apply(batch) for queued batches until the queue is empty or the budget is spent.
+
+        Returns True if anything was applied. Leftover batches wait for the next tick.
+        """
+        start = time.perf_counter()
+        deadline = start + budget_ms / 1000.0
+        applied = False
+        while time.perf_counter() < deadline:
+            try:
+                batch = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            apply(batch)
+            applied = True
+            self.stats.batches += 1
+            self.stats.lines += len(batch.lines)
+            self.stats.events += len(batch.columns['action'])
+        return applied
+
+    def end_frame(self, frame_ms, interval_ms=FRAME_INTERVAL_MS):
+        """Records how long the UI tick took (drain + redraw)."""
+        self.stats.frames += 1
+        self.stats.last_frame_ms = frame_ms
+        if frame_ms > interval_ms:
+            self.stats.dropped_frames += 1
@@ -0,0 +1,360 @@
+"""Crash-safe autosave for live captures: every applied batch is appended to a journal file off the UI thread."""
+import json
+import mmap
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from event_store import EventStore, MAX_POINTERS, SCALAR_COLUMNS, POINTER_NAMES
+from session_cache import app_dir
+from session_file import save_session_parts
+
+# Where journals are written (one per running capture)
+JOURNAL_DIR_ENV = "TOUCHVIZ_JOURNAL_DIR"
+EXTENSION = ".tjnl"
+
+# Seconds between journal writes while data is arriving: at most this much is lost in a crash
+FLUSH_INTERVAL = 1.0
+
+# --- FILE LAYOUT ---
+# MAGIC | uint32 header length | JSON header (started, pid, max_pointers) | record | record | ...
+# record: RECORD | uint32 header length | uint32 body length | uint32 CRC-32 of header + body | JSON header | body
+#
+# A record holds the events and raw lines of everything applied since the
+# previous one: each column as a little-endian array, then the line offsets
+# and the line bytes in LineStore layout. Records are only ever appended,
+# each with one write plus fsync, so a crash can at worst leave a torn last
+# record; readers stop at the first incomplete one or the first CRC mismatch.
+MAGIC = b"TJNL\x00\x00\x00\x01"
+RECORD = b"TJR\x01"
+ALIGN = 8
+
+_LEN = struct.Struct("<I")
+_RECORD = struct.Struct("<4sIII")
+
+
+class JournalFormatError(ValueError):
+    pass
+
+
+def default_dir():
+    return os.environ.get(JOURNAL_DIR_ENV) or os.path.join(app_dir(), "journal")
+
+
+def _pad(n):
+    return -n % ALIGN
+
+
+# --- LOCKING ---
+# The writer holds an exclusive lock on <journal>.lock while it runs, so a journal
+# whose lock can be taken belongs to a run that is gone (crashed or killed).
+def _try_lock(f):
+    try:
+        if sys.platform == "win32":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def _lock_path(path):
+    return path + ".lock"
+
+
+# --- READING ---
+def _map(path):
+    """(read-only mapping of the journal, its file header)."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise JournalFormatError(f"{os.path.basename(path)} is not a capture journal")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    (length,) = _LEN.unpack_from(mm, len(MAGIC))
+    return mm, json.loads(mm[len(MAGIC) + _LEN.size:len(MAGIC) + _LEN.size + length])
+
+
+def _records(mm):
+    """(header dict, body memoryview) of each intact record, in order."""
+    pos = len(MAGIC)
+    (length,) = _LEN.unpack_from(mm, pos)
+    pos += _LEN.size + length
+    view = memoryview(mm)
+    while pos + _RECORD.size <= len(mm):
+        tag, header_len, body_len, crc = _RECORD.unpack_from(mm, pos)
+        start = pos + _RECORD.size
+        end = start + header_len + body_len
+        if tag != RECORD or end > len(mm) or zlib.crc32(view[start:end]) != crc:
+            break # Torn or unfinished write: everything before it is intact
+        yield json.loads(bytes(view[start:start + header_len])), view[start + header_len:end]
+        pos = end
+
+
+def read_info(path):
+    """The journal's file header plus totals of its intact records: events, lines, first_event, first_line."""
+    mm, info = _map(path)
+    info.update(events=0, lines=0, first_event=0, first_line=0)
+    for k, (header, _) in enumerate(_records(mm)):
+        if k == 0:
+            info.update(first_event=header["first_event"], first_line=header["first_line"])
+        info["events"] += header["events"]
+        info["lines"] += header["lines"]
+    return info
+
+
+def journal_parts(path):
+    """[(events, line_buf, line_offsets)] per record, memory-mapped, for save_session_parts.
+
+    log_line is renumbered so the journal's first line is line 0.
+    """
+    mm, info = _map(path)
+    max_pointers = info["max_pointers"]
+    parts, first_line = [], None
+    for header, body in _records(mm):
+        if first_line is None:
+            first_line = header["first_line"]
+        arrays = {}
+        for name, (dtype, shape, offset) in header["arrays"].items():
+            arrays[name] = np.frombuffer(body, dtype=np.dtype(dtype), count=int(np.prod(shape)),
+                                         offset=offset).reshape(shape)
+        if first_line:
+            arrays["log_line"] = np.where(arrays["log_line"] >= 0, arrays["log_line"] - first_line, -1)
+        events = EventStore.from_arrays(arrays, header["events"], max_pointers=max_pointers)
+        parts.append((events, arrays["line_buf"], arrays["line_offsets"]))
+    return parts
+
+
+def recover_journal(path, dest):
+    """Writes the intact part of a journal to the session file `dest`. Returns the number of events."""
+    parts = journal_parts(path)
+    if not parts:
+        raise JournalFormatError(f"{os.path.basename(path)} holds no data")
+    save_session_parts(dest, parts, recovered_from=os.path.basename(path))
+    return sum(len(events) for events, _, _ in parts)
+
+
+def orphaned_journals(directory=None):
+    """Journals left behind by runs that did not exit cleanly, newest first."""
+    directory = directory or default_dir()
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    found = []
+    for name in names:
+        if not name.endswith(EXTENSION):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            with open(_lock_path(path), "a+b") as f:
+                if not _try_lock(f):
+                    continue # Another instance is still writing it
+            found.append((os.path.getmtime(path), path))
+        except OSError:
+            continue
+    return [path for _, path in sorted(found, reverse=True)]
+
+
+def discard_journal(path):
+    for p in (path, _lock_path(path)):
+        try:
+            os.remove(p)
+        except OSError:
+            pass
+
+
+# --- WRITING ---
+class SessionJournal:
+    """Autosaves the live capture: parsed events and raw lines, appended to a journal as they arrive.
+
+    append() runs on the Tk thread and only queues the batch; a writer
+    thread gathers batches and writes one checksummed, fsynced record every
+    FLUSH_INTERVAL, so a crash or a killed process loses at most the last
+    interval. While it runs the journal is locked, which is how
+    orphaned_journals() tells a dead run's journal from a live one.
+
+    finalize() turns the journal into a session file on the writer thread,
+    so exporting a long capture costs the UI nothing; results come back
+    through finished(). reset() starts over (CLEAR, import) and close()
+    deletes the journal on a clean exit.
+    """
+
+    def __init__(self, directory=None, max_pointers=MAX_POINTERS, flush_interval=FLUSH_INTERVAL):
+        self.directory = directory or default_dir()
+        self.max_pointers = max_pointers
+        self.flush_interval = flush_interval
+        # What has been handed to append() since the last reset, in capture-wide numbers
+        self.first_event = 0
+        self.first_line = 0
+        self.events = 0
+        self.lines = 0
+        self.error = None # Set by the writer if the journal could not be written; journaling then stops
+        self._queue = queue.Queue()
+        self._done = queue.Queue()
+        self._thread = None
+        self._file = None
+        self._lock = None
+        self.path = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def covers(self, events, lines):
+        """True if the journal holds the whole capture (`events` events and `lines` lines from the first)."""
+        return (self.error is None and self.first_event == 0 and self.first_line == 0
+                and self.events == events and self.lines == lines)
+
+    # --- TK THREAD ---
+    def append(self, columns, lines):
+        """Queues a batch as applied to the store: {column: array} (log_line set) and its raw lines."""
+        self._queue.put(("batch", columns, lines))
+        self.events += len(columns['action'])
+        self.lines += len(lines)
+
+    def reset(self, first_event=0, first_line=0):
+        """Drops the journal; what is appended next starts a new one at these capture-wide numbers."""
+        self._queue.put(("reset", first_event, first_line))
+        self.first_event, self.first_line = first_event, first_line
+        self.events = self.lines = 0
+
+    def finalize(self, path, extra_arrays=None, **meta):
+        """Writes everything appended so far as a session file at `path`, on the writer thread."""
+        self._queue.put(("finalize", path, extra_arrays, meta))
+
+    def finished(self):
+        """[(path, error or None)] of finalize() calls completed since the last call."""
+        done = []
+        while True:
+            try:
+                done.append(self._done.get_nowait())
+            except queue.Empty:
+                return done
+
+    def close(self, timeout=None):
+        """Clean exit: finishes pending work and deletes the journal."""
+        if self._thread is None:
+            return
+        self._queue.put(("close",))
+        self._thread.join(timeout)
+
+    # --- WRITER THREAD ---
+    def _run(self):
+        pending, deadline = [], None
+        next_event = next_line = 0
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = ("flush",)
+            kind = item[0]
+            if kind == "batch":
+                pending.append(item[1:])
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                continue
+            if kind == "reset":
+                pending = [] # Belonged to the capture being dropped
+                self._discard()
+                next_event, next_line = item[1], item[2]
+            elif pending:
+                next_event, next_line = self._write(pending, next_event, next_line)
+                pending = []
+            deadline = None
+            if kind == "finalize":
+                _, path, extra_arrays, meta = item
+                self._done.put((path, self._finalize(path, extra_arrays, meta)))
+            elif kind == "close":
+                self._discard()
+                return
+
+    def _open(self, first_event):
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.directory, f"capture_{stamp}_{os.getpid()}_{first_event}{EXTENSION}")
+        self._lock = open(_lock_path(path), "a+b")
+        if not _try_lock(self._lock):
+            raise OSError(f"{_lock_path(path)} is locked by another process")
+        header = json.dumps({"started": time.time(), "pid": os.getpid(),
+                             "max_pointers": self.max_pointers}).encode("utf-8")
+        self._file = open(path, "wb")
+        self._file.write(MAGIC + _LEN.pack(len(header)) + header)
+        self.path = path
+
+    def _write(self, pending, first_event, first_line):
+        """Appends one record with the pending batches. Returns the next (event, line) numbers."""
+        n = sum(len(columns['action']) for columns, _ in pending)
+        lines = [l for _, batch_lines in pending for l in batch_lines]
+        if self.error is not None:
+            return first_event + n, first_line + len(lines)
+        # Same normalization as EventStore.extend / LineStore.extend, so the journal reads back like the store
+        events = EventStore(max_pointers=self.max_pointers, capacity=max(1, n))
+        for columns, _ in pending:
+            events.extend(columns)
+        encoded = [l.rstrip(b'\r\n') + b'\n' if isinstance(l, bytes)
+                   else l.rstrip('\r\n').encode('utf-8', 'replace') + b'\n' for l in lines]
+        line_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded)), out=line_offsets[1:])
+
+        arrays = {name: events.column(name) for name, _, _ in SCALAR_COLUMNS}
+        used = events.pointers_used()
+        # Only pointer rows up to the highest one used; journal_parts fills in the rest
+        arrays.update((name, events.column(name)[:max(used, default=-1) + 1]) for name in POINTER_NAMES)
+        arrays["line_offsets"] = line_offsets
+        arrays["line_buf"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        layout, chunks, offset = {}, [], 0
+        for name, arr in arrays.items():
+            data = np.ascontiguousarray(arr, dtype=arr.dtype.newbyteorder("<")).tobytes()
+            layout[name] = [arr.dtype.newbyteorder("<").str, list(arr.shape), offset]
+            chunks += [data, b"\0" * _pad(len(data))]
+            offset += len(data) + _pad(len(data))
+        header = json.dumps({"first_event": first_event, "first_line": first_line, "events": n,
+                             "lines": len(encoded), "arrays": layout}).encode("utf-8")
+        body = b"".join(chunks)
+        crc = zlib.crc32(body, zlib.crc32(header))
+        try:
+            if self._file is None:
+                self._open(first_event)
+            self._file.write(_RECORD.pack(RECORD, len(header), len(body), crc) + header + body)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            # A full disk must not take the capture down with it; the data is still in memory
+            self.error = e
+            print(f"Capture journal: autosave stopped: {e}", file=sys.stderr)
+        return first_event + n, first_line + len(encoded)
+
+    def _finalize(self, path, extra_arrays, meta):
+        if self.error is not None:
+            return self.error
+        if self.path is None:
+            return OSError("nothing has been journaled")
+        try:
+            parts = journal_parts(self.path)
+            save_session_parts(path, parts, extra_arrays, **meta)
+        except Exception as e:
+            return e
+        return None
+
+    def _discard(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+        if self.path is not None:
+            discard_journal(self.path)
+            self.path = None
+        self.error = None
@@ -1,19 +1,45 @@
 import sys
-import re
+import argparse
 import threading
-import queue
 import time
 import os
 import tkinter as tk
-from tkinter import scrolledtext, messagebox, filedialog, ttk
+from tkinter import messagebox, filedialog, simpledialog, ttk
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.colors import ListedColormap
-from matplotlib.lines import Line2D as Line2D # For creating legend proxies
-from matplotlib.patches import Patch
-import seaborn as sns
 import pandas as pd
 import numpy as np
+from event_store import EventStore, mask_pointers
+from motion_parser import parse_lines
+from plot_renderer import POINTER_COLORS, HIGHLIGHT_COLORS, KIND_CODES
+from render_worker import RenderWorker, FrameRequest, WorkerCanvas
+from coverage_map import CoverageMap
+from spatial_index import SpatialIndex
+from log_view import VirtualLogView, LineStore
+from ingest import IngestPipeline, FRAME_BUDGET_MS, FRAME_INTERVAL_MS
+from tailer import FileTailer, PipeTailer
+from sources import source_from_args, LOGCAT_TAG
+from session_file import save_session, save_session_parts, load_session, EXTENSION as SESSION_EXT
+from session_cache import SessionCache
+from spill_store import RetentionPolicy, SpillArchive, spill
+from journal import SessionJournal, orphaned_journals, read_info, recover_journal, discard_journal
+from bulk_import import ParallelImport, MIN_BYTES as BULK_IMPORT_MIN_BYTES
+from playback import PlaybackClock, build_timeline, TARGET_FPS
+from stroke_index import StrokeIndex
+from timing_stats import TimingStats
+from stats_panel import StatsPanel
+from profiler import PROFILER
+from profiler_hud import ProfilerHud
+
+# How close (in screen pixels) a click must land to a point to select it
+PICK_RADIUS_PX = 15
+
+# Slider drags: positions arriving within this window are merged into one seek, and once the
+# slider has rested this long the keyframe-drawn seek frame is replaced by a full one
+SEEK_COALESCE_MS = 15
+SEEK_SETTLE_MS = 150
+
+# Set to a file path to start with profiling on, the HUD shown and every stage timing logged there as CSV
+PROFILE_ENV = "TOUCHVIZ_PROFILE"
 
 # TODO
 # [ ] more tick marks on the graph
@@ -50,18 +76,39 @@ class ModernButton(tk.Canvas):
         return "#%02x%02x%02x" % tuple(new_rgb)
 
 class MotionVisualizer:
-    def __init__(self, root):
+    def __init__(self, root, frame_budget_ms=FRAME_BUDGET_MS, frame_interval_ms=FRAME_INTERVAL_MS, source=None,
+                 retention=None, journal=True):
         self.root = root
         self.root.title("Nexus Playable Analytics | Real-Time Replay")
         self.root.geometry("1100x1000")
         self.root.configure(bg="#f1f3f4")
         
-        self.all_events = []
-        self.line_queue = queue.Queue()
+        self.events = EventStore() # Events on screen: the live capture, or a window of spilled history
+        self.live = self.events # Where live batches go; its base is the number of events spilled to disk
+        self.retention = retention or RetentionPolicy() # Default: keep everything in memory
+        self.archive = SpillArchive()
+        self.spatial = SpatialIndex()
+        self.strokes = StrokeIndex()
+        self.timing = TimingStats()
+        self.coverage = CoverageMap() # Sized (and from then on kept up to date) once the heatmap is first shown
+        self.stats_panel = None
         self.log_file = "live_data.txt"
+        self.source = source # Chunk source from sources.py (adb, replay); None = stdin or live_data.txt
+        self.session_cache = SessionCache() # Parsed .txt/.csv imports, reused when the same file is opened again
+        # Autosave of the live capture, written off the UI thread; None with --no-journal
+        self.journal = SessionJournal(max_pointers=self.events.max_pointers).start() if journal else None
+        self.frame_budget_ms = frame_budget_ms # Max time per UI tick spent applying ingested batches
+        self.frame_interval_ms = frame_interval_ms
         self.is_live = True  # The 'Global' Follow Variable
         self.is_playing = False
         self.selected_point_idx = None
+        self.player = None
+        self.playback_fps = TARGET_FPS
+        self.next_frame_at = 0.0
+        self.loop_range = None # (first, last) event indices set with [ and ]
+        self.pending_seek = None # Latest slider position not acted on yet
+        self.seek_after = None
+        self.settle_after = None
 
         # 1. TOP BAR
         self.top_frame = tk.Frame(root, bg="#f1f3f4", padx=20, pady=20)
@@ -82,6 +129,21 @@ class MotionVisualizer:
         ttk.Entry(input_box, textvariable=self.x_limit_var, width=8, font=("Segoe UI", 14)).grid(row=0, column=1, padx=10)
         tk.Label(input_box, text="Y MAX", font=("Segoe UI", 12, "bold"), bg="#f1f3f4", fg="#5f6368").grid(row=0, column=2, padx=(10, 0))
         ttk.Entry(input_box, textvariable=self.y_limit_var, width=8, font=("Segoe UI", 14)).grid(row=0, column=3, padx=10)
+
+        # Coverage heatmap toggle and layer choice (whole session, independent of the slider)
+        self.heatmap_var = tk.BooleanVar(value=False)
+        self.heat_pointer_var = tk.StringVar(value="All pointers")
+        self.heat_action_var = tk.StringVar(value="All actions")
+        tk.Checkbutton(input_box, text="HEATMAP", variable=self.heatmap_var, command=self.update_plot,
+                       font=("Segoe UI", 9, "bold"), bg="#f1f3f4", fg="#5f6368").grid(row=1, column=0, columnspan=2, sticky=tk.W, pady=(6, 0))
+        heat_pointer = ttk.Combobox(input_box, textvariable=self.heat_pointer_var, width=11, state="readonly",
+                                    values=["All pointers"] + [f"Pointer {p}" for p in range(self.events.max_pointers)])
+        heat_pointer.grid(row=1, column=2, columnspan=2, sticky=tk.W, padx=(10, 0), pady=(6, 0))
+        heat_action = ttk.Combobox(input_box, textvariable=self.heat_action_var, width=11, state="readonly",
+                                   values=["All actions", "Down", "Move", "Up"])
+        heat_action.grid(row=1, column=3, sticky=tk.E, padx=10, pady=(6, 0))
+        for box in (heat_pointer, heat_action):
+            box.bind("<<ComboboxSelected>>", lambda e: self.update_plot())
        
         # Action status updates
         self.action_label = tk.Label(self.top_frame, text="● READY", font=("Segoe UI", 14, "bold"), fg="#4285f4", bg="#f1f3f4")
@@ -89,10 +151,11 @@ class MotionVisualizer:
 
         # Action buttons
         ModernButton(self.top_frame, text="🗑️ CLEAR", color="#ffa3a3", command=self.clear_data).pack(side=tk.RIGHT, padx=5)
-        ModernButton(self.top_frame, text="📁 EXPORT CSV", color="#f4ff91", command=self.export_csv).pack(side=tk.RIGHT, padx=5)
+        ModernButton(self.top_frame, text="📁 EXPORT", color="#f4ff91", command=self.export_session).pack(side=tk.RIGHT, padx=5)
         ModernButton(self.top_frame, text="📥 IMPORT SESSION", color="#91ff91", command=self.import_session).pack(side=tk.RIGHT, padx=5)
         ModernButton(self.top_frame, text="📷 SAVE PNG", color="#91faff", command=self.save_plot).pack(side=tk.RIGHT, padx=5)
         ModernButton(self.top_frame, text="📋 COPY PNG", color="#ff91fa", command=self.copy_to_clipboard).pack(side=tk.RIGHT, padx=5)
+        ModernButton(self.top_frame, text="📊 STATS", color="#c9d7ff", command=self.open_stats).pack(side=tk.RIGHT, padx=5)
 
         # 2. PANED WINDOW
         self.paned_window = tk.PanedWindow(root, orient=tk.VERTICAL, bg="#f1f3f4", sashwidth=6, sashrelief=tk.FLAT)
@@ -101,12 +164,19 @@ class MotionVisualizer:
 
         # adding everything into the paned windows
         self.fig, self.ax = plt.subplots(figsize=(8, 5))
-        self.fig.canvas.mpl_connect('pick_event', self.on_pick)
         self.fig.canvas.mpl_connect('scroll_event', self.on_scroll)
         self.fig.canvas.mpl_connect('button_press_event', self.on_canvas_click)
         self.fig.canvas.mpl_connect('key_press_event', self.on_key_press)
-        self.canvas_widget = FigureCanvasTkAgg(self.fig, master=self.card_frame)
+        # Frames are drawn by a worker thread with its own figure; this one only sizes the canvas and maps clicks
+        self.render_worker = RenderWorker(figsize=(8, 5)).start()
+        self.canvas_widget = WorkerCanvas(self.fig, self.card_frame, self.update_plot)
         self.canvas_widget.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+        # Profiling HUD (F12 toggles, Shift+F12 writes a per-stage summary)
+        self.pipeline = None # Started last in __init__, once the UI is up
+        self.hud = ProfilerHud(self.card_frame, self.queue_depth)
+        self.root.bind("<F12>", lambda e: self.hud.toggle())
+        self.root.bind("<Shift-F12>", lambda e: self.dump_profile())
         self.paned_window.add(self.card_frame, minsize=400)
 
         # 3. PLAYBACK CONTROLS
@@ -116,6 +186,21 @@ class MotionVisualizer:
         self.play_btn = ModernButton(self.playback_frame, text="🐈 PLAY", color="#91faff", 
                                     command=self.toggle_play, width=120, height=40)
         self.play_btn.pack(side=tk.LEFT, padx=5)
+
+        # Playback speed and loop range
+        self.speed_var = tk.StringVar(value="1×")
+        speed_box = ttk.Combobox(self.playback_frame, textvariable=self.speed_var, width=5, state="readonly",
+                                 values=["0.1×", "0.25×", "0.5×", "1×", "2×", "5×", "10×"])
+        speed_box.bind("<<ComboboxSelected>>", self.on_speed_change)
+        speed_box.pack(side=tk.LEFT, padx=5)
+        self.loop_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.playback_frame, text="LOOP", variable=self.loop_var, command=self.on_loop_change,
+                       font=("Segoe UI", 9, "bold"), bg="#ffffff", fg="#5f6368").pack(side=tk.LEFT)
+        self.loop_label = tk.Label(self.playback_frame, text="", font=("Consolas", 9), bg="#ffffff", fg="#9aa0a6")
+        self.loop_label.pack(side=tk.LEFT)
+        self.root.bind("[", lambda e: self.set_loop_point("start"))
+        self.root.bind("]", lambda e: self.set_loop_point("end"))
+
         self.slider_var = tk.DoubleVar(value=0)
 
         # Custom styled scale
@@ -126,21 +211,65 @@ class MotionVisualizer:
         self.counter_label = tk.Label(self.playback_frame, text="0 / 0", font=("Consolas", 11, "bold"), bg="#ffffff", fg="#1a73e8")
         self.counter_label.pack(side=tk.RIGHT, padx=10)
 
+        self.pipeline_label = tk.Label(self.playback_frame, text="queue 0 | dropped 0", font=("Consolas", 9), bg="#ffffff", fg="#9aa0a6")
+        self.pipeline_label.pack(side=tk.RIGHT, padx=10)
+
+        self.stroke_label = tk.Label(self.playback_frame, text="", font=("Consolas", 9), bg="#ffffff", fg="#5f6368")
+        self.stroke_label.pack(side=tk.RIGHT, padx=10)
+        self.root.bind("<Control-Right>", lambda e: self.jump_slider_to_stroke(1))
+        self.root.bind("<Control-Left>", lambda e: self.jump_slider_to_stroke(-1))
+
+        # Background import progress (only packed while a large log is importing)
+        self.importer = None
+        self.import_frame = tk.Frame(self.playback_frame, bg="#ffffff")
+        self.import_progress = ttk.Progressbar(self.import_frame, orient=tk.HORIZONTAL, length=160, maximum=1.0)
+        self.import_progress.pack(side=tk.LEFT, padx=5)
+        ModernButton(self.import_frame, text="✖ CANCEL", color="#ffa3a3", command=self.cancel_import, width=90, height=30).pack(side=tk.LEFT)
+
         # 4. TERMINAL PANE
         self.term_container = tk.Frame(self.paned_window, bg="#f1f3f4")
         tk.Label(self.term_container, text="LIVE LOG STREAM", font=("Segoe UI", 10, "bold"), bg="#f1f3f4", fg="#5f6368").pack(anchor=tk.W, padx=20)
-        self.terminal = scrolledtext.ScrolledText(self.term_container, bg="white", font=("Consolas", 10), height=8, selectbackground="#d0e2ff", selectforeground="#000000")
+        self.terminal = VirtualLogView(self.term_container, font=("Consolas", 10), bg="white", height=8, selectbackground="#d0e2ff", selectforeground="#000000")
         self.terminal.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 10))
         self.paned_window.add(self.term_container, minsize=150)
+        self.live_lines = self.terminal.lines # Raw lines of the live capture (the terminal may show spilled ones)
 
         # Define terminal colors
         self.terminal.tag_config("x0", foreground="#A020F0", font=("Consolas", 10, "bold")) # Bright Purple
         self.terminal.tag_config("x1", foreground="#55d368", font=("Consolas", 10, "bold")) # Neon Green
+        for p in range(2, self.events.max_pointers):
+            self.terminal.tag_config(f"x{p}", foreground=POINTER_COLORS[p], font=("Consolas", 10, "bold"))
         self.terminal.tag_config("action", foreground="#0000FF", font=("Consolas", 10, "bold")) # Deep Blue
-
-        # THREADING
-        threading.Thread(target=self.read_data, daemon=True).start()
+        for p in range(self.events.max_pointers):
+            self.terminal.tag_config(f"highlight_p{p}", background=HIGHLIGHT_COLORS[p], foreground="#000000")
+        self.terminal.tag_config("search", background="#fff176", foreground="#000000")
+        self.highlighted_line = None # Log line currently marked as the selection
+        self.search_line = None # Log line of the last Ctrl+F hit
+        self.root.bind("<Control-f>", lambda e: self.find_in_log())
+
+        # THREADING: reader + parser run off the UI thread, process_queue drains finished batches
+        if os.environ.get(PROFILE_ENV):
+            self.hud.show(os.environ[PROFILE_ENV]) # Before the reader starts, so its first chunks are profiled too
+        self.pipeline = IngestPipeline(self.read_data(), max_pointers=self.events.max_pointers).start()
         self.process_queue()
+        self.root.after(500, self.offer_recovery)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+    def queue_depth(self):
+        """Batches parsed but not yet applied, for the profiling HUD (0 before the pipeline exists)."""
+        source = self.importer or self.pipeline
+        return source.queue_depth if source else 0
+
+    def close(self):
+        """Window closed: stop the background threads and the log source, then leave the main loop."""
+        self.pipeline.cancel()
+        stop_source = getattr(self.pipeline.chunks, "stop", None)
+        if stop_source:
+            stop_source() # Tailers and adb; the reader sees it at its next read
+        if self.importer:
+            self.importer.cancel()
+        self.render_worker.stop()
+        self.root.destroy()
 
     def toggle_play(self):
 
@@ -159,9 +288,15 @@ class MotionVisualizer:
             self.play_btn.itemconfig("button", fill="#ffa3a3")
             
             # deal with end value (wraparound)
-            if self.slider_var.get() >= len(self.all_events) - 1:
-                self.slider_var.set(0)
-
+            first, last = self.loop_bounds()
+            if not first <= self.position() < last:
+                self.set_position(first)
+
+            now = time.perf_counter()
+            self.player = PlaybackClock(self.playback_timeline(), speed=self.playback_speed())
+            self.player.loop = (first, last) if self.loop_var.get() else None
+            self.player.seek(self.position(), now)
+            self.next_frame_at = now
             self.run_realtime_autoplay()
         
         else:
@@ -174,38 +309,102 @@ class MotionVisualizer:
             
             # 3. Physically paint the button
             self.play_btn.itemconfig("button", fill="#91faff")
-        
+
+            # Playback frames may have come from keyframes; show the stopping point in full
+            self.update_plot()
+
+    def playback_timeline(self):
+        return build_timeline(self.events.column('eventTime'), self.events.column('pc_time'))
+
+    def playback_speed(self):
+        try:
+            return float(self.speed_var.get().rstrip("×"))
+        except ValueError:
+            return 1.0
+
+    def loop_bounds(self):
+        """(first, last) index in self.events of the loop range, or of everything shown when none is set."""
+        last = max(0, len(self.events) - 1)
+        if self.loop_range is None:
+            return 0, last
+        a, b = (n - self.events.base for n in self.loop_range)
+        return max(0, min(a, last)), max(0, min(b, last))
+
+    def on_speed_change(self, event=None):
+        if self.is_playing:
+            self.player.set_speed(self.playback_speed(), time.perf_counter())
+
+    def on_loop_change(self):
+        if self.is_playing:
+            self.player.loop = self.loop_bounds() if self.loop_var.get() else None
+        self.update_loop_label()
+
+    def set_loop_point(self, which):
+        """'[' / ']' mark the loop start / end at the current slider position."""
+        idx = int(self.slider_var.get())
+        first, last = self.loop_range or (0, max(0, self.total_events() - 1))
+        if which == "start":
+            first = idx
+            last = max(last, idx)
+        else:
+            last = idx
+            first = min(first, idx)
+        self.loop_range = (first, last)
+        self.on_loop_change()
+
+    def update_loop_label(self):
+        text = "" if self.loop_range is None else "loop %d–%d" % self.loop_range
+        self.loop_label.config(text=text)
+
     def run_realtime_autoplay(self):
 
-        """Calculates the time difference between events to play back at true speed."""
+        """One playback frame at the target fps: shows whichever event the device clock has reached."""
 
         if not self.is_playing:
             return
 
-        # Get current point (deal with wraparound)
-        curr_idx = int(self.slider_var.get())
-        if curr_idx < len(self.all_events) - 1:
+        now = time.perf_counter()
+        if len(self.player.timeline) != len(self.events):
+            self.player.set_timeline(self.playback_timeline()) # Live data arrived while playing
+
+        # Every event in the elapsed interval is covered by a single redraw
+        index, finished = self.player.position(now)
+        if finished and self.player.loop is None and self.events is not self.live:
+            # End of a window of spilled history: carry on into the next one
+            index = self.show_event(self.events.base + len(self.events), ahead=True)
+            self.player.seek(index, now)
+            finished = False
+        if self.events.base + index != int(self.slider_var.get()):
+            self.set_position(index)
+            self.update_plot(seek=True)
+            self.update_counter()
+
+        if finished:
+            self.toggle_play()
+            return
 
-            # Determine how long to wait before the next point
-            t1 = self.all_events[curr_idx]['pc_time']
-            t2 = self.all_events[curr_idx + 1]['pc_time']
+        # Stay on the frame grid; if rendering fell behind, skip the missed frames rather than queue them
+        interval = 1.0 / self.playback_fps
+        self.next_frame_at += interval
+        if self.next_frame_at < now:
+            self.next_frame_at = now + interval
+        self.root.after(max(1, int((self.next_frame_at - time.perf_counter()) * 1000)), self.run_realtime_autoplay)
 
-            # Convert to ms, capped at 1.1s to avoid boring long pauses
-            wait_ms = int(min((t2 - t1) * 1000, 1100))
-            
-            # Set slider to next index, update plot
-            self.slider_var.set(curr_idx + 1)
-            self.update_plot()
-            self.root.after(wait_ms, self.run_realtime_autoplay)
+    def on_slider_move(self, event):
+        """Scale callback, fired for every step of a drag: only the latest position gets rendered."""
+        self.pending_seek = int(float(event)) # Scale widget sends a string/float
+        if self.seek_after is None:
+            self.seek_after = self.root.after(SEEK_COALESCE_MS, self.apply_seek)
 
-        else:
-            self.is_playing = False
-            self.play_btn.itemconfig("text", text="▶ PLAY", bg="#91faff")
+    def apply_seek(self):
+        self.seek_after = None
+        current_selection, self.pending_seek = self.pending_seek, None
+        total = self.total_events()
+        index = self.show_event(current_selection) # Loads spilled history if the slider went back that far
+
+        if self.is_playing:
+            self.player.seek(index, time.perf_counter())
 
-    def on_slider_move(self, event):
-        total = len(self.all_events)
-        current_selection = int(float(event)) # Scale widget sends a string/float
-        
         # If the user drags the slider away from the end, stop following live
         if current_selection < total - 5:
             self.is_live = False
@@ -214,249 +413,279 @@ class MotionVisualizer:
             self.is_live = True
             self.action_label.config(text="● LIVE", fg="#4caf50")
             
-        self.update_plot()
+        self.update_plot(seek=True)
+        self.settle_plot()
+
+    def settle_plot(self):
+        """Redraws in full once seeking pauses for SEEK_SETTLE_MS (seek frames may come from a keyframe)."""
+        if self.settle_after is not None:
+            self.root.after_cancel(self.settle_after)
+        def settle():
+            self.settle_after = None
+            self.update_plot()
+        self.settle_after = self.root.after(SEEK_SETTLE_MS, settle)
     
+    def jump_slider_to_stroke(self, direction):
+        """Ctrl+Left/Right: move the slider to the end of the previous/next stroke."""
+        self.strokes.sync(self.events)
+        if not len(self.strokes):
+            return
+        cur = self.position()
+        sid = self.strokes.stroke_near(cur)
+        if direction > 0 and (sid < 0 or cur >= self.strokes.last_event(sid)):
+            sid += 1
+        elif direction < 0:
+            sid -= 1
+        if not 0 <= sid < len(self.strokes):
+            return
+        target = self.strokes.last_event(sid)
+        self.set_position(target)
+        self.on_slider_move(self.events.base + target)
+        self.update_counter()
+
+    # --- SLIDER POSITION (capture-wide event numbers, spilled events included) ---
+    def total_events(self):
+        return self.live.base + len(self.live)
+
+    def position(self):
+        """Index in self.events of the slider position (loading spilled history if it points there)."""
+        return self.show_event(int(self.slider_var.get()))
+
+    def set_position(self, index):
+        """Puts the slider on `index` of self.events."""
+        self.slider_var.set(self.events.base + index)
+
+    def update_counter(self):
+        self.counter_label.config(text=f"{int(self.slider_var.get())} / {self.total_events()-1}")
+
+    def show_event(self, number, ahead=False):
+        """Makes sure self.events holds capture-wide event `number` and returns its index there.
+
+        Spilled events are read back from the archive a window at a time:
+        centred on `number` for scrubbing, or starting at it (`ahead`) for playback.
+        """
+        if number >= self.live.base or not len(self.archive):
+            if self.events is not self.live:
+                self.switch_view(self.live, self.live_lines)
+        elif not self.events.base <= number < self.events.base + len(self.events):
+            window = self.retention.history_window
+            start = number if ahead else number - window // 2
+            start = max(0, min(start, len(self.archive) - window))
+            events, buf, offsets, first_line = self.archive.load(start, start + window)
+            lines = LineStore()
+            lines.load(buf, offsets, first_line)
+            self.switch_view(events, lines)
+        return max(0, min(number - self.events.base, len(self.events) - 1))
+
+    def switch_view(self, events, lines):
+        """Shows another part of the capture (live tail or spilled history). The selection stays if it's in it."""
+        selected = None if self.selected_point_idx is None else self.events.base + self.selected_point_idx
+        self.clear_terminal_highlight()
+        self.search_line = None
+        self.events = events
+        self.terminal.show(lines)
+        self.sync_indexes()
+        self.selected_point_idx = None
+        if selected is not None and 0 <= selected - events.base < len(events):
+            self.selected_point_idx = selected - events.base
+            self.sync_terminal_to_selection()
+        if self.is_playing:
+            self.player.set_timeline(self.playback_timeline())
+
+    def enforce_retention(self):
+        """Spills the oldest live events and their log lines to disk once memory is over the retention limit."""
+        count = self.retention.excess(self.live)
+        if not count:
+            return
+        with PROFILER.stage("spill"):
+            showing_live = self.events is self.live
+            selected = None if self.selected_point_idx is None else self.events.base + self.selected_point_idx
+            self.live, cut = spill(self.live, self.live_lines, self.archive, count)
+            if not showing_live:
+                self.live_lines.drop_head(cut)
+                return
+            self.clear_terminal_highlight()
+            self.terminal.drop_head(cut) # Same LineStore as live_lines
+            self.events = self.live
+            self.sync_indexes()
+            self.selected_point_idx = None
+            if selected is not None and selected >= self.live.base:
+                self.selected_point_idx = selected - self.live.base
+                self.sync_terminal_to_selection()
+            if self.is_playing:
+                self.player.set_timeline(self.playback_timeline())
+                self.player.seek(self.position(), time.perf_counter())
+
     def read_data(self):
+        """Chunk source for the ingest pipeline: the one given on the command line, else stdin when piped,
+        otherwise the tail of live_data.txt."""
+        if self.source is not None:
+            return self.source
         # Support for both file redirection and standard piping
         if not sys.stdin.isatty():
-            while True:
-                line = sys.stdin.readline()
-                if line: self.line_queue.put(line)
-        else:
-            if not os.path.exists(self.log_file): open(self.log_file, "w").close()
-            with open(self.log_file, "r") as f:
-                f.seek(0, 2)
-                while True:
-                    line = f.readline()
-                    if line: self.line_queue.put(line)
-                    else: time.sleep(0.01)
+            return PipeTailer(sys.stdin.buffer)
+        return FileTailer(self.log_file, from_end=True)
+
+    def apply_batch(self, batch):
+        """Runs on the Tk thread: store the raw lines, then the pre-parsed events pointing at them."""
+        with PROFILER.stage("terminal"):
+            if self.events is self.live:
+                first = self.terminal.extend(batch.lines)
+            else: # Scrolled back into spilled history: the terminal is showing old lines
+                first = self.live_lines.base + self.live_lines.extend(batch.lines)
+        cols = batch.columns
+        if len(cols['action']):
+            cols['log_line'] = first + cols['source_line']
+            with PROFILER.stage("apply"):
+                self.live.extend(cols)
+            PROFILER.count("events", len(cols['action']))
+        if self.journal and not self.importer: # A background import is a file already on disk
+            self.journal.append(cols, batch.lines)
 
     def process_queue(self):
-        new_points = False
-        while not self.line_queue.empty():
-            try:
-                line = self.line_queue.get_nowait()
-                
-                # 'end-1c' is the standard way to get the exact start of the new insertion
-                start_ptr = self.terminal.index("end-1c")
-                self.terminal.insert(tk.END, line)
-                
-                # --- BRIGHT SYNTAX HIGHLIGHTING ---
-                
-                # 1. Action (Blue) - matches action=ACTION_MOVE
-                act = re.search(r'action=[^, ]+', line)
-                if act:
-                    self.terminal.tag_add("action", f"{start_ptr} + {act.start()}c", f"{start_ptr} + {act.end()}c")
-                
-                # 2. Pointer 0 (Purple) - matches x[0]=... and y[0]=...
-                for m in re.finditer(r'[xy]\[0\]=[^, ]+', line):
-                    self.terminal.tag_add("x0", f"{start_ptr} + {m.start()}c", f"{start_ptr} + {m.end()}c")
-
-                # 3. Pointer 1 (Green) - matches x[1]=... and y[1]=...
-                for m in re.finditer(r'[xy]\[1\]=[^, ]+', line):
-                    self.terminal.tag_add("x1", f"{start_ptr} + {m.start()}c", f"{start_ptr} + {m.end()}c")
-                # 4. Parse for graph
-                data = self.parse_line(line)
-                if data:
-                    self.all_events.append(data)
-                    new_points = True
-                    
-            except queue.Empty:
-                break
-
-        if new_points:
-            total = len(self.all_events)
+        with PROFILER.stage("frame"):
+            self._process_queue()
+        self.root.after(self.frame_interval_ms, self.process_queue)
+
+    def _process_queue(self):
+        frame_start = time.perf_counter()
+        before = self.total_events()
+
+        # Apply as many ready batches as fit in this tick's budget; the rest wait for the next tick.
+        # A background import owns the store until it's done; live batches wait in their queue.
+        source = self.importer or self.pipeline
+        source.drain(self.apply_batch, self.frame_budget_ms)
+
+        # One coalesced redraw per tick, however many batches arrived
+        if self.total_events() > before:
+            if self.retention and not self.importer:
+                self.enforce_retention()
+            total = self.total_events()
             self.slider.config(to=max(0, total - 1))
             if self.is_live and not self.is_playing:
                 self.slider_var.set(total - 1)
+                self.show_event(total - 1)
+            self.sync_indexes()
+            if self.is_live and not self.is_playing:
                 self.update_plot()
-            self.counter_label.config(text=f"{int(self.slider_var.get())} / {total-1}")
-            self.terminal.see(tk.END)
-
-        self.root.after(20, self.process_queue)
-
-    def parse_line(self, line):
-        match = re.search(r'MotionEvent \{ (.*) \}', line)
-        if not match: return None
-        kv = re.findall(r'(\w+)(?:\[(\d+)\])?=([^, ]+)', match.group(1))
-        row = { (f"{k}_{i}" if i else k): (float(v) if '.' in v else int(v) if v.isdigit() else v) for k, i, v in kv }
-        row['timestamp_order'] = len(self.all_events)
-        row['pc_time'] = time.time() # Capture PC arrival time for playback deltas
-        return row
-
-    def update_plot(self):
-        self.ax.clear()
-        
-        # 1. Restore Axes and Labels
-        self.ax.set_xlabel("X-Axis (Sensor Range)", fontweight='bold', color='#5f6368')
-        self.ax.set_ylabel("Y-Axis (Sensor Range)", fontweight='bold', color='#5f6368')
-        self.ax.set_title("Live Replay: Multi-Touch Analytics", fontweight='bold', pad=10)
-        
-        if self.all_events:
-            limit = int(self.slider_var.get())
-            df = pd.DataFrame(self.all_events)
-            df_slice = df.iloc[:limit + 1] 
-            max_v = max(1, len(self.all_events))
-
-            # Color map base codes
-            p_neon = "#b651fa" # Purple
-            g_neon = "#25ff80" # Green
-
-            # Create colormaps that stay saturated even when "faded"
-            p_map = ListedColormap(sns.light_palette(p_neon, n_colors=256)[50:])
-            g_map = ListedColormap(sns.light_palette(g_neon, n_colors=256)[50:])       
-
-            # --- DRAW DATA POINTS ---
-            for p_idx in [0, 1]:
-                x_key, y_key = f'x_{p_idx}', f'y_{p_idx}'
-                cmap = p_map if p_idx == 0 else g_map
-                
-                if x_key in df_slice.columns:
-                    data = df_slice.dropna(subset=[x_key, y_key])
-                    if not data.empty:
-                        # A. ACTION_DOWN / POINTER_DOWN (Large Circle)
-                        down = data[data['action'].str.contains('DOWN', case=False, na=False)]
-                        self.ax.scatter(down[x_key], down[y_key], c=down['timestamp_order'], 
-                                        cmap=cmap, s=500, marker="o", edgecolors='white', 
-                                        alpha=0.9, picker=2, zorder=5, vmin=0, vmax=max_v,
-                                        gid=down.index.tolist())
-
-                        # B. ACTION_UP / POINTER_UP (Large X) - Highest Data Priority
-                        up = data[data['action'].str.contains('UP', case=False, na=False)]
-                        self.ax.scatter(up[x_key], up[y_key], c=up['timestamp_order'], 
-                                        cmap=cmap, s=350, marker="x", linewidths=4, 
-                                        alpha=1.0, picker=2, zorder=6, vmin=0, vmax=max_v,
-                                        gid=up.index.tolist())
-
-                        # C. ACTION_MOVE (Standard Dots/Diamonds) - Background Priority
-                        move = data[~data['action'].str.contains('UP|DOWN', case=False, na=False)]
-                        marker_m = "o" if p_idx == 0 else "D"
-                        self.ax.scatter(move[x_key], move[y_key], c=move['timestamp_order'], 
-                                        cmap=cmap, s=120 if p_idx==0 else 100, marker=marker_m, 
-                                        edgecolors='white', alpha=0.7, picker=2, zorder=2, vmin=0, vmax=max_v,
-                                        gid=move.index.tolist())
+            self.update_counter()
 
-        # Apply Graph Limits
-        try:
-            x_max = float(self.x_limit_var.get())
-            y_max = float(self.y_limit_var.get())
-            self.ax.set_xlim(0, x_max)
-            self.ax.set_ylim(0, y_max)
-            self.ax.set_xticks(np.linspace(0, x_max, 11))
-            self.ax.set_yticks(np.linspace(0, y_max, 6))
-            self.ax.grid(True, which='both', linestyle='--', alpha=0.3)
-        except:
-            pass
-
-        # --- SMART SELECTION HIGHLIGHT ---
-        if self.selected_point_idx is not None:
-            try:
-                row = self.all_events[self.selected_point_idx]
-                action = str(row.get('action', '')).upper()
-                is_up = "UP" in action
-                is_down = "DOWN" in action
+        if self.importer:
+            self.import_progress['value'] = self.importer.progress
+            if self.importer.finished and not self.importer.queue_depth:
+                self.finish_import()
 
-                # Determine Highlight Size and Shape
-                s_size = 800 if is_down else (500 if is_up else 450)
-                
-                # --- Highlight P0 (Purple) ---
-                if 'x_0' in row:
-                    h_p0 = "x" if (is_up and ("ACTION_UP" in action or "(0)" in action)) else "o"
-                    color_p0 = "#d8b4fe"
-                    
-                    if h_p0 == "x":
-                        self.ax.scatter(row['x_0'], row['y_0'], s=s_size, marker="x",
-                                        c=color_p0, linewidths=5, zorder=10)
-                    else:
-                        self.ax.scatter(row['x_0'], row['y_0'], s=s_size, marker=h_p0,
-                                        facecolors='none', edgecolors=color_p0, 
-                                        linewidths=4, zorder=10)
-                    # Precision Bullseye
-                    self.ax.scatter(row['x_0'], row['y_0'], s=50, color='white', edgecolors='black', zorder=11)
-
-                # --- Highlight P1 (Green) ---
-                if 'x_1' in row and not pd.isna(row['x_1']):
-                    # Check if P1 is the one specifically lifting or touching down
-                    h_p1 = "x" if (is_up and ("(1)" in action or "ACTION_UP" in action)) else ("o" if is_down else "D")
-                    color_p1 = "#4ade80"
-                    
-                    if h_p1 == "x":
-                        self.ax.scatter(row['x_1'], row['y_1'], s=s_size, marker="x",
-                                        c=color_p1, linewidths=5, zorder=10)
-                    else:
-                        self.ax.scatter(row['x_1'], row['y_1'], s=s_size, marker=h_p1,
-                                        facecolors='none', edgecolors=color_p1, 
-                                        linewidths=4, zorder=10)
-                    # Precision Bullseye
-                    self.ax.scatter(row['x_1'], row['y_1'], s=50, marker=h_p1 if h_p1 != "x" else "o",
-                                    color='white', edgecolors='black', zorder=11)
-            except IndexError:
-                pass
+        self.present_frame()
+        if self.journal:
+            for path, error in self.journal.finished():
+                self.export_done(path, error)
 
-        # --- ADD EXTERNAL LEGEND ---
+        self.pipeline.end_frame((time.perf_counter() - frame_start) * 1000, self.frame_interval_ms)
+        status = f"queue {self.pipeline.queue_depth} | dropped {self.pipeline.stats.dropped_frames}"
+        if status != self.pipeline_label.cget("text"):
+            self.pipeline_label.config(text=status)
 
-        # 1. Define the icons for the legend
+    def update_plot(self, seek=False):
+        """Asks the render worker for a frame of the current state (superseding one it hasn't started).
 
-        # We use empty scatter plots or Line2D objects as "Proxies"
-        legend_elements = [
-            # Action Icons
-            Patch(facecolor='#d8b4fe', edgecolor='#af7ac5', label='Pointer 0 (Purple)'),
-            Line2D([0], [0], marker='o', color='#d8b4fe', label='Touch Down (pointer 0)', markerfacecolor='#d8b4fe', markersize=15, markeredgecolor='#af7ac5', linestyle='None'),
-            Line2D([0], [0], marker='o', color='#d8b4fe', label='Move (pointer 0)', markerfacecolor='#d8b4fe', markersize=8, markeredgecolor='#af7ac5', linestyle='None'),
-            Line2D([0], [0], marker='x', color='#d8b4fe', label='Lift Off (pointer 0)', markersize=15, markeredgewidth=5, linestyle='None'),
-            
-            Patch(facecolor='#4ade80', edgecolor='#27ae60', label='Pointer 1 (Green)'),
-            Line2D([0], [0], marker='D', color='#4ade80', label='Touch Down (pointer 1)', markerfacecolor='#4ade80', markersize=15, markeredgecolor='#27ae60', linestyle='None'),
-            Line2D([0], [0], marker='D', color='#4ade80', label='Move (pointer 1)', markerfacecolor='#4ade80', markersize=8, markeredgecolor='#27ae60', linestyle='None'),
-            Line2D([0], [0], marker='x', color='#4ade80', label='Lift Off (pointer 1)', markersize=15, markeredgewidth=5, linestyle='None')
-
-        ]
-
-        # 2. Place the legend outside the plotting area
-        leg = self.ax.legend(
-            handles=legend_elements, 
-            loc='upper left', 
-            bbox_to_anchor=(1.02, 1.0), # Bring it closer to the graph edge
-            borderaxespad=0,
-            title="Touch Key", 
-            fontsize=9,
-            frameon=True,
-            facecolor='#f8f9fa',
-            # --- VERTICAL SPACING ---
-            labelspacing=2,        # High vertical gap for clarity
-            handletextpad=1.0,     # Space between icon and text
-            borderpad=1.2          # Internal padding
-        )
-        
-        # Apply Bold Weight to the title
-        leg.get_title().set_fontweight('bold')
-        leg.get_title().set_fontsize(10)
-        
-        # --- KILL WHITE SPACE ---
-        # 0.88: graph takes up 88% of the width, leaving just enough for the legend
-        self.fig.subplots_adjust(right=0.98, left=0.08, top=0.92, bottom=0.12)        
-        # Adjust layout to make room for the legend
-        self.fig.tight_layout(rect=[0, 0, 0.98, 1])
+        seek=True (scrubbing, playback) lets it draw from the nearest keyframe.
+        """
+        self.render_worker.request(self.frame_request(seek))
 
-        self.canvas_widget.draw_idle()
+    def frame_request(self, seek=False):
+        """Snapshot of everything the plot shows, for the render worker."""
+        # Apply Graph Limits
+        try:
+            limits = (float(self.x_limit_var.get()), float(self.y_limit_var.get()))
+        except ValueError:
+            limits = None
+
+        coverage = self.render_worker.snapshot_coverage(self.current_coverage())
+        limit = self.position()
+        stroke_path = None
+        if self.selected_point_idx is not None:
+            sid = self.strokes.stroke_of(self.selected_point_idx)
+            if sid >= 0:
+                stroke_path = self.strokes.path(sid, limit)
+        size = (round(self.fig.bbox.width), round(self.fig.bbox.height))
+        return FrameRequest(self.events, limit, self.selected_point_idx, stroke_path, coverage, limits, size,
+                            self.fig.dpi, seek)
+
+    def present_frame(self):
+        """Shows the newest frame the render worker finished and hands back finished PNG exports."""
+        frame, exports = self.render_worker.results()
+        if frame is not None:
+            self.canvas_widget.show(frame)
+        for done, result, error in exports:
+            # Outside this tick: their dialogs would otherwise hold up the ingest loop
+            self.root.after_idle(done, result, error)
+
+    def current_coverage(self):
+        """The CoverageMap sized to the axis limits and showing the chosen layers, or None when the heatmap is off."""
+        if not self.heatmap_var.get():
+            return None
+        try:
+            self.coverage.resize(float(self.x_limit_var.get()), float(self.y_limit_var.get()))
+        except ValueError:
+            if self.coverage.shape is None:
+                return None
+        pointer = self.heat_pointer_var.get()
+        action = self.heat_action_var.get()
+        self.coverage.select(None if pointer.startswith("All") else int(pointer.split()[-1]),
+                             None if action.startswith("All") else KIND_CODES[action.lower()])
+        with PROFILER.stage("index"):
+            self.sync_coverage()
+        return self.coverage
+
+    def sync_coverage(self):
+        """Brings the heatmap up to date with the capture, re-reading spilled segments when it starts over."""
+        if self.coverage.shape is not None and self.live.base and not self.coverage.continues(self.live):
+            for events, _, _ in self.archive.parts():
+                self.coverage.sync(events)
+        self.coverage.sync(self.live)
+
+    def dump_profile(self):
+        """Writes the per-stage summary (calls, total, mean, p50, p99) next to the timing log or to a new CSV."""
+        if not PROFILER.stages():
+            messagebox.showinfo("Profiler", "Nothing recorded yet. Press F12 to start profiling.")
+            return
+        path = self.get_timestamp_filename("csv").replace("TouchLog", "ProfileSummary")
+        if PROFILER.log_path:
+            path = os.path.join(os.path.dirname(os.path.abspath(PROFILER.log_path)), path)
+        PROFILER.flush()
+        PROFILER.dump(path)
+        self.action_label.config(text=f"● PROFILE SAVED: {os.path.basename(path)}", fg="#4caf50")
     
     def clear_data(self):
-        self.all_events = []; self.terminal.delete('1.0', tk.END); self.slider_var.set(0); self.update_plot()
+        self.highlighted_line = None
+        self.search_line = None
+        self.loop_range = None; self.update_loop_label()
+        self.archive.clear()
+        if self.journal:
+            self.journal.reset()
+        if self.events is not self.live:
+            self.events = self.live
+            self.terminal.show(self.live_lines)
+        self.events.clear(); self.terminal.clear(); self.slider_var.set(0); self.update_plot()
         # if os.path.exists(self.log_file): open(self.log_file, "w").close()
 
     def get_timestamp_filename(self, extension):
         """Generates a filename based on the first data point's timestamp."""
-        if not self.all_events:
+        if not self.events:
             # Fallback to current time if no data exists
             ts = time.strftime("%Y%m%d-%H%M%S")
         else:
             # Use the 'pc_time' from the very first event (index 0)
-            first_ts = self.all_events[0]['pc_time']
+            first_ts = self.events.column('pc_time')[0]
             ts = time.strftime("%Y%m%d-%H%M%S", time.localtime(first_ts))
         
         return f"TouchLog_{ts}.{extension}"
 
     def copy_to_clipboard(self):
+        # Rendered by the worker like every frame; copy_png gets the PNG bytes
+        self.render_worker.export(self.frame_request(), dpi=150, done=self.copy_png)
+
+    def copy_png(self, png, error):
         import io
         import time
         from PIL import Image
@@ -464,11 +693,10 @@ class MotionVisualizer:
         import win32con # Add this import for constant definitions
 
         try:
+            if error is not None:
+                raise error
             # 1. Image Processing
-            buf = io.BytesIO()
-            self.fig.savefig(buf, format='png', dpi=150)
-            buf.seek(0)
-            img = Image.open(buf)
+            img = Image.open(io.BytesIO(png))
             
             output = io.BytesIO()
             img.convert("RGB").save(output, "BMP")
@@ -509,67 +737,157 @@ class MotionVisualizer:
             title="Save PNG Plot"
         )
         if path: 
-            self.fig.savefig(path, dpi=300)
-            messagebox.showinfo("Success", f"Saved to {os.path.basename(path)}")
+            self.render_worker.export(self.frame_request(), path, dpi=300, done=self.plot_saved)
+
+    def plot_saved(self, path, error):
+        if error is not None:
+            messagebox.showerror("Error", f"Failed to save: {error}")
+            return
+        messagebox.showinfo("Success", f"Saved to {os.path.basename(path)}")
 
-    def export_csv(self):
-        if not self.all_events:
+    def export_session(self):
+        """Saves a native session file (events + raw log + metadata), or CSV for interchange."""
+        if not self.total_events():
             return
-        default_name = self.get_timestamp_filename("csv")
+        default_name = self.get_timestamp_filename(SESSION_EXT.lstrip("."))
         path = filedialog.asksaveasfilename(
-            defaultextension=".csv",
+            defaultextension=SESSION_EXT,
             initialfile=default_name,
-            title="Export CSV Data"
+            filetypes=[("Touch Session", f"*{SESSION_EXT}"), ("CSV Files", "*.csv")],
+            title="Export Touch Session"
         )
-        if path: 
-            pd.DataFrame(self.all_events).to_csv(path, index=False)
-            messagebox.showinfo("Success", f"Exported to {os.path.basename(path)}")
+        if not path:
+            return
+        total_lines = self.live_lines.base + len(self.live_lines)
+        if (not path.lower().endswith('.csv') and self.journal
+                and self.journal.covers(self.total_events(), total_lines)):
+            # The journal already holds the whole capture: the writer thread turns it into the session file
+            arrays, meta = self.export_extras()
+            self.journal.finalize(path, {name: layer.copy() for name, layer in arrays.items()}, **meta)
+            self.action_label.config(text="● EXPORTING", fg="#f4b400")
+            return
+        error = None
+        try:
+            self.write_export(path)
+        except Exception as e:
+            error = e
+        # Dialogs run the Tk loop (live batches keep arriving), so the export's buffer views must be gone by now
+        if error is not None:
+            messagebox.showerror("Export Error", f"Failed to export: {error}")
+            return
+        messagebox.showinfo("Success", f"Exported to {os.path.basename(path)}")
+
+    def export_done(self, path, error):
+        """An export finalized from the journal has been written (or failed)."""
+        if error is not None:
+            self.action_label.config(text="● READY", fg="#4285f4")
+            messagebox.showerror("Export Error", f"Failed to export: {error}")
+            return
+        self.action_label.config(text=f"● EXPORTED {os.path.basename(path)}", fg="#4caf50")
+        self.root.after(4000, lambda: self.action_label.config(text="● READY", fg="#4285f4"))
+
+    def export_extras(self):
+        """(coverage arrays, metadata) saved with every export."""
+        # The coverage heatmap goes along even if it was never shown
+        if self.coverage.shape is None:
+            try:
+                self.coverage.resize(float(self.x_limit_var.get()), float(self.y_limit_var.get()))
+            except ValueError:
+                pass
+        self.sync_coverage()
+        return self.coverage.arrays(), dict(coverage=self.coverage.meta(), x_limit=self.x_limit_var.get(),
+                                            y_limit=self.y_limit_var.get())
+
+    def write_export(self, path):
+        arrays, meta = self.export_extras()
+        # Spilled segments first, then the in-memory tail; streamed piece by piece
+        parts = self.archive.parts() + [(self.live,) + self.live_lines.raw()]
+        if path.lower().endswith('.csv'):
+            pointers = sorted(set().union(*(events.pointers_used() for events, _, _ in parts)))
+            for k, (events, _, _) in enumerate(parts):
+                events.to_frame(pointers=pointers).to_csv(path, index=False, mode='w' if k == 0 else 'a', header=k == 0)
+            np.savez_compressed(path.rsplit('.', 1)[0] + "_coverage.npz", **arrays)
+        else:
+            save_session_parts(path, parts, extra_arrays=arrays, **meta)
 
-    def import_session(self):
+    def import_session(self, path=None):
         # Open file dialog for both types
-        path = filedialog.askopenfilename(
-            filetypes=[("Touch Data", "*.csv *.txt"), ("CSV Files", "*.csv"), ("Text Logs", "*.txt")],
-            title="Import Touch Session"
-        )
+        if path is None:
+            path = filedialog.askopenfilename(
+                filetypes=[("Touch Data", f"*{SESSION_EXT} *.csv *.txt"), ("Touch Session", f"*{SESSION_EXT}"),
+                           ("CSV Files", "*.csv"), ("Text Logs", "*.txt")],
+                title="Import Touch Session"
+            )
         if not path: return
+        if self.importer:
+            messagebox.showwarning("Import Running", "Cancel or wait for the current import first.")
+            return
 
         try:
             self.clear_data()
             filename = os.path.basename(path)
-            
-            if path.endswith('.csv'):
+            parsed = True # False when nothing was parsed (session file or cache hit)
+
+            if path.lower().endswith(SESSION_EXT):
+                # --- NATIVE SESSION: memory-mapped, nothing is parsed or rebuilt ---
+                session = load_session(path)
+                self.events = session.events
+                self.terminal.load(session.line_buf, session.line_offsets)
+                meta = session.meta
+                if meta.get('x_limit'): self.x_limit_var.set(meta['x_limit'])
+                if meta.get('y_limit'): self.y_limit_var.set(meta['y_limit'])
+                self.coverage.restore(session.extras, meta.get('coverage'), self.events)
+                parsed = False
+
+            elif not path.endswith('.csv') and os.path.getsize(path) >= BULK_IMPORT_MIN_BYTES:
+                # --- LARGE TXT: cache lookup (a hash of the whole file) and parse both run in the background ---
+                self.start_import(path)
+                return
+
+            elif self.load_cached(path):
+                # --- SAME CONTENT IMPORTED BEFORE: memory-mapped from the cache, nothing is parsed ---
+                filename += " (cached)"
+                parsed = False
+
+            elif path.endswith('.csv'):
                 # --- CSV LOGIC ---
                 df = pd.read_csv(path)
-                self.all_events = df.to_dict('records')
-                self.terminal.insert(tk.END, f"--- RECONSTRUCTING LOG FROM {filename} ---\n\n")
+                self.events = EventStore.from_frame(df)
+                self.terminal.extend([f"--- RECONSTRUCTING LOG FROM {filename} ---", ""])
                 
-                for row in self.all_events:
-                    # Reconstruct line for terminal display/syncing
-                    p0 = f"x[0]={row.get('x_0', 0)}, y[0]={row.get('y_0', 0)}"
-                    p1 = f", x[1]={row.get('x_1', '')}, y[1]={row.get('y_1', '')}" if not pd.isna(row.get('x_1')) else ""
-                    line = f"MotionEvent {{ action={row.get('action', 'MOVE')}, {p0}{p1}, eventId={row.get('eventId', '0')} }}\n"
-                    
-                    start_ptr = self.terminal.index("end-1c")
-                    self.terminal.insert(tk.END, line)
-                    self._apply_terminal_tags(line, start_ptr) # Helper for highlighting
+                lines = []
+                for i in range(len(self.events)):
+                    # Reconstruct line for terminal display/syncing, one x[p]/y[p] pair per pointer present
+                    row = self.events.row(i)
+                    coords = ", ".join(f"x[{p}]={row[f'x_{p}']}, y[{p}]={row[f'y_{p}']}"
+                                       for p in mask_pointers(self.events.column('pointer_mask')[i]))
+                    lines.append(f"MotionEvent {{ action={row.get('action', 'MOVE')}, {coords}, eventId={row.get('eventId', '0')} }}")
+
+                first_line = self.terminal.extend(lines)
+                self.events.column('log_line')[:] = first_line + np.arange(len(self.events))
 
             else:
                 # --- TXT LOGIC ---
-                self.terminal.insert(tk.END, f"--- PARSING RAW LOG FROM {filename} ---\n\n")
+                self.terminal.extend([f"--- PARSING RAW LOG FROM {filename} ---", ""])
                 with open(path, 'r') as f:
-                    for line in f:
-                        # Insert into terminal
-                        start_ptr = self.terminal.index("end-1c")
-                        self.terminal.insert(tk.END, line)
-                        self._apply_terminal_tags(line, start_ptr)
-                        
-                        # Parse and add to data list
-                        parsed = self.parse_line(line)
-                        if parsed:
-                            self.all_events.append(parsed)
+                    lines = f.readlines()
+
+                # Into the log view's backing store; only the visible window gets rendered
+                first_line = self.terminal.extend(lines)
+
+                # Parse the whole file in one batch straight into the event store
+                cols = parse_lines(lines, max_pointers=self.events.max_pointers)
+                cols['log_line'] = first_line + cols['source_line']
+                self.events.extend(cols)
+
+            if parsed:
+                self.store_in_cache(path)
 
             # --- COMMON UI UPDATES ---
-            total = len(self.all_events)
+            self.live = self.events
+            self.restart_journal()
+            self.sync_indexes()
+            total = len(self.events)
             self.slider.config(to=max(0, total - 1))
             self.slider_var.set(total - 1)
             self.counter_label.config(text=f"{total-1} / {total-1}")
@@ -580,63 +898,154 @@ class MotionVisualizer:
         except Exception as e:
             messagebox.showerror("Import Error", f"Failed to load file: {e}")
 
-    def _apply_terminal_tags(self, line, start_ptr):
-        """Helper to keep highlighting consistent across live and imported data."""
-        act = re.search(r'action=[^, ]+', line)
-        if act:
-            self.terminal.tag_add("action", f"{start_ptr} + {act.start()}c", f"{start_ptr} + {act.end()}c")
-        
-        for m in re.finditer(r'[xy]\[0\]=[^, ]+', line):
-            self.terminal.tag_add("x0", f"{start_ptr} + {m.start()}c", f"{start_ptr} + {m.end()}c")
-
-        for m in re.finditer(r'[xy]\[1\]=[^, ]+', line):
-            self.terminal.tag_add("x1", f"{start_ptr} + {m.start()}c", f"{start_ptr} + {m.end()}c")
-
-    def on_pick(self, event):
-        self.pick_lock = True
-        self.root.after(100, lambda: setattr(self, 'pick_lock', False))
+    def load_cached(self, path):
+        """Loads `path` from the session cache if the same content was parsed before. True on a hit."""
+        try:
+            session = self.session_cache.get(path)
+        except OSError:
+            return False
+        if session is None:
+            return False
+        self.events = session.events
+        self.terminal.load(session.line_buf, session.line_offsets)
+        return True
+
+    def store_in_cache(self, path):
+        """Saves the freshly parsed import so the next import of the same file skips parsing.
+
+        Hashing the file and writing the session take seconds for a big log,
+        so they run on a thread, from snapshots that later appends leave alone.
+        Not a daemon: quitting mid-write waits for the entry instead of leaving half of one.
+        """
+        if not self.session_cache.enabled:
+            return
+        events = self.events.slice(0)
+        buf, offsets = self.terminal.lines.snapshot()
+        threading.Thread(target=self._store_in_cache, args=(path, events, buf, offsets)).start()
 
+    def _store_in_cache(self, path, events, buf, offsets):
         try:
-            # 1. Get the list of global indices we attached to this scatter plot
-            full_indices = event.artist.get_gid()
-            
-            if full_indices is not None:
-                # 2. Get the specific index for the dot that was clicked
-                # event.ind[0] is the local index, full_indices maps it to global
-                actual_global_idx = full_indices[event.ind[0]]
-                
-                # 3. Set the selection to that exact global row
-                picked_row = self.all_events[actual_global_idx]
-                self.selected_point_idx = int(picked_row['timestamp_order'])
-                
-                self.sync_terminal_to_selection()
-                self.update_plot()
+            self.session_cache.put(path, events, buf, offsets)
         except Exception as e:
-            print(f"Pick Error: {e}")
-            
-    def reset_pick_lock(self):
-        self.pick_lock = False
+            # The import itself worked; a full disk or read-only cache dir only costs the next import
+            print(f"Session cache: could not store {os.path.basename(path)}: {e}", file=sys.stderr)
+
+    def start_import(self, path):
+        """Starts a background ParallelImport; process_queue drains it and finish_import wraps up."""
+        self.terminal.extend([f"--- PARSING RAW LOG FROM {os.path.basename(path)} (background) ---", ""])
+        self.importer = ParallelImport(path, max_pointers=self.events.max_pointers,
+                                       cache=self.session_cache if self.session_cache.enabled else None).start()
+        self.is_live = True # Follow the import so the plot grows with it
+        self.import_progress['value'] = 0
+        self.import_frame.pack(side=tk.RIGHT, padx=10, before=self.slider)
+        self.action_label.config(text="● IMPORTING", fg="#f4b400")
+
+    def cancel_import(self):
+        if self.importer:
+            self.importer.cancel()
+
+    def finish_import(self):
+        importer, self.importer = self.importer, None
+        self.import_frame.pack_forget()
+        if importer.cached is not None: # Same content imported before: nothing was parsed or queued
+            self.live = self.events = importer.cached.events
+            self.terminal.load(importer.cached.line_buf, importer.cached.line_offsets)
+        self.restart_journal()
+        self.sync_indexes()
+        total = len(self.events)
+        self.slider.config(to=max(0, total - 1))
+        self.slider_var.set(max(0, total - 1))
+        self.counter_label.config(text=f"{total-1} / {total-1}")
+        self.is_live = False
+        self.action_label.config(text="● READY", fg="#4285f4")
+        self.update_plot()
+
+        filename = os.path.basename(importer.path)
+        if importer.cached is not None:
+            filename += " (cached)"
+        elif not importer.error and not importer.cancelled:
+            self.store_in_cache(importer.path)
+        if importer.error:
+            messagebox.showerror("Import Error", f"Failed to load file: {importer.error}")
+        elif importer.cancelled:
+            messagebox.showinfo("Import Cancelled", f"Stopped after {total} events from {filename}")
+        else:
+            messagebox.showinfo("Success", f"Loaded {total} events from {filename}")
+
+    def restart_journal(self):
+        """After an import: the journal only needs live data from here on (the imported file is on disk)."""
+        if self.journal:
+            self.journal.reset(self.total_events(), self.live_lines.base + len(self.live_lines))
+
+    def offer_recovery(self):
+        """Offers to load captures whose journal was left behind by a run that crashed or was killed."""
+        for path in orphaned_journals():
+            try:
+                info = read_info(path)
+            except (OSError, ValueError):
+                discard_journal(path)
+                continue
+            if not info["events"]:
+                discard_journal(path)
+                continue
+            started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(info["started"]))
+            answer = messagebox.askyesnocancel(
+                "Recover Capture",
+                f"A capture started {started} ({info['events']:,} events) was not saved before the app closed.\n\n"
+                "Yes: recover and open it\nNo: discard it\nCancel: ask again next time")
+            if answer is None:
+                continue
+            if not answer:
+                discard_journal(path)
+                continue
+            dest = os.path.splitext(path)[0] + SESSION_EXT
+            try:
+                recover_journal(path, dest)
+            except Exception as e:
+                messagebox.showerror("Recovery Error", f"Failed to recover the capture: {e}")
+                continue
+            discard_journal(path)
+            self.import_session(dest)
+            return # One capture on screen at a time; any others are offered on the next start
+
+    def sync_indexes(self):
+        """Brings the spatial and stroke indexes up to date with the event store."""
+        with PROFILER.stage("index"):
+            self.spatial.sync(self.events)
+            self.strokes.sync(self.events)
+            self.timing.sync(self.events)
+            self.sync_coverage()
+
+    def open_stats(self):
+        """Opens (or raises) the timing analytics window."""
+        if self.stats_panel is not None and self.stats_panel.winfo_exists():
+            self.stats_panel.lift()
+            return
+        self.stats_panel = StatsPanel(self.root, self.timing, lambda: self.events,
+                                      default_name=self.get_timestamp_filename("csv").replace("TouchLog", "TimingStats"))
+
+    def pick_nearest(self, event, max_px=float('inf')):
+        """Returns the timestamp_order of the visible point closest to the mouse (in screen pixels)."""
+        self.spatial.sync(self.events)
+        x0, x1 = self.ax.get_xlim()
+        y0, y1 = self.ax.get_ylim()
+        bbox = self.ax.get_window_extent()
+        scale = (bbox.width / (x1 - x0), bbox.height / (y1 - y0))
+        hit = self.spatial.nearest(event.xdata, event.ydata, self.position(),
+                                   scale=scale, max_dist=max_px)
+        return None if hit is None else hit[0]
 
     def on_scroll(self, event):
         """Scrolls through events chronologically. If none selected, snaps to closest."""
-        if event.inaxes != self.ax or not self.all_events:
+        if event.inaxes != self.ax or not self.events:
             return
 
         # 1. If nothing is selected, find the closest point to the mouse to begin
         if self.selected_point_idx is None:
-            limit = int(self.slider_var.get())
-            df = pd.DataFrame(self.all_events).iloc[:limit + 1]
-            
-            distances = []
-            for i, row in df.iterrows():
-                d0 = np.sqrt((row['x_0'] - event.xdata)**2 + (row['y_0'] - event.ydata)**2)
-                distances.append((d0, row['timestamp_order']))
-                if 'x_1' in row and not pd.isna(row['x_1']):
-                    d1 = np.sqrt((row['x_1'] - event.xdata)**2 + (row['y_1'] - event.ydata)**2)
-                    distances.append((d1, row['timestamp_order']))
-            
-            distances.sort()
-            self.selected_point_idx = distances[0][1] # Grab the timestamp_order of the closest
+            closest = self.pick_nearest(event)
+            if closest is None:
+                return
+            self.selected_point_idx = closest
         
         else:
             # 2. If a point IS selected, scroll based on Time (timestamp_order)
@@ -645,7 +1054,7 @@ class MotionVisualizer:
             new_idx = self.selected_point_idx + direction
             
             # Constraints: Don't scroll past 0 or the current slider limit
-            limit = int(self.slider_var.get())
+            limit = self.position()
             if 0 <= new_idx <= limit:
                 self.selected_point_idx = new_idx
 
@@ -654,8 +1063,13 @@ class MotionVisualizer:
         self.update_plot()
 
     def on_key_press(self, event):
-        """Allows using Up/Down arrow keys to navigate events when a point is selected."""
-        if self.selected_point_idx is None or not self.all_events:
+        """Up/Down arrow keys step through events; Page Up/Down jump between strokes."""
+        if not self.events:
+            return
+        if event.key in ('pageup', 'pagedown'):
+            self.jump_selection_to_stroke(-1 if event.key == 'pageup' else 1)
+            return
+        if self.selected_point_idx is None:
             return
 
         # Map keys to directions
@@ -673,61 +1087,120 @@ class MotionVisualizer:
         new_idx = self.selected_point_idx + direction
         
         # Constraints: Stay within 0 and the current slider limit
-        limit = int(self.slider_var.get())
+        limit = self.position()
         if 0 <= new_idx <= limit:
             self.selected_point_idx = new_idx
             self.sync_terminal_to_selection()
             self.update_plot()
         
+    def jump_selection_to_stroke(self, direction):
+        """Selects the first event of the previous/next stroke (starting from the slider if nothing is selected)."""
+        self.strokes.sync(self.events)
+        limit = self.position()
+        cur = limit if self.selected_point_idx is None else self.selected_point_idx
+        target = self.strokes.next_start(cur) if direction > 0 else self.strokes.prev_start(cur)
+        if target is None or target > limit:
+            return
+        self.selected_point_idx = target
+        self.sync_terminal_to_selection()
+        self.update_plot()
+
+    def show_stroke_info(self):
+        sid = -1 if self.selected_point_idx is None else self.strokes.stroke_of(self.selected_point_idx)
+        if sid < 0:
+            self.stroke_label.config(text="")
+            return
+        info = self.strokes.info(sid)
+        self.stroke_label.config(text=f"stroke {sid} | P{info['pointer']} | {info['samples']} pts | "
+                                      f"{info['duration_ms']} ms | {info['length']:.1f} units")
+
     def sync_terminal_to_selection(self):
-        """Finds the selected point's data and highlights it in the terminal."""
+        """Jumps to the selected point's log line and highlights it in the terminal."""
+        self.show_stroke_info()
         if self.selected_point_idx is None: return
         
-        df = pd.DataFrame(self.all_events)
-        clicked_row = df[df['timestamp_order'] == self.selected_point_idx].iloc[0]
-        
-        is_p1 = 'x_1' in clicked_row and not pd.isna(clicked_row['x_1'])
-        event_id = clicked_row.get('eventId', None)
-        
-        if event_id:
-            search_str = f"eventId={event_id}"
-            self.terminal.tag_remove("highlight_p0", "1.0", tk.END)
-            self.terminal.tag_remove("highlight_p1", "1.0", tk.END)
-            
-            pos = self.terminal.search(search_str, "1.0", stopindex=tk.END)
-            if pos:
-                line_start = f"{pos.split('.')[0]}.0"
-                line_end = f"{pos.split('.')[0]}.end"
-                tag = "highlight_p1" if is_p1 else "highlight_p0"
-                color = "#4ade80" if is_p1 else "#d8b4fe"
-                
-                self.terminal.tag_add(tag, line_start, line_end)
-                self.terminal.tag_config(tag, background=color, foreground="#000000")
-                self.terminal.see(line_start)
+        line_no = int(self.events.column('log_line')[self.selected_point_idx])
+        # Colour of the highest pointer in the event (the one that was added last)
+        mask = int(self.events.column('pointer_mask')[self.selected_point_idx])
+        tag = f"highlight_p{max(0, mask.bit_length() - 1)}"
+
+        # Only the previously highlighted line needs its tag removed
+        self.clear_terminal_highlight()
+        if line_no < 0:
+            return
 
-    def on_canvas_click(self, event):
-        """Clears selection if clicking on the empty background of the plot."""
+        self.terminal.highlight(line_no, tag)
+        self.terminal.see(line_no)
+        self.highlighted_line = line_no
 
-        if getattr(self, 'pick_lock', False):
+    def clear_terminal_highlight(self):
+        if self.highlighted_line is None:
             return
-        
+        self.terminal.unhighlight(self.highlighted_line)
+        self.highlighted_line = None
+
+    def find_in_log(self):
+        """Ctrl+F: finds the next log line containing the text, searching the whole history."""
+        query = simpledialog.askstring("Search Log", "Find:", parent=self.root)
+        if not query:
+            return
+        start = 0 if self.search_line is None else self.search_line + 1
+        hit = self.terminal.search(query, start)
+        if hit < 0 and start > 0:
+            hit = self.terminal.search(query, 0) # wrap around
+        if self.search_line is not None:
+            self.terminal.unhighlight(self.search_line)
+        if hit < 0:
+            self.search_line = None
+            messagebox.showinfo("Search Log", f"'{query}' not found")
+            return
+        self.search_line = hit
+        self.terminal.highlight(hit, "search")
+        self.terminal.see(hit)
+
+    def on_canvas_click(self, event):
+        """Selects the point under the mouse, or clears selection on empty background."""
+
         # 1. Ignore if we clicked outside the axes (like on the labels or buttons)
-        if event.inaxes != self.ax:
+        if event.inaxes != self.ax or event.button != 1:
             return
-            
-        # 2. Matplotlib sets event.canvas.widgetlock when a 'pick' happens.
-        # If the mouse isn't over a specific dot, we clear the selection.
-        # We also check if it's a left-click (button 1)
-        if event.button == 1:
-            # We add a tiny delay or check to ensure on_pick didn't just fire
+
+        # 2. Look the click up in the spatial index instead of per-artist picking
+        picked = self.pick_nearest(event, max_px=PICK_RADIUS_PX) if self.events else None
+
+        if picked is not None:
+            self.selected_point_idx = picked
+            self.sync_terminal_to_selection()
+        else:
             # If the user clicks empty space, reset everything
             self.selected_point_idx = None
             
-            # Remove terminal highlights
-            self.terminal.tag_remove("highlight_p0", "1.0", tk.END)
-            self.terminal.tag_remove("highlight_p1", "1.0", tk.END)
+            # Remove terminal highlight
+            self.clear_terminal_highlight()
+            self.show_stroke_info()
             
-            self.update_plot()
+        self.update_plot()
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Live MotionEvent visualizer")
+    ap.add_argument("--adb", nargs="?", const="", metavar="SERIAL",
+                    help="run adb logcat directly instead of tailing live_data.txt (optionally for one device)")
+    ap.add_argument("--tag", default=LOGCAT_TAG, help="logcat tag to follow with --adb")
+    ap.add_argument("--replay", metavar="LOG", help="feed a recorded log through the live pipeline")
+    ap.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier (0 = as fast as possible)")
+    ap.add_argument("--loop", action="store_true", help="start the replay over when it ends")
+    ap.add_argument("--keep-events", type=int, metavar="N",
+                    help="keep only the last N events in memory; older ones move to disk (for long soak runs)")
+    ap.add_argument("--keep-minutes", type=float, metavar="T", help="keep only the last T minutes in memory")
+    ap.add_argument("--no-journal", action="store_true",
+                    help="don't autosave the live capture (no crash recovery; exports are written on the UI thread)")
+    return ap.parse_args(argv)
 
 if __name__ == "__main__":
-    root = tk.Tk(); MotionVisualizer(root); root.mainloop()
\ No newline at end of file
+    args = parse_args()
+    retention = RetentionPolicy(args.keep_events, args.keep_minutes)
+    root = tk.Tk()
+    app = MotionVisualizer(root, source=source_from_args(args), retention=retention, journal=not args.no_journal)
+    root.mainloop()
+    if app.journal:
+        app.journal.close() # Clean exit: nothing to recover next time
\ No newline at end of file
@@ -0,0 +1,326 @@
+import re
+import tkinter as tk
+import tkinter.font as tkfont
+from tkinter import ttk
+import numpy as np
+
+# Syntax highlighting rules, applied lazily to the lines currently on screen
+SYNTAX_TAGS = [
+    ("action", re.compile(r'action=[^, ]+')),   # matches action=ACTION_MOVE
+    ("x{}", re.compile(r'[xy]\[(\d+)\]=[^, ]+')), # matches x[p]=... and y[p]=..., tagged x0, x1, ... by pointer
+]
+
+
+class LineStore:
+    """Compact, append-only store of raw log lines.
+
+    Lines live as UTF-8 in one bytearray (each followed by a newline so
+    searches never match across lines) with an int64 offset table, so an
+    hour-long capture costs a few bytes per line of overhead instead of a
+    Python object and a Tk text line each.
+
+    Indices are local: line i is line number base + i of the whole capture
+    (base only moves when old lines are dropped, see drop_head).
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._buf = bytearray()
+        self._offsets = np.zeros(1024, dtype=np.int64)
+        self._count = 0
+        self.base = 0
+        self._shared = False # The buffer was handed out by snapshot(); don't grow it in place
+
+    def load(self, buf, offsets, base=0):
+        """Adopts an existing buffer (bytes, mmap) and its offset table without copying.
+
+        Line i is buf[offsets[i]:offsets[i + 1] - 1]; offsets[0] need not be 0.
+        The first extend() afterwards copies the data into a private bytearray.
+        """
+        self._buf = buf
+        self._offsets = offsets
+        self._count = len(offsets) - 1
+        self.base = base
+        self._shared = False
+
+    def raw(self, start=0, stop=None):
+        """(bytes-like buffer, offsets) covering lines [start, stop), in the layout load() accepts."""
+        stop = self._count if stop is None else min(stop, self._count)
+        offsets = self._offsets[start:max(start, stop) + 1]
+        return memoryview(self._buf)[offsets[0]:offsets[-1]], offsets - offsets[0]
+
+    def snapshot(self):
+        """raw() for another thread: it stays valid while lines keep arriving.
+
+        The next extend() moves the store to a fresh buffer (one copy) instead
+        of growing the one handed out, which a live export couldn't resize.
+        """
+        self._shared = True
+        return self.raw()
+
+    def drop_head(self, n):
+        """Forgets the first `n` lines (after they were spilled to disk); base moves up by n."""
+        n = max(0, min(n, self._count))
+        if not n:
+            return
+        a, b = int(self._offsets[n]), int(self._offsets[self._count])
+        self._buf = bytearray(memoryview(self._buf)[a:b])
+        self._shared = False
+        offsets = np.zeros(len(self._offsets), dtype=np.int64)
+        offsets[:self._count - n + 1] = self._offsets[n:self._count + 1] - a
+        self._offsets = offsets
+        self._count -= n
+        self.base += n
+
+    def _own(self):
+        if self._shared or not isinstance(self._buf, bytearray):
+            a, b = int(self._offsets[0]), int(self._offsets[self._count])
+            self._buf = bytearray(memoryview(self._buf)[a:b])
+            self._offsets = self._offsets[:self._count + 1] - a
+            self._shared = False
+
+    def __len__(self):
+        return self._count
+
+    def extend(self, lines):
+        """Appends lines (str or raw bytes, with or without newline). Returns the index of the first one."""
+        first = self._count
+        if not lines:
+            return first
+        self._own()
+        if isinstance(lines[0], bytes):
+            encoded = [l.rstrip(b'\r\n') + b'\n' for l in lines]
+        else:
+            encoded = [l.rstrip('\r\n').encode('utf-8', 'replace') + b'\n' for l in lines]
+        needed = self._count + len(encoded) + 1
+        if needed > len(self._offsets):
+            cap = len(self._offsets)
+            while cap < needed:
+                cap *= 2
+            self._offsets = np.resize(self._offsets, cap)
+        lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded))
+        self._offsets[first + 1:first + 1 + len(encoded)] = len(self._buf) + np.cumsum(lengths)
+        self._buf += b''.join(encoded)
+        self._count += len(encoded)
+        return first
+
+    def append(self, line):
+        return self.extend([line])
+
+    def get(self, i):
+        a, b = self._offsets[i], self._offsets[i + 1]
+        return self._buf[a:b - 1].decode('utf-8', 'replace')
+
+    def slice(self, start, stop):
+        stop = min(stop, self._count)
+        if start >= stop:
+            return []
+        a, b = self._offsets[start], self._offsets[stop]
+        return self._buf[a:b - 1].decode('utf-8', 'replace').split('\n')
+
+    def find(self, text, start=0):
+        """Index of the first line at or after `start` containing `text`, or -1."""
+        if start >= self._count:
+            return -1
+        pos = self._buf.find(text.encode('utf-8'), int(self._offsets[start]))
+        if pos < 0 or pos >= self._offsets[self._count]:
+            return -1
+        return int(np.searchsorted(self._offsets[:self._count + 1], pos, side='right')) - 1
+
+
+class VirtualLogView(tk.Frame):
+    """Scrollable log pane that only materializes the lines near the viewport.
+
+    All lines stay in a LineStore; the Tk Text widget holds just the visible
+    rows plus MARGIN lines on each side and is re-filled when scrolling
+    leaves that window. Line numbers in the public API are capture-wide
+    (LineStore base + index), so they stay valid when old lines are dropped.
+    """
+
+    MARGIN = 40
+
+    def __init__(self, parent, font=("Consolas", 10), **text_kw):
+        super().__init__(parent, bg=parent['bg'])
+        self.lines = LineStore()
+        self.top = 0            # LineStore index shown at the top of the viewport
+        self.follow = True      # Stick to the newest line while the user is at the bottom
+        self._window = (0, 0)   # LineStore range currently inside the Text widget
+        self._marks = {}        # line number -> tag, e.g. the selected event
+        self._pending = None
+        self._linespace = tkfont.Font(font=font).metrics('linespace')
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text = tk.Text(self, font=font, state=tk.DISABLED, **text_kw)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.text.bind("<MouseWheel>", lambda e: self._wheel(-3 if e.delta > 0 else 3))
+        self.text.bind("<Button-4>", lambda e: self._wheel(-3))
+        self.text.bind("<Button-5>", lambda e: self._wheel(3))
+        self.text.bind("<Configure>", lambda e: self.refresh())
+
+    # --- TEXT-WIDGET PASSTHROUGHS ---
+    def tag_config(self, tag, **kw):
+        self.text.tag_config(tag, **kw)
+
+    # --- DATA ---
+    def __len__(self):
+        return len(self.lines)
+
+    def extend(self, lines):
+        """Adds raw lines and returns the line number of the first one."""
+        first = self.lines.extend(lines)
+        if self.follow:
+            self.top = max(0, len(self.lines) - self._rows())
+        self._schedule()
+        return self.lines.base + first
+
+    def append(self, line):
+        return self.extend([line])
+
+    def load(self, buf, offsets, base=0):
+        """Replaces the contents with an adopted LineStore buffer (see LineStore.load)."""
+        self.lines.load(buf, offsets, base)
+        self.show(self.lines)
+
+    def show(self, lines):
+        """Switches to another LineStore (e.g. spilled history and back), scrolled to its end."""
+        self.lines = lines
+        self._marks = {}
+        self.top = max(0, len(self.lines) - self._rows())
+        self.follow = True
+        self.refresh(force=True)
+
+    def snapshot(self):
+        """raw() for another thread: it stays valid while lines keep arriving.
+
+        The next extend() moves the store to a fresh buffer (one copy) instead
+        of growing the one handed out, which a live export couldn't resize.
+        """
+        self._shared = True
+        return self.raw()
+
+    def drop_head(self, n):
+        """Drops the oldest `n` lines from memory; the visible lines don't move."""
+        self.lines.drop_head(n)
+        self._marks = {line: tag for line, tag in self._marks.items() if line >= self.lines.base}
+        self.top = max(0, self.top - n)
+        self.refresh(force=True)
+
+    def clear(self):
+        self.lines.clear()
+        self._marks = {}
+        self.top = 0
+        self.follow = True
+        self.refresh(force=True)
+
+    # --- NAVIGATION ---
+    def _rows(self):
+        return max(1, self.text.winfo_height() // self._linespace)
+
+    def scroll_to(self, top):
+        rows = self._rows()
+        self.top = max(0, min(int(top), len(self.lines) - rows))
+        self.follow = self.top >= len(self.lines) - rows
+        self.refresh()
+
+    def see(self, line):
+        """Scrolls just enough for `line` to be on screen (centred if it was far away)."""
+        line -= self.lines.base
+        rows = self._rows()
+        if not self.top <= line < self.top + rows:
+            self.scroll_to(line - rows // 2)
+
+    def _wheel(self, lines):
+        self.scroll_to(self.top + lines)
+        return "break"
+
+    def _on_scrollbar(self, *args):
+        total = len(self.lines)
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * total)
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self._rows() if args[2] == "pages" else 1)
+            self.scroll_to(self.top + step)
+
+    def search(self, text, start=0):
+        """Searches every line in memory (not just the rendered window). Returns a line number or -1."""
+        hit = self.lines.find(text, max(0, start - self.lines.base))
+        return hit if hit < 0 else self.lines.base + hit
+
+    # --- MARKS (selection highlight) ---
+    def highlight(self, line, tag):
+        self._marks[line] = tag
+        a, b = self._window
+        local = line - self.lines.base
+        if a <= local < b:
+            row = local - a + 1
+            self.text.tag_add(tag, f"{row}.0", f"{row}.end")
+
+    def unhighlight(self, line):
+        tag = self._marks.pop(line, None)
+        a, b = self._window
+        local = line - self.lines.base
+        if tag and a <= local < b:
+            row = local - a + 1
+            self.text.tag_remove(tag, f"{row}.0", f"{row}.end")
+
+    # --- RENDERING ---
+    def _schedule(self):
+        """Coalesces bursts of appends into one refresh per idle cycle."""
+        if self._pending is None:
+            self._pending = self.after_idle(self._flush)
+
+    def _flush(self):
+        self._pending = None
+        self.refresh()
+
+    def refresh(self, force=False):
+        total = len(self.lines)
+        rows = self._rows()
+        a, b = self._window
+        top = self.top
+
+        if not force and self.follow and a < b < total and top >= a and total - a <= rows + 3 * self.MARGIN:
+            # Tailing: only the newly arrived lines are inserted and highlighted
+            self._render(b, total, append=True)
+        elif force or a == b or top < a or (top + rows > b and b < total):
+            # The viewport left the materialized window: re-fill it around `top`
+            self._render(max(0, top - self.MARGIN), min(total, top + rows + self.MARGIN))
+
+        # Old-style "yview index" puts that line at the top of the widget
+        self.text.yview(f"{top - self._window[0] + 1}.0")
+        if total:
+            self.scrollbar.set(top / total, min(1.0, (top + rows) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _render(self, a, b, append=False):
+        """Writes lines [a, b) into the Text widget, replacing it or extending its tail."""
+        lines = self.lines.slice(a, b)
+        self.text.config(state=tk.NORMAL)
+        if append:
+            first_row = a - self._window[0] + 1
+            self.text.insert(tk.END + "-1c", "\n" + "\n".join(lines))
+            window = (self._window[0], b)
+        else:
+            first_row = 1
+            self.text.delete("1.0", tk.END)
+            self.text.insert("1.0", "\n".join(lines))
+            window = (a, b)
+
+        # --- BRIGHT SYNTAX HIGHLIGHTING (visible window only) ---
+        for row, line in enumerate(lines, start=first_row):
+            for tag, pattern in SYNTAX_TAGS:
+                for m in pattern.finditer(line):
+                    self.text.tag_add(tag.format(*m.groups()), f"{row}.{m.start()}", f"{row}.{m.end()}")
+        for line, tag in self._marks.items():
+            local = line - self.lines.base
+            if a <= local < b:
+                row = local - window[0] + 1
+                self.text.tag_add(tag, f"{row}.0", f"{row}.end")
+
+        self.text.config(state=tk.DISABLED)
+        self._window = window
@@ -0,0 +1,239 @@
+import re
+import time
+import numpy as np
+
+from event_store import ACTION_CODES, ACTION_UNKNOWN, MAX_POINTERS, decode_action, decode_field, pointer_bits
+
+# Bump whenever the columns produced below change meaning (used by anything that caches parses)
+PARSER_VERSION = 4
+
+MARKER = b'MotionEvent {'
+
+# --- FAST PATH ---
+# Each regex is scanned once over the joined MotionEvent lines. findall() keeps
+# buffer order, so the k-th match of each belongs to the k-th event as long as
+# every line has the standard MotionEvent.toString() layout (checked below).
+_ACTION = re.compile(rb'\{ action=([A-Z_]+)(?:\((\d+)\))?')
+_POINTER = re.compile(rb'id\[\d+\]=(-?\d+), x\[(\d+)\]=(-?[\d.]+), y\[\d+\]=(-?[\d.]+)')
+_TAIL = re.compile(rb'pointerCount=(\d+), historySize=(\d+), eventTime=(-?\d+), downTime=(-?\d+), '
+                   rb'deviceId=\S+ source=\S+ displayId=\S+ eventId=(-?\d+)')
+# The fields that hardly ever change between events, as runs of key=value
+# pairs (or the tool type name). The match text (with its delimiter) is what
+# _matches() counts to tell that every event carries the same run.
+_ACTION_BUTTON = re.compile(rb'(actionButton=[\w|]+), ')
+_BUTTONS = re.compile(rb'(buttonState=[\w|]+, (?:classification=\w+, )?metaState=[\w|]+, flags=\w+, edgeFlags=\w+), ')
+_DEVICE = re.compile(rb'(deviceId=-?\d+,? source=\w+,? displayId=-?\d+)[, ]')
+_TOOL_TYPE = re.compile(rb'=(TOOL_TYPE_\w+)[, ]')
+# Keys the slow path takes from the key=value pairs (action is decoded on its own)
+_SLOW_FIELDS = ("id", "x", "y", "toolType", "actionButton", "buttonState", "classification", "metaState", "flags",
+                "edgeFlags", "pointerCount", "historySize", "eventTime", "downTime", "deviceId", "source",
+                "displayId", "eventId")
+# Fields printed as names, flag sets or hex, see event_store.decode_field
+_TEXT_FIELDS = ("actionButton", "buttonState", "classification", "metaState", "flags", "edgeFlags", "source", "toolType")
+
+# logcat's default "threadtime" prefix: MM-DD HH:MM:SS.mmm (device local time, no year).
+# Fixed width, so it is decoded column-wise from the first STAMP_LEN bytes of each line.
+STAMP_LEN = 18
+_STAMP_DIGITS = [0, 1, 3, 4, 6, 7, 9, 10, 12, 13, 15, 16, 17]
+_STAMP_SEPS = {2: ord('-'), 5: ord(' '), 8: ord(':'), 11: ord(':'), 14: ord('.')}
+
+# --- SLOW PATH ---
+# Same key/value grammar the original parse_line used, for lines that deviate from the layout
+_BODY = re.compile(rb'MotionEvent \{ (.*) \}')
+_KV = re.compile(rb'(\w+)(?:\[(\d+)\])?=([^, ]+)')
+
+
+def _empty(n, max_pointers):
+    return {
+        'action': np.full(n, ACTION_UNKNOWN, dtype=np.int8),
+        'action_index': np.zeros(n, dtype=np.int8),
+        'pointerCount': np.zeros(n, dtype=np.int8),
+        'eventTime': np.zeros(n, dtype=np.int64),
+        'downTime': np.zeros(n, dtype=np.int64),
+        'eventId': np.zeros(n, dtype=np.int64),
+        'pc_time': np.zeros(n, dtype=np.float64),
+        'log_time': np.full(n, np.nan, dtype=np.float64),
+        'x': np.full((max_pointers, n), np.nan, dtype=np.float32),
+        'y': np.full((max_pointers, n), np.nan, dtype=np.float32),
+        'pointer_mask': np.zeros(n, dtype=np.uint16),
+        'source_line': np.zeros(n, dtype=np.int64),
+        'actionButton': np.zeros(n, dtype=np.int32),
+        'buttonState': np.zeros(n, dtype=np.int32),
+        'classification': np.zeros(n, dtype=np.int8),
+        'metaState': np.zeros(n, dtype=np.int32),
+        'flags': np.zeros(n, dtype=np.uint32),
+        'edgeFlags': np.zeros(n, dtype=np.uint32),
+        'historySize': np.zeros(n, dtype=np.int32),
+        'deviceId': np.zeros(n, dtype=np.int32),
+        'source': np.zeros(n, dtype=np.uint32),
+        'displayId': np.zeros(n, dtype=np.int32),
+        'id': np.full((max_pointers, n), -1, dtype=np.int8),
+        'toolType': np.full((max_pointers, n), -1, dtype=np.int8),
+    }
+
+
+def _decode_actions(names):
+    """Maps an array of action names to int8 codes, one dict lookup per distinct name."""
+    uniq, inverse = np.unique(names, return_inverse=True)
+    table = np.array([ACTION_CODES.get(u.decode(), ACTION_UNKNOWN) for u in uniq], dtype=np.int8)
+    return table[inverse]
+
+
+def _matches(buf, regex, count):
+    """Group 1 of the `count` matches of `regex` as (distinct values, index of each), None if the count is off.
+
+    When the first match's text occurs `count` times, every event has that
+    same value: the buffer is only counted, not scanned, and the index is None.
+    """
+    first = regex.search(buf)
+    if first is None:
+        return None if count else ([], None)
+    if buf.count(first.group(0)) == count:
+        return [first.group(1)], None
+    found = regex.findall(buf)
+    if len(found) != count:
+        return None
+    return np.unique(np.array(found), return_inverse=True)
+
+
+def _fill_runs(matches, cols):
+    """Fills the columns named in _matches() of key=value runs ('deviceId=4, source=0x300008, ...')."""
+    uniq, inverse = matches
+    for j, run in enumerate(uniq):
+        rows = slice(None) if inverse is None else inverse == j
+        for k, _, v in _KV.findall(run):
+            cols[k.decode()][rows] = decode_field(k.decode(), v.decode()) or 0
+
+
+def _fast(buf, cols, max_pointers):
+    """Vectorized fill of `cols` from a buffer of MotionEvent lines. False if the layout didn't line up."""
+    n = len(cols['action'])
+    actions = _ACTION.findall(buf)
+    tails = _TAIL.findall(buf)
+    if len(actions) != n or len(tails) != n:
+        return False
+    tails = np.array(tails)
+    counts = tails[:, 0].astype(np.int64)
+    pointers = _POINTER.findall(buf)
+    if len(pointers) != counts.sum():
+        return False
+    runs = [_matches(buf, regex, n) for regex in (_ACTION_BUTTON, _BUTTONS, _DEVICE)]
+    tool_types = _matches(buf, _TOOL_TYPE, len(pointers))
+    if None in runs or tool_types is None:
+        return False
+
+    actions = np.array(actions)
+    cols['action'][:] = _decode_actions(actions[:, 0])
+    has_index = actions[:, 1] != b''
+    cols['action_index'][has_index] = actions[has_index, 1].astype(np.int8)
+    cols['pointerCount'][:] = counts
+    cols['historySize'][:] = tails[:, 1].astype(np.int64)
+    cols['eventTime'][:] = tails[:, 2].astype(np.int64)
+    cols['downTime'][:] = tails[:, 3].astype(np.int64)
+    cols['eventId'][:] = tails[:, 4].astype(np.int64)
+    for matches in runs:
+        _fill_runs(matches, cols)
+
+    if pointers:
+        pointers = np.array(pointers)
+        pid = pointers[:, 1].astype(np.int64)
+        owner = np.repeat(np.arange(n), counts)
+        keep = pid < max_pointers
+        pid, owner, pointers = pid[keep], owner[keep], pointers[keep]
+        cols['id'][pid, owner] = pointers[:, 0].astype(np.int8)
+        cols['x'][pid, owner] = pointers[:, 2].astype(np.float32)
+        cols['y'][pid, owner] = pointers[:, 3].astype(np.float32)
+        uniq, inverse = tool_types
+        table = np.array([decode_field('toolType', u.decode()) for u in uniq], dtype=np.int8)
+        cols['toolType'][pid, owner] = table[0] if inverse is None else table[inverse][keep]
+    return True
+
+
+def _log_times(lines, cols, ref_time):
+    """Fills 'log_time' (epoch seconds) from the logcat prefix of each event line.
+
+    logcat prints the device's local time without a year; the year (and the
+    UTC offset) are taken from `ref_time`, stepping back a year for months
+    after the reference month so a December log read in January lands right.
+    """
+    n = len(lines)
+    heads = b''.join(l[:STAMP_LEN].ljust(STAMP_LEN) for l in lines)
+    d = np.frombuffer(heads, dtype=np.uint8).reshape(n, STAMP_LEN).astype(np.int64)
+    ok = ((d[:, _STAMP_DIGITS] >= 48) & (d[:, _STAMP_DIGITS] <= 57)).all(axis=1)
+    for pos, ch in _STAMP_SEPS.items():
+        ok &= d[:, pos] == ch
+    if not ok.any():
+        return
+    d = d[ok] - 48
+    month = d[:, 0] * 10 + d[:, 1]
+    day = d[:, 3] * 10 + d[:, 4]
+    clock = (d[:, 6] * 10 + d[:, 7]) * 3600 + (d[:, 9] * 10 + d[:, 10]) * 60 + d[:, 12] * 10 + d[:, 13]
+    millis = d[:, 15] * 100 + d[:, 16] * 10 + d[:, 17]
+
+    ref = time.localtime(ref_time)
+    years = ref.tm_year - (month > ref.tm_mon)
+    days = ((years - 1970) * 12 + month - 1).astype('datetime64[M]').astype('datetime64[D]').astype(np.int64) + day - 1
+    cols['log_time'][ok] = days * 86400 + clock - ref.tm_gmtoff + millis / 1000.0
+
+
+def _slow(lines, cols, max_pointers):
+    """Per-line fallback using the generic key=value grammar."""
+    for row, line in enumerate(lines):
+        body = _BODY.search(line)
+        if not body:
+            continue
+        for k, i, v in _KV.findall(body.group(1)):
+            k, v = k.decode(), v.decode('utf-8', 'replace')
+            if k == 'action':
+                cols['action'][row], cols['action_index'][row] = decode_action(v)
+                continue
+            col = cols.get(k) if k in _SLOW_FIELDS else None
+            # Indexed keys (x[1]) go to pointer columns, plain ones to scalars
+            if col is None or col.ndim != (2 if i else 1) or (i and int(i) >= max_pointers):
+                continue
+            try:
+                value = decode_field(k, v) if k in _TEXT_FIELDS else float(v) if k in ('x', 'y') else int(v)
+                if value is not None:
+                    col[(int(i), row) if i else row] = value
+            except (ValueError, OverflowError):
+                pass
+
+
+def parse_lines(lines, max_pointers=MAX_POINTERS, pc_time=None):
+    """Parses a list of raw logcat lines (str or bytes) into EventStore-ready columns.
+
+    Lines that are not MotionEvents are skipped. 'source_line' holds the
+    position of each event's line in `lines`. Pointers beyond `max_pointers`
+    are dropped.
+    """
+    is_text = bool(lines) and isinstance(lines[0], str)
+    marker = MARKER.decode() if is_text else MARKER
+
+    # Cheap substring test first; the regexes only ever see MotionEvent lines
+    keep = [i for i, l in enumerate(lines) if marker in l]
+    cols = _empty(len(keep), max_pointers)
+    if not keep:
+        return cols
+    cols['source_line'][:] = keep
+    now = time.time() if pc_time is None else pc_time
+    cols['pc_time'][:] = now
+
+    events = [lines[i] for i in keep]
+    if is_text:
+        # One encode for the whole batch instead of one per line
+        buf = '\n'.join(events).encode('utf-8', 'replace')
+    else:
+        buf = b'\n'.join(events)
+    raw = [l.encode('utf-8', 'replace') for l in events] if is_text else events
+    if not _fast(buf, cols, max_pointers):
+        _slow(raw, cols, max_pointers)
+    cols['pointer_mask'][:] = pointer_bits(cols['x'])
+    _log_times(raw, cols, now)
+    return cols
+
+
+def parse_buffer(buf, max_pointers=MAX_POINTERS, pc_time=None):
+    """Same as parse_lines() for a raw text/bytes buffer; source_line counts lines in `buf`."""
+    if isinstance(buf, str):
+        buf = buf.encode('utf-8', 'replace')
+    return parse_lines(buf.splitlines(), max_pointers=max_pointers, pc_time=pc_time)
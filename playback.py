@@ -0,0 +1,80 @@
+import numpy as np
+
+TARGET_FPS = 30
+MIN_SPEED, MAX_SPEED = 0.1, 10.0
+
+# Gaps longer than this (pauses between gestures, device reboots) play back at this length
+MAX_GAP_MS = 1100
+
+
+def build_timeline(event_time, pc_time=None, max_gap_ms=MAX_GAP_MS):
+    """Monotonic playback time (ms) per event from device eventTime.
+
+    Backwards jumps (logcat restart, reboot) count as zero and long pauses
+    are capped. If there is no usable eventTime (e.g. an old CSV), PC
+    arrival times are used instead.
+    """
+    t = np.asarray(event_time, dtype=np.float64)
+    if len(t) and not t.any() and pc_time is not None:
+        t = np.nan_to_num(np.asarray(pc_time, dtype=np.float64) * 1000.0)
+    if len(t) < 2:
+        return np.zeros(len(t))
+    deltas = np.clip(np.diff(t), 0, max_gap_ms)
+    return np.concatenate(([0.0], np.cumsum(deltas)))
+
+
+class PlaybackClock:
+    """Maps wall-clock time to an event index at a given speed, optionally looping a range.
+
+    Pure bookkeeping: the UI calls position(now) once per frame and draws
+    whatever index comes back, so a slow frame simply makes the next one
+    jump further instead of slowing playback down.
+    """
+
+    def __init__(self, timeline, speed=1.0):
+        self.timeline = timeline
+        self.speed = speed
+        self.loop = None          # (first, last) event indices, or None
+        self._anchor_t = 0.0      # Playback time at _anchor_wall
+        self._anchor_wall = 0.0
+
+    def set_timeline(self, timeline):
+        """Swaps in a rebuilt timeline (more events arrived) without moving the play head."""
+        self.timeline = timeline
+
+    def seek(self, index, now):
+        index = max(0, min(int(index), len(self.timeline) - 1))
+        self._anchor_t = self.timeline[index] if len(self.timeline) else 0.0
+        self._anchor_wall = now
+
+    def set_speed(self, speed, now):
+        """Changes speed without a jump in position."""
+        self._anchor_t = self._time_at(now)
+        self._anchor_wall = now
+        self.speed = max(MIN_SPEED, min(MAX_SPEED, float(speed)))
+
+    def _time_at(self, now):
+        return self._anchor_t + (now - self._anchor_wall) * 1000.0 * self.speed
+
+    def position(self, now):
+        """(index, finished) for wall-clock time `now` (seconds, e.g. time.perf_counter())."""
+        timeline = self.timeline
+        if not len(timeline):
+            return 0, True
+        t = self._time_at(now)
+
+        if self.loop is not None:
+            first, last = self.loop
+            t0, t1 = timeline[first], timeline[last]
+            if t > t1:
+                span = t1 - t0
+                t = t0 + ((t - t0) % span if span > 0 else 0.0)
+                # Re-anchor so the modulo doesn't grow without bound
+                self._anchor_t, self._anchor_wall = t, now
+            index = int(np.searchsorted(timeline, t, side='right')) - 1
+            return max(first, min(index, last)), False
+
+        index = int(np.searchsorted(timeline, t, side='right')) - 1
+        if index >= len(timeline) - 1:
+            return len(timeline) - 1, True
+        return max(0, index), False
@@ -0,0 +1,478 @@
+import numpy as np
+import seaborn as sns
+import matplotlib
+from matplotlib.colors import ListedColormap, LogNorm
+from matplotlib.lines import Line2D as Line2D # For creating legend proxies
+from matplotlib.patches import Patch
+
+from event_store import (ACTION_DOWN, ACTION_UP, ACTION_POINTER_DOWN, ACTION_POINTER_UP, INDEXED_CODES,
+                         ACTION_NAMES, mask_pointers)
+
+# --- STYLE ---
+P_NEON = "#b651fa" # Purple
+G_NEON = "#25ff80" # Green
+
+# Pointers 2-9 (panels report up to 10 touches): Orange, Cyan, Pink, Yellow, Blue, Red, Brown, Teal
+POINTER_COLORS = [P_NEON, G_NEON, "#ff9f1c", "#22c3f0", "#ff4f9a", "#e6c700", "#4361ee", "#e63946", "#a1887f", "#00b4a0"]
+HIGHLIGHT_COLORS = {0: "#d8b4fe", 1: "#4ade80", 2: "#ffd29c", 3: "#a5e6fa", 4: "#ffb3d1",
+                    5: "#fff27a", 6: "#b4c1fa", 7: "#f5a3a9", 8: "#d7ccc8", 9: "#8ee8dc"}
+MOVE_MARKERS = ["o", "D", "s", "^", "v", "P", "X", "p", "h", "*"]
+
+# Colormaps that stay saturated even when "faded". Built once at import instead of every frame.
+POINTER_MAPS = [ListedColormap(sns.light_palette(c, n_colors=256)[50:]) for c in POINTER_COLORS]
+
+# Scatter styling per (action kind): DOWN = large circle, UP = large X, MOVE = dots/diamonds
+KINDS = ("down", "up", "move")
+KIND_MOVE, KIND_DOWN, KIND_UP = 0, 1, 2
+KIND_CODES = {"move": KIND_MOVE, "down": KIND_DOWN, "up": KIND_UP}
+
+# Marker kind per action code (offset by one so ACTION_UNKNOWN = -1 maps to index 0)
+_KIND_OF_ACTION = np.full(max(ACTION_NAMES) + 2, KIND_MOVE, dtype=np.int8)
+_KIND_OF_ACTION[[ACTION_DOWN + 1, ACTION_POINTER_DOWN + 1]] = KIND_DOWN
+_KIND_OF_ACTION[[ACTION_UP + 1, ACTION_POINTER_UP + 1]] = KIND_UP
+
+
+def marker_kinds(action, action_index, pointer):
+    """KIND_* of `pointer`'s sample in each event: POINTER_DOWN/UP(k) only mark pointer k, the others moved."""
+    kinds = _KIND_OF_ACTION[action.astype(np.int64) + 1]
+    return np.where(np.isin(action, INDEXED_CODES) & (action_index != pointer), KIND_MOVE, kinds)
+
+# --- LEVEL OF DETAIL ---
+# Above this many visible MOVE points, moves are drawn as a density image
+# (one pixel per cell, coloured by the most recent event in it) instead of
+# individual markers. DOWN/UP markers and the selection stay exact.
+LOD_THRESHOLD = 50_000
+LOD_BINS = (480, 160)  # (x cells, y cells) across the axis limits
+
+
+# --- COVERAGE HEATMAP ---
+# Hit counts on a log scale; empty cells (masked by LogNorm) stay transparent over the grid
+HEAT_MAP = matplotlib.colormaps["inferno"].with_extremes(bad=(0, 0, 0, 0), under=(0, 0, 0, 0))
+
+
+class _GrowableIndex:
+    """Event indices plus their (x, y) for one scatter layer, grown by doubling."""
+
+    def __init__(self, capacity=1024):
+        self.order = np.empty(capacity, dtype=np.int64)
+        self.xy = np.empty((capacity, 2), dtype=np.float32)
+        self.size = 0
+
+    def extend(self, order, xy):
+        n = len(order)
+        if self.size + n > len(self.order):
+            cap = len(self.order)
+            while cap < self.size + n:
+                cap *= 2
+            self.order = np.resize(self.order, cap)
+            self.xy = np.resize(self.xy, (cap, 2))
+        self.order[self.size:self.size + n] = order
+        self.xy[self.size:self.size + n] = xy
+        self.size += n
+
+    def upto(self, stop):
+        """Number of entries with event index < stop (indices are ascending)."""
+        return int(np.searchsorted(self.order[:self.size], stop))
+
+
+class _DensityGrid:
+    """Per-cell hit count and most recent timestamp_order for one pointer's MOVE points.
+
+    Filled incrementally while the slider only moves forward; rebuilt from
+    the layer when it moves back or the axis limits change.
+    """
+
+    def __init__(self, bins=LOD_BINS):
+        self.bins = bins
+        self.reset(None)
+
+    def reset(self, limits):
+        nx, ny = self.bins
+        self.limits = limits
+        self.count = np.zeros((ny, nx), dtype=np.int32)
+        self.recent = np.full((ny, nx), -1, dtype=np.int64)
+        self.consumed = 0  # Layer entries already binned
+
+    def add(self, order, xy):
+        if not len(order):
+            return
+        nx, ny = self.bins
+        x_max, y_max = self.limits
+        ix = np.floor(xy[:, 0] * (nx / x_max)).astype(np.int64)
+        iy = np.floor(xy[:, 1] * (ny / y_max)).astype(np.int64)
+        inside = (ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny)
+        flat = iy[inside] * nx + ix[inside]
+        self.count.reshape(-1)[:] += np.bincount(flat, minlength=nx * ny).astype(np.int32)
+        np.maximum.at(self.recent.reshape(-1), flat, order[inside])
+
+    def rgba(self, cmap, max_v):
+        """Recency through the pointer's colormap; denser cells are more opaque."""
+        filled = self.count > 0
+        img = cmap(self.recent / max_v)
+        density = np.log1p(self.count) / np.log1p(max(1, self.count.max()))
+        img[..., 3] = np.where(filled, 0.7 * (0.4 + 0.6 * density), 0.0)
+        return img
+
+
+class TouchRenderer:
+    """Persistent-artist renderer for the touch scatter plot.
+
+    Axes decoration, the legend and one scatter collection per pointer/action
+    kind are created once. update() only indexes events appended since the
+    last call and pushes offset/colour views into the existing artists.
+    Past `lod_threshold` visible moves, the move layers switch to a density
+    image so the frame cost stops growing with the session. Given a
+    coverage_map.CoverageMap, update() shows its view as one image instead of
+    the scatter layers.
+    """
+
+    def __init__(self, ax, lod_threshold=LOD_THRESHOLD):
+        self.ax = ax
+        self.lod_threshold = lod_threshold
+        self.lod_active = False
+        self._density = {}
+        self._density_art = {}
+        self.fig = ax.figure
+        self._key = None
+        self._indexed = 0
+        self._limits = None
+        self._layers = {}
+        self._artists = {}
+        self._highlight = {}
+        self._pointers = [] # Pointer indices with artists, in creation order
+        self._heat_version = None
+        self.layout_generation = 0 # Bumped by layout(): bitmaps drawn before it have other margins/legend
+
+        self._decorate()
+        self._create_artists()
+        self._create_legend()
+        self.layout()
+
+    # --- ONE-TIME SETUP ---
+    def _decorate(self):
+        self.ax.set_xlabel("X-Axis (Sensor Range)", fontweight='bold', color='#5f6368')
+        self.ax.set_ylabel("Y-Axis (Sensor Range)", fontweight='bold', color='#5f6368')
+        self.ax.set_title("Live Replay: Multi-Touch Analytics", fontweight='bold', pad=10)
+        self.ax.grid(True, which='both', linestyle='--', alpha=0.3)
+
+    def _create_artists(self):
+        for p_idx in (0, 1):
+            self._add_pointer(p_idx)
+
+        # Coverage heatmap: replaces every scatter layer while shown
+        self._heat_art = self.ax.imshow(np.zeros((1, 1)), extent=(0, 1, 0, 1), origin='lower', cmap=HEAT_MAP,
+                                        norm=LogNorm(vmin=1, vmax=2), interpolation='antialiased', aspect='auto',
+                                        zorder=1, visible=False)
+
+        # Path of the selected point's stroke (from the stroke index)
+        self._stroke_line, = self.ax.plot([], [], linestyle='--', linewidth=1.5, color='#5f6368', alpha=0.8,
+                                          zorder=9, visible=False)
+
+    def _add_pointer(self, p_idx):
+        """Creates the scatter layers, density image and highlight artists for one pointer index.
+
+        Pointers 0 and 1 always exist; higher ones are added the first time
+        they show up, so the per-frame cost follows the pointers actually used.
+        """
+        empty = np.empty((0, 2))
+        cmap = POINTER_MAPS[p_idx]
+        marker = MOVE_MARKERS[p_idx]
+        styles = {
+            # A. ACTION_DOWN / POINTER_DOWN (Large Circle)
+            "down": dict(s=500, marker="o", edgecolors='white', alpha=0.9, zorder=5),
+            # B. ACTION_UP / POINTER_UP (Large X) - Highest Data Priority
+            "up": dict(s=350, marker="x", linewidths=4, alpha=1.0, zorder=6),
+            # C. ACTION_MOVE (Standard Dots/Diamonds/...) - Background Priority
+            "move": dict(s=120 if p_idx == 0 else 100, marker=marker, edgecolors='white', alpha=0.7, zorder=2),
+        }
+        for kind in KINDS:
+            art = self.ax.scatter(empty[:, 0], empty[:, 1], c=[], cmap=cmap,
+                                  vmin=0, vmax=1, **styles[kind])
+            self._artists[(p_idx, kind)] = art
+            self._layers[(p_idx, kind)] = _GrowableIndex()
+
+        # Level-of-detail stand-in for the move layer, same z-order
+        self._density[p_idx] = _DensityGrid()
+        self._density_art[p_idx] = self.ax.imshow(np.zeros((1, 1, 4)), extent=(0, 1, 0, 1), origin='lower',
+                                                  interpolation='nearest', aspect='auto', zorder=2, visible=False)
+        if self._limits is not None:
+            self._density_art[p_idx].set_extent((0, self._limits[0], 0, self._limits[1]))
+
+        # Selection highlight: one artist per marker variant, toggled by visibility
+        color = HIGHLIGHT_COLORS[p_idx]
+        arts = {
+            "x": self.ax.scatter([], [], marker="x", c=color, linewidths=5, zorder=10),
+            "o": self.ax.scatter([], [], marker="o", facecolors='none', edgecolors=color, linewidths=4, zorder=10),
+            # Precision Bullseye
+            "dot_o": self.ax.scatter([], [], s=50, marker="o", color='white', edgecolors='black', zorder=11),
+        }
+        if marker != "o":
+            arts[marker] = self.ax.scatter([], [], marker=marker, facecolors='none', edgecolors=color, linewidths=4,
+                                           zorder=10)
+            arts["dot_" + marker] = self.ax.scatter([], [], s=50, marker=marker, color='white', edgecolors='black',
+                                                    zorder=11)
+        for art in arts.values():
+            art.set_visible(False)
+        self._highlight[p_idx] = arts
+        self._pointers.append(p_idx)
+
+        if p_idx > 1:
+            self._create_legend()
+            self.layout()
+
+    def _create_legend(self):
+        # We use Line2D objects as "Proxies"
+        legend_elements = [
+            # Action Icons
+            Patch(facecolor='#d8b4fe', edgecolor='#af7ac5', label='Pointer 0 (Purple)'),
+            Line2D([0], [0], marker='o', color='#d8b4fe', label='Touch Down (pointer 0)', markerfacecolor='#d8b4fe', markersize=15, markeredgecolor='#af7ac5', linestyle='None'),
+            Line2D([0], [0], marker='o', color='#d8b4fe', label='Move (pointer 0)', markerfacecolor='#d8b4fe', markersize=8, markeredgecolor='#af7ac5', linestyle='None'),
+            Line2D([0], [0], marker='x', color='#d8b4fe', label='Lift Off (pointer 0)', markersize=15, markeredgewidth=5, linestyle='None'),
+
+            Patch(facecolor='#4ade80', edgecolor='#27ae60', label='Pointer 1 (Green)'),
+            Line2D([0], [0], marker='D', color='#4ade80', label='Touch Down (pointer 1)', markerfacecolor='#4ade80', markersize=15, markeredgecolor='#27ae60', linestyle='None'),
+            Line2D([0], [0], marker='D', color='#4ade80', label='Move (pointer 1)', markerfacecolor='#4ade80', markersize=8, markeredgecolor='#27ae60', linestyle='None'),
+            Line2D([0], [0], marker='x', color='#4ade80', label='Lift Off (pointer 1)', markersize=15, markeredgewidth=5, linestyle='None')
+        ]
+        # Further pointers only get a colour swatch, or the key would outgrow the plot
+        extra = sorted(p for p in self._pointers if p > 1)
+        legend_elements += [Patch(facecolor=HIGHLIGHT_COLORS[p], edgecolor=POINTER_COLORS[p], label=f'Pointer {p}')
+                            for p in extra]
+
+        # Place the legend outside the plotting area
+        leg = self.ax.legend(
+            handles=legend_elements,
+            loc='upper left',
+            bbox_to_anchor=(1.02, 1.0), # Bring it closer to the graph edge
+            borderaxespad=0,
+            title="Touch Key",
+            fontsize=9,
+            frameon=True,
+            facecolor='#f8f9fa',
+            # --- VERTICAL SPACING ---
+            labelspacing=2 if not extra else 0.8, # High vertical gap for clarity, tighter once it gets long
+            handletextpad=1.0,     # Space between icon and text
+            borderpad=1.2          # Internal padding
+        )
+
+        # Apply Bold Weight to the title
+        leg.get_title().set_fontweight('bold')
+        leg.get_title().set_fontsize(10)
+
+    def layout(self):
+        """Recomputes margins. Only needed at startup, when the window is resized and when the legend grows."""
+        self.layout_generation += 1
+        self.fig.subplots_adjust(right=0.98, left=0.08, top=0.92, bottom=0.12)
+        self.fig.tight_layout(rect=[0, 0, 0.98, 1])
+
+    # --- PER-FRAME UPDATES ---
+    def set_limits(self, x_max, y_max):
+        if self._limits == (x_max, y_max):
+            return
+        self._limits = (x_max, y_max)
+        for art in self._density_art.values():
+            art.set_extent((0, x_max, 0, y_max))
+        self.ax.set_xlim(0, x_max)
+        self.ax.set_ylim(0, y_max)
+        self.ax.set_xticks(np.linspace(0, x_max, 11))
+        self.ax.set_yticks(np.linspace(0, y_max, 6))
+
+    def _index_new_events(self, store):
+        """Sorts events appended since the last frame into their scatter layers.
+
+        Works off the integer columns decoded at parse time: pointer_mask
+        says which pointers have a sample, action/action_index which of them
+        went down or up. Only pointers present in the new events are visited.
+        """
+        start, stop = self._indexed, len(store)
+        if stop <= start:
+            return
+        action = store.column('action', stop)[start:]
+        index = store.column('action_index', stop)[start:]
+        mask = store.column('pointer_mask', stop)[start:]
+
+        for p_idx in mask_pointers(np.bitwise_or.reduce(mask)):
+            if p_idx not in self._highlight:
+                self._add_pointer(p_idx)
+            present = (mask >> p_idx) & 1 == 1
+            kinds = marker_kinds(action, index, p_idx)
+            xs = store.x(p_idx, stop)[start:]
+            ys = store.y(p_idx, stop)[start:]
+            for kind in KINDS:
+                local = np.flatnonzero(present & (kinds == KIND_CODES[kind]))
+                if len(local):
+                    self._layers[(p_idx, kind)].extend(local + start, np.column_stack((xs[local], ys[local])))
+        self._indexed = stop
+
+    def _reset(self, key):
+        self._key = key
+        self._indexed = 0
+        for key in self._layers:
+            self._layers[key] = _GrowableIndex()
+        for grid in self._density.values():
+            grid.reset(None)
+
+    def update(self, store, limit, selected=None, stroke_path=None, coverage=None, key=None):
+        """Shows events [0, limit] of `store`, fading colours by timestamp_order.
+
+        `stroke_path` is an (N, 2) array traced through the selected point's stroke.
+        With `coverage`, its whole-session heatmap is drawn instead of the points.
+        `key` identifies the data when `store` is a fresh snapshot each frame
+        (see render_worker); the same key means only rows past the last frame are new.
+        """
+        key = store if key is None else key
+        if key != self._key or len(store) < self._indexed:
+            self._reset(key)
+        self._index_new_events(store)
+
+        if coverage is not None:
+            self._update_heatmap(coverage)
+        else:
+            if self._heat_art.get_visible():
+                self._heat_art.set_visible(False)
+                self._heat_version = None
+            self._update_points(limit, store)
+
+        self._update_highlight(store, selected)
+        if stroke_path is not None and len(stroke_path) > 1:
+            self._stroke_line.set_data(stroke_path[:, 0], stroke_path[:, 1])
+            self._stroke_line.set_visible(True)
+        else:
+            self._stroke_line.set_visible(False)
+
+    def _update_points(self, limit, store):
+        stop = limit + 1
+        max_v = max(1, len(store))
+        moves = sum(self._layers[(p, "move")].upto(stop) for p in self._pointers)
+        self.lod_active = bool(self.lod_threshold) and moves > self.lod_threshold and self._limits is not None
+
+        for key, art in self._artists.items():
+            if key[1] == "move" and self.lod_active:
+                art.set_visible(False)
+                continue
+            layer = self._layers[key]
+            k = layer.upto(stop)
+            order = layer.order[:k]
+            art.set_offsets(layer.xy[:k])
+            art.set_array(order)
+            art.set_clim(0, max_v)
+            art.set_visible(True)
+
+        for p_idx, art in self._density_art.items():
+            if self.lod_active:
+                self._update_density(p_idx, stop, max_v)
+            art.set_visible(self.lod_active)
+
+    def draw_since(self, start, stop):
+        """Draws only events [start, stop) plus the selection onto the canvas, over a restored keyframe.
+
+        Call after update() for `stop - 1`. The scatter layers are left holding
+        just those events; the next update() gives them everything back.
+        """
+        arts = []
+        for key, art in self._artists.items():
+            layer = self._layers[key]
+            a, b = layer.upto(start), layer.upto(stop)
+            art.set_offsets(layer.xy[a:b])
+            art.set_array(layer.order[a:b])
+            arts.append(art)
+        arts += [art for group in self._highlight.values() for art in group.values() if art.get_visible()]
+        if self._stroke_line.get_visible():
+            arts.append(self._stroke_line)
+        self._draw_artists(arts)
+
+    def data_artists(self):
+        """Every artist update() changes: points, density and heatmap images, selection and stroke path.
+
+        The rest of the figure (axes, grid, ticks, legend) only changes with
+        the limits, the canvas size or layout(), so it can be drawn once and restored.
+        """
+        arts = list(self._artists.values()) + list(self._density_art.values()) + [self._heat_art, self._stroke_line]
+        return arts + [art for group in self._highlight.values() for art in group.values()]
+
+    def draw_data(self):
+        """Draws the visible data_artists() onto the canvas, over a restored background without them."""
+        self._draw_artists([art for art in self.data_artists() if art.get_visible()])
+
+    def draw_moves(self, start=None, stop=None):
+        """Draws the move points: all update() shows, or just events [start, stop) over a bitmap of the earlier ones.
+
+        Without the LOD or heatmap, moves are the lowest data layer, so a
+        bitmap taken right after this holds the points and none of what goes
+        over them (see draw_overlay).
+        """
+        arts = []
+        for key, art in self._artists.items():
+            if key[1] == "move":
+                if start is not None:
+                    layer = self._layers[key]
+                    a, b = layer.upto(start), layer.upto(stop)
+                    art.set_offsets(layer.xy[a:b])
+                    art.set_array(layer.order[a:b])
+                arts.append(art)
+        self._draw_artists(arts)
+
+    def draw_overlay(self):
+        """Draws the visible data artists above the move points: down/up markers, stroke path and selection."""
+        moves = {art for key, art in self._artists.items() if key[1] == "move"}
+        self._draw_artists([art for art in self.data_artists() if art.get_visible() and art not in moves])
+
+    def _draw_artists(self, arts):
+        # Same order a full draw uses: by zorder, ties in creation order
+        for art in sorted(arts, key=lambda a: a.get_zorder()):
+            self.ax.draw_artist(art)
+
+    def _update_heatmap(self, coverage):
+        """One image for the selected coverage layers; re-uploaded only when new hits landed."""
+        if not self._heat_art.get_visible():
+            for art in list(self._artists.values()) + list(self._density_art.values()):
+                art.set_visible(False)
+            self._heat_art.set_visible(True)
+        if coverage.view is None or coverage.version == self._heat_version:
+            return
+        self._heat_version = coverage.version
+        self._heat_art.set_data(coverage.view)
+        self._heat_art.set_extent(coverage.extent)
+        self._heat_art.norm.vmax = max(2, coverage.peak)
+
+    def _update_density(self, p_idx, stop, max_v):
+        layer = self._layers[(p_idx, "move")]
+        grid = self._density[p_idx]
+        k = layer.upto(stop)
+        if grid.limits != self._limits or k < grid.consumed:
+            grid.reset(self._limits)
+        grid.add(layer.order[grid.consumed:k], layer.xy[grid.consumed:k])
+        grid.consumed = k
+        self._density_art[p_idx].set_data(grid.rgba(POINTER_MAPS[p_idx], max_v))
+
+    def _update_highlight(self, store, selected):
+        for arts in self._highlight.values():
+            for art in arts.values():
+                art.set_visible(False)
+        if selected is None or not 0 <= selected < len(store):
+            return
+
+        code = int(store.column('action')[selected])
+        index = int(store.column('action_index')[selected])
+        is_up = code in (ACTION_UP, ACTION_POINTER_UP)
+        is_down = code in (ACTION_DOWN, ACTION_POINTER_DOWN)
+
+        # Determine Highlight Size and Shape
+        s_size = 800 if is_down else (500 if is_up else 450)
+
+        for p_idx in mask_pointers(store.column('pointer_mask')[selected]):
+            if p_idx not in self._highlight:
+                continue
+            # Only the pointer actually lifting gets the X
+            lifting = is_up and (code == ACTION_UP or index == p_idx)
+            ring = "x" if lifting else ("o" if is_down else MOVE_MARKERS[p_idx])
+            dot = "dot_o" if ring in ("x", "o") else "dot_" + ring
+            self._show(p_idx, ring, dot, store.x(p_idx)[selected], store.y(p_idx)[selected], s_size)
+
+    def _show(self, p_idx, ring, dot, x, y, size):
+        arts = self._highlight[p_idx]
+        arts[ring].set_offsets([[x, y]])
+        arts[ring].set_sizes([size])
+        arts[ring].set_visible(True)
+        arts[dot].set_offsets([[x, y]])
+        arts[dot].set_visible(True)
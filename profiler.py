@@ -0,0 +1,130 @@
+import collections
+import os
+import threading
+import time
+
+import numpy as np
+
+# Durations kept per stage for the percentiles shown in the HUD
+WINDOW = 1000
+
+
+class _NullStage:
+    """What stage() hands out while profiling is off: entering and leaving it does nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, (time.perf_counter() - self.start) * 1000.0)
+        return False
+
+
+class Profiler:
+    """Per-stage timers and counters for the ingest/render path.
+
+    Instrumented code does `with PROFILER.stage("parse"): ...` and
+    `PROFILER.count("events", n)`. While disabled, stage() returns a shared
+    no-op context and count() returns straight away, so the cost is one
+    attribute check per call. When enabled, each stage keeps its last WINDOW
+    durations (for p50/p99) plus running totals, and if a log path is set
+    every record is appended to it as CSV (wall time, thread, stage, ms).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.log_path = None
+        self.reset()
+
+    def reset(self):
+        self._durations = collections.defaultdict(lambda: collections.deque(maxlen=WINDOW))
+        self._totals = collections.defaultdict(lambda: [0, 0.0])  # stage -> [calls, total ms]
+        self.counters = collections.defaultdict(int)
+        self._log = []
+        self._lock = threading.Lock()
+
+    def enable(self, log_path=None):
+        self.log_path = log_path
+        if log_path and not os.path.exists(log_path):
+            with open(log_path, "w") as f:
+                f.write("wall_time,thread,stage,ms\n")
+        self.enabled = True
+
+    def disable(self):
+        self.flush()
+        self.enabled = False
+
+    # --- RECORDING ---
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL
+        return _Stage(self, name)
+
+    def record(self, name, ms):
+        self._durations[name].append(ms)
+        totals = self._totals[name]
+        totals[0] += 1
+        totals[1] += ms
+        if self.log_path:
+            with self._lock:
+                self._log.append((time.time(), threading.current_thread().name, name, ms))
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] += n
+
+    # --- READING ---
+    def percentiles(self, name, qs=(50, 99)):
+        samples = self._durations.get(name)
+        if not samples:
+            return None
+        return np.percentile(np.fromiter(tuple(samples), dtype=np.float64), qs)
+
+    def stages(self):
+        """{stage: (calls, total ms, p50, p99)} for everything recorded so far."""
+        out = {}
+        for name, (calls, total) in list(self._totals.items()):
+            p = self.percentiles(name)
+            out[name] = (calls, total, float(p[0]), float(p[1]))
+        return out
+
+    def flush(self):
+        """Appends buffered records to the timing log."""
+        if not self.log_path:
+            return
+        with self._lock:
+            records, self._log = self._log, []
+        if records:
+            with open(self.log_path, "a") as f:
+                f.writelines(f"{t:.6f},{thread},{name},{ms:.4f}\n" for t, thread, name, ms in records)
+
+    def dump(self, path):
+        """Writes a per-stage summary table (calls, total, mean, p50, p99) to `path`."""
+        with open(path, "w") as f:
+            f.write("stage,calls,total_ms,mean_ms,p50_ms,p99_ms\n")
+            for name, (calls, total, p50, p99) in sorted(self.stages().items()):
+                f.write(f"{name},{calls},{total:.3f},{total / calls:.4f},{p50:.4f},{p99:.4f}\n")
+
+
+# Shared by every module; enabled from the GUI (F12) or TOUCHVIZ_PROFILE
+PROFILER = Profiler()
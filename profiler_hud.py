@@ -0,0 +1,75 @@
+import time
+import tkinter as tk
+
+from profiler import PROFILER
+
+REFRESH_MS = 500
+
+# Stages shown in the HUD, in pipeline order (anything else recorded is listed after them)
+STAGE_ORDER = ("read", "split", "parse", "apply", "terminal", "index", "plot_update", "layout", "draw")
+
+
+class ProfilerHud(tk.Label):
+    """Small text overlay with live ingest/render timings.
+
+    Shows events/sec and lines/sec (counter deltas between refreshes), the
+    ingest queue depth, frame p50/p99 and p50/p99 of every instrumented
+    stage. Enabling the HUD enables the shared PROFILER; hiding it disables
+    it again, so the instrumentation costs nothing while the HUD is off.
+    """
+
+    def __init__(self, parent, get_queue_depth):
+        super().__init__(parent, text="", justify=tk.LEFT, anchor=tk.NW, font=("Consolas", 9),
+                         bg="#202124", fg="#e8eaed", padx=8, pady=6)
+        self.get_queue_depth = get_queue_depth
+        self.visible = False
+        self._job = None
+        self._last = None  # (time, events, lines) at the previous refresh
+
+    def show(self, log_path=None):
+        if not PROFILER.enabled:
+            PROFILER.enable(log_path)
+        self.visible = True
+        self._last = None
+        self.place(relx=1.0, x=-10, y=10, anchor=tk.NE)
+        self.lift()
+        self.refresh()
+
+    def hide(self):
+        self.visible = False
+        if self._job:
+            self.after_cancel(self._job)
+            self._job = None
+        self.place_forget()
+        PROFILER.disable()
+
+    def toggle(self):
+        if self.visible:
+            self.hide()
+        else:
+            self.show()
+
+    def refresh(self):
+        now = time.perf_counter()
+        events, lines = PROFILER.counters["events"], PROFILER.counters["lines"]
+        rates = "events/s     -  | lines/s     -"
+        if self._last is not None:
+            dt = now - self._last[0]
+            if dt > 0:
+                rates = f"events/s {(events - self._last[1]) / dt:>5.0f} | lines/s {(lines - self._last[2]) / dt:>5.0f}"
+        self._last = (now, events, lines)
+
+        rows = [rates, f"queue {self.get_queue_depth()}"]
+        stages = PROFILER.stages()
+        frame = stages.pop("frame", None)
+        if frame:
+            rows.append(f"frame  p50 {frame[2]:6.2f}  p99 {frame[3]:6.2f} ms")
+        rows.append("")
+        order = [s for s in STAGE_ORDER if s in stages] + sorted(set(stages) - set(STAGE_ORDER))
+        for name in order:
+            calls, total, p50, p99 = stages[name]
+            rows.append(f"{name:<11} p50 {p50:6.2f}  p99 {p99:6.2f}")
+        self.config(text="\n".join(rows))
+
+        PROFILER.flush()
+        self._job = self.after(REFRESH_MS, self.refresh)
@@ -0,0 +1,421 @@
+"""Renders the plot off the Tk thread: a worker with its own Agg figure turns snapshots into bitmaps for Tk."""
+import collections
+import io
+import sys
+import threading
+
+import matplotlib
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from plot_renderer import TouchRenderer
+from profiler import PROFILER
+
+# --- KEYFRAMES ---
+# Seek frames (slider drags, playback) start from the nearest pre-rendered background
+# and draw only the events since it. At most KEYFRAMES per session, within KEYFRAME_MB.
+KEYFRAMES = 32
+KEYFRAME_MB = 128
+# Share of the session length it may grow by before a keyframe's colours are redrawn
+KEYFRAME_DRIFT = 0.05
+
+# --- APPENDS ---
+# The figure without its data (axes, grid, ticks, legend) is drawn once per
+# limits/size/layout and restored under every frame, which then only draws
+# the data artists. The move points, the bulk of them, are kept as a bitmap
+# too: a frame that only adds events at the end of the last one (live
+# capture) draws just the new moves onto it, then the few down/up markers
+# over them. Colours fade by the session length, so the moves are all
+# redrawn once the length has moved on by APPEND_DRIFT since they last were.
+APPEND_DRIFT = 0.02
+
+# --- BLITTING ---
+# matplotlib's own RGBA -> Tk photo copy is private (_backend_tk.blit), so it is
+# only used on the versions it is known to work with (see requirements.txt).
+# Elsewhere frames go through Tk's public photo put as PPM: slower, but it
+# can't break with a matplotlib upgrade.
+BLIT_VERSIONS = ((3, 7), (3, 11))
+
+
+def _private_blit():
+    try:
+        version = tuple(int(v) for v in matplotlib.__version__.split(".")[:2])
+    except ValueError:
+        return None
+    if not BLIT_VERSIONS[0] <= version <= BLIT_VERSIONS[1]:
+        return None
+    try:
+        from matplotlib.backends._backend_tk import blit
+    except ImportError:
+        return None
+    return blit
+
+
+_blit = _private_blit()
+
+
+def _ppm(rgba):
+    h, w = rgba.shape[:2]
+    return b"P6 %d %d 255\n" % (w, h) + np.ascontiguousarray(rgba[..., :3]).tobytes()
+
+
+class CoverageSnapshot:
+    """What TouchRenderer reads from a CoverageMap, copied so later syncs can't change it mid-draw."""
+
+    __slots__ = ("view", "version", "extent", "peak")
+
+    def __init__(self, coverage):
+        self.view = None if coverage.view is None else coverage.view.copy()
+        self.version = coverage.version
+        self.extent = coverage.extent
+        self.peak = coverage.peak
+
+
+class FrameRequest:
+    """Everything one frame shows, captured on the Tk thread so the worker never reads live state.
+
+    `events` is a zero-copy prefix of the store: rows are only ever appended
+    (growing or clearing the store allocates new arrays), so the rows it
+    covers stay as they are while the worker draws them.
+    """
+
+    __slots__ = ("events", "key", "limit", "selected", "stroke_path", "coverage", "limits", "size", "dpi", "seek")
+
+    def __init__(self, events, limit, selected, stroke_path, coverage, limits, size, dpi, seek=False):
+        self.events = events.slice(0)
+        self.key = (events, events.generation) # Same key: the renderer only indexes rows added since its last frame
+        self.limit = limit
+        self.selected = selected
+        self.stroke_path = stroke_path
+        self.coverage = coverage
+        self.limits = limits
+        self.size = size
+        self.dpi = dpi
+        self.seek = seek # Part of a scrub or playback: may be drawn from a keyframe
+
+    @property
+    def scene(self):
+        """What keyframes depend on: the data (not its length; see KeyframeCache), limits and canvas size."""
+        return self.key, self.limits, self.size, self.dpi
+
+
+class Frame:
+    """A finished bitmap plus the axes geometry it was drawn with (for mapping mouse clicks)."""
+
+    __slots__ = ("rgba", "axes_bounds", "xlim", "ylim")
+
+    def __init__(self, rgba, axes_bounds, xlim, ylim):
+        self.rgba = rgba
+        self.axes_bounds = axes_bounds
+        self.xlim = xlim
+        self.ylim = ylim
+
+
+class KeyframeCache:
+    """Bitmaps of the plot with events [0, k) drawn, for k every `interval` events through the session.
+
+    Keyframes belong to one scene (FrameRequest.scene) drawn with one
+    renderer layout (TouchRenderer.layout_generation, which moves when a
+    third pointer adds to the legend); a change of either empties the cache. Rows appended to the scene's data only add keyframe slots
+    past the end; once there would be more than the budget allows, the
+    interval doubles and every other keyframe is kept. Colours fade by the
+    session length, so a keyframe drawn when the session was shorter is
+    redrawn once the length has moved on by KEYFRAME_DRIFT. A scene that is
+    being scrubbed (seek requests) gets its missing and stale keyframes
+    rendered by the worker whenever it has nothing else to do. A keyframe is
+    None where the plot switches to the density image at k, since seek
+    frames there are drawn in full.
+    """
+
+    def __init__(self):
+        self.scene = None
+        self.request = None # Latest request of the scene, for rendering its keyframes
+        self.frames = {}    # Keyframe index -> (bitmap or None, session length it was drawn at)
+        self.interval = 1
+        self.limit = 1
+        self.events = 0
+        self.scrubbed = False
+
+    @property
+    def count(self):
+        """Keyframe slots covering the session so far."""
+        return max(1, -(-self.events // self.interval))
+
+    def update(self, request, frame_bytes, layout=0):
+        if (request.scene, layout) != self.scene:
+            self.scene = (request.scene, layout)
+            self.frames = {}
+            self.limit = int(max(1, min(KEYFRAMES, KEYFRAME_MB * 1e6 // max(1, frame_bytes))))
+            self.interval = max(1, -(-len(request.events) // self.limit))
+            self.scrubbed = False
+        self.events = len(request.events)
+        while self.count > self.limit:
+            self.interval *= 2
+            self.frames = {i // 2: frame for i, frame in self.frames.items() if i % 2 == 0}
+        self.request = request
+        self.scrubbed = self.scrubbed or request.seek
+
+    def nearest(self, stop):
+        """(k, bitmap) of the last keyframe at or before `stop` events, or None if it isn't rendered yet."""
+        i = min(stop // self.interval, self.count - 1)
+        frame = self.frames.get(i)
+        return None if frame is None or frame[0] is None else (i * self.interval, frame[0])
+
+    def add(self, i, bitmap):
+        self.frames[i] = (bitmap, self.events)
+
+    def missing(self):
+        """Index of a keyframe to render (not there yet, or drawn with faded-out colours) for a scrubbed scene, or None."""
+        if not self.scrubbed:
+            return None
+        stale = None
+        for i in range(self.count):
+            frame = self.frames.get(i)
+            if frame is None:
+                return i
+            if stale is None and self.events - frame[1] > KEYFRAME_DRIFT * self.events:
+                stale = i
+        return stale
+
+
+class RenderWorker:
+    """Background thread that owns a figure + TouchRenderer and draws requested frames with Agg.
+
+    request() keeps only the newest frame request: one that arrives while
+    another is still waiting replaces it (counted in `dropped`), so the
+    worker always draws the latest state and never falls behind however
+    often the UI asks. export() jobs (PNG file, clipboard bytes) are never
+    dropped and go first. The Tk thread collects results with results().
+    Seek requests are drawn from a KeyframeCache when possible, which the
+    worker fills in while idle; frames that only append events are drawn
+    over the previous one (see APPENDS).
+    """
+
+    def __init__(self, figsize=(8, 5)):
+        self.fig = Figure(figsize=figsize)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.renderer = TouchRenderer(self.fig.add_subplot())
+        self.dropped = 0
+        self._size = None
+        self._coverage = None
+        self._pending = None
+        self._exports = collections.deque()
+        self._frame = None
+        self._finished = []
+        self.keyframes = KeyframeCache()
+        self._background = None # ((limits, size, dpi, layout), bitmap of the figure without data artists or None)
+        self._moves = None # (scene, layout, stop, session length when all were drawn, bitmap) of the last frame's moves
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        """Ends the worker after the frame or export it is on, waiting up to `timeout` seconds for it."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    # --- TK THREAD ---
+    def snapshot_coverage(self, coverage):
+        """CoverageSnapshot of `coverage`, copied only when its view changed since the last one."""
+        if coverage is None:
+            return None
+        if self._coverage is None or self._coverage.version != coverage.version:
+            self._coverage = CoverageSnapshot(coverage)
+        return self._coverage
+
+    def request(self, frame):
+        """Asks for `frame` (a FrameRequest) to be drawn, superseding any request not started yet."""
+        with self._cond:
+            if self._pending is not None:
+                self.dropped += 1
+                PROFILER.count("stale_frames")
+            self._pending = frame
+            self._cond.notify()
+
+    def export(self, frame, target=None, dpi=300, fmt="png", done=None):
+        """Draws `frame` into `target` (a path; None returns the image bytes). done(result, error) gets the outcome."""
+        with self._cond:
+            self._exports.append((frame, target, dpi, fmt, done))
+            self._cond.notify()
+
+    def results(self):
+        """(newest finished Frame or None, [(done, result, error)] of finished exports)."""
+        with self._cond:
+            frame, self._frame = self._frame, None
+            finished, self._finished = self._finished, []
+        return frame, finished
+
+    # --- WORKER THREAD ---
+    def _run(self):
+        while True:
+            with self._cond:
+                while (self._pending is None and not self._exports and not self._stopped
+                       and self.keyframes.missing() is None):
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                job = self._exports.popleft() if self._exports else None
+                request = None
+                if job is None:
+                    request, self._pending = self._pending, None
+            if job is not None:
+                self._export(*job)
+                continue
+            if request is None: # Idle: render the next keyframe of the scene being scrubbed
+                self._render_keyframe(self.keyframes.missing())
+                continue
+            try:
+                frame = self._render(request)
+            except Exception as e: # A bad frame (e.g. limits of 0) must not kill the worker
+                print(f"Render worker: frame failed: {e}", file=sys.stderr)
+                continue
+            with self._cond:
+                self._frame = frame
+
+    def _prepare(self, req, limit=None, selection=True):
+        """Brings the figure and renderer to the state in `req` (shown up to `limit` instead, if given)."""
+        if (req.size, req.dpi) != self._size:
+            self._size = (req.size, req.dpi)
+            self.fig.set_dpi(req.dpi)
+            self.fig.set_size_inches(req.size[0] / req.dpi, req.size[1] / req.dpi)
+            with PROFILER.stage("layout"):
+                self.renderer.layout()
+        if req.limits is not None:
+            self.renderer.set_limits(*req.limits)
+        limit = req.limit if limit is None else limit
+        selected, stroke_path = (req.selected, req.stroke_path) if selection else (None, None)
+        with PROFILER.stage("plot_update"):
+            self.renderer.update(req.events, limit, selected, stroke_path, req.coverage, key=req.key)
+
+    def _render(self, req):
+        self._prepare(req)
+        layout = self.renderer.layout_generation
+        self.keyframes.update(req, req.size[0] * req.size[1] * 4, layout)
+        stop, n = req.limit + 1, len(req.events)
+        # Without the heatmap or density images the data is all points, which bitmaps can carry over;
+        # without a selection or stroke path either, the moves are the bottom layer (see APPENDS)
+        points = req.coverage is None and not self.renderer.lod_active
+        plain = points and req.selected is None and req.stroke_path is None
+        last = self._moves
+        append = (plain and last is not None and last[:2] == (req.scene, layout) and last[2] <= stop
+                  and n - last[3] <= APPEND_DRIFT * n)
+        keyframe = None
+        if req.seek and points and not append:
+            keyframe = self.keyframes.nearest(stop)
+        self._moves = None
+        moves_only = False
+        with PROFILER.stage("draw"):
+            if append:
+                self.canvas.restore_region(last[4])
+                self.renderer.draw_moves(last[2], stop)
+                moves_only = True
+            elif keyframe is not None:
+                start, background = keyframe
+                self.canvas.restore_region(background)
+                self.renderer.draw_since(start, stop)
+            elif req.coverage is not None or not self._restore_background(req, layout):
+                self.canvas.draw() # The heatmap sits under the grid, so it can't go over the background
+            elif plain:
+                self.renderer.draw_moves()
+                moves_only = True
+            else:
+                self.renderer.draw_data()
+            if moves_only:
+                self._moves = (req.scene, layout, stop, last[3] if append else n,
+                               self.canvas.copy_from_bbox(self.fig.bbox))
+                self.renderer.draw_overlay()
+        ax = self.renderer.ax
+        return Frame(np.array(self.canvas.buffer_rgba()), ax.get_position().bounds, ax.get_xlim(), ax.get_ylim())
+
+    def _render_keyframe(self, i):
+        req = self.keyframes.request
+        frame = None
+        try:
+            self._prepare(req, limit=i * self.keyframes.interval - 1, selection=False)
+            if req.coverage is None and not self.renderer.lod_active:
+                with PROFILER.stage("keyframe"):
+                    if self._restore_background(req, self.renderer.layout_generation):
+                        self.renderer.draw_data()
+                    else:
+                        self.canvas.draw()
+                    frame = self.canvas.copy_from_bbox(self.fig.bbox)
+        except Exception as e:
+            print(f"Render worker: keyframe failed: {e}", file=sys.stderr)
+        self.keyframes.add(i, frame)
+
+    def _restore_background(self, req, layout):
+        """Puts back the figure without its data artists, drawn again only when the limits, size or layout moved.
+
+        False, restoring nothing, on the first frame after they moved: that
+        one is drawn in full and the background waits for a second frame to
+        want it, so each step of a window resize doesn't pay for it.
+        """
+        state = (req.limits, req.size, req.dpi, layout)
+        if self._background is None or self._background[0] != state:
+            self._background = (state, None)
+            return False
+        if self._background[1] is None:
+            with PROFILER.stage("background"):
+                arts = [art for art in self.renderer.data_artists() if art.get_visible()]
+                for art in arts:
+                    art.set_visible(False)
+                self.canvas.draw()
+                self._background = (state, self.canvas.copy_from_bbox(self.fig.bbox))
+                for art in arts:
+                    art.set_visible(True)
+        self.canvas.restore_region(self._background[1])
+        return True
+
+    def _export(self, req, target, dpi, fmt, done):
+        result, error = None, None
+        try:
+            self._prepare(req)
+            out = io.BytesIO() if target is None else target
+            self.fig.savefig(out, format=fmt, dpi=dpi)
+            result = out.getvalue() if target is None else target
+        except Exception as e:
+            error = e
+        with self._cond:
+            self._finished.append((done, result, error))
+
+
+class WorkerCanvas(FigureCanvasTkAgg):
+    """Tk canvas that shows RenderWorker bitmaps instead of drawing its own figure.
+
+    The figure stays for sizing and mouse events (inaxes, xdata/ydata), kept
+    in step with each shown frame by show(). draw(), which draw_idle and
+    window resizes end up in, asks for a frame via `request_frame` instead
+    of rasterizing on the Tk thread.
+    """
+
+    def __init__(self, figure, master, request_frame):
+        self.request_frame = request_frame
+        super().__init__(figure, master=master)
+
+    def draw(self):
+        self.request_frame()
+
+    def show(self, frame):
+        """Blits a finished frame. False if the canvas was resized since it was requested (a newer one is due)."""
+        h, w = frame.rgba.shape[:2]
+        if (w, h) != (self._tkphoto.width(), self._tkphoto.height()):
+            return False
+        if _blit is not None:
+            _blit(self._tkphoto, frame.rgba, (0, 1, 2, 3))
+        else:
+            self._tkphoto.put(_ppm(frame.rgba))
+        ax = self.figure.axes[0]
+        ax.set_position(frame.axes_bounds)
+        ax.set_xlim(frame.xlim)
+        ax.set_ylim(frame.ylim)
+        return True
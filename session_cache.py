@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+
+from event_store import MAX_POINTERS
+from motion_parser import PARSER_VERSION
+from session_file import save_session, load_session, SessionFormatError, EXTENSION
+
+# Where parsed imports are kept, and how much disk they may use (0 turns the cache off)
+CACHE_DIR_ENV = "TOUCHVIZ_CACHE_DIR"
+CACHE_MB_ENV = "TOUCHVIZ_CACHE_MB"
+DEFAULT_MAX_MB = 2048
+
+HASH_CHUNK = 1 << 22
+_INDEX = "index.json"
+
+
+def app_dir():
+    """Per-user folder for the visualizer's own files (import cache, autosave journal)."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "touchviz")
+
+
+def default_dir():
+    if os.environ.get(CACHE_DIR_ENV):
+        return os.environ[CACHE_DIR_ENV]
+    return os.path.join(app_dir(), "sessions")
+
+
+def file_digest(path):
+    """BLAKE2b of the file's bytes (hex)."""
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class SessionCache:
+    """On-disk cache of parsed imports, as .tses files keyed by source content and parser version.
+
+    An entry is named after the BLAKE2b digest of the source file plus
+    PARSER_VERSION and MAX_POINTERS, so editing the file or changing the
+    parser simply stops matching (stale entries are evicted first). Hits are
+    memory-mapped by load_session, so a cached import costs a hash and an
+    mmap instead of a parse. Digests are remembered per (path, size, mtime)
+    so unchanged files are not even re-hashed.
+
+    The directory is kept under `max_bytes` by deleting least-recently-used
+    entries; every hit refreshes the entry's mtime. max_bytes=0 disables it.
+    Lookups and stores may run on worker threads (hashing and writing a big
+    import takes seconds); the digest index is shared under a lock.
+    """
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or default_dir()
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get(CACHE_MB_ENV, DEFAULT_MAX_MB)) * 1e6)
+        self.max_bytes = max_bytes
+        self._index = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    # --- KEYS ---
+    def _load_index(self):
+        if self._index is None:
+            try:
+                with open(os.path.join(self.directory, _INDEX)) as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _save_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = os.path.join(self.directory, _INDEX + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp, os.path.join(self.directory, _INDEX))
+
+    def key(self, path):
+        """Cache key for the current content of `path`."""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        with self._lock:
+            known = self._load_index().get(path)
+        if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+            digest = known[2]
+        else:
+            digest = file_digest(path)
+            with self._lock:
+                self._load_index()[path] = [st.st_size, st.st_mtime_ns, digest]
+                self._save_index()
+        return f"{digest}-v{PARSER_VERSION}-p{MAX_POINTERS}"
+
+    def entry_path(self, key):
+        return os.path.join(self.directory, key + EXTENSION)
+
+    # --- LOOKUP / STORE ---
+    def get(self, path):
+        """Session parsed earlier from identical content, or None."""
+        if not self.enabled:
+            return None
+        entry = self.entry_path(self.key(path))
+        if not os.path.exists(entry):
+            return None
+        try:
+            session = load_session(entry)
+        except (OSError, SessionFormatError, ValueError, KeyError):
+            self._remove(entry) # Truncated or from an incompatible build
+            return None
+        try:
+            os.utime(entry) # LRU: a hit makes it the newest entry
+        except OSError:
+            pass
+        return session
+
+    def put(self, path, events, line_buf, line_offsets, **meta):
+        """Stores a parsed import of `path`, then evicts down to the size limit. Returns the entry path."""
+        if not self.enabled:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        entry = self.entry_path(self.key(path))
+        save_session(entry, events, line_buf, line_offsets, source=os.path.basename(path), **meta)
+        self.evict()
+        return entry
+
+    # --- MAINTENANCE ---
+    def entries(self):
+        """[(mtime, size, path)] of every cached session, oldest first."""
+        found = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return found
+        for name in names:
+            if name.endswith(EXTENSION):
+                p = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                found.append((st.st_mtime, st.st_size, p))
+        return sorted(found)
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """Drops entries from older parser versions, then the least recently used until under max_bytes."""
+        current = f"-v{PARSER_VERSION}-p{MAX_POINTERS}{EXTENSION}"
+        entries = []
+        for entry in self.entries():
+            if entry[2].endswith(current):
+                entries.append(entry)
+            else:
+                self._remove(entry[2])
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in entries:
+            if total <= self.max_bytes:
+                break
+            if self._remove(p):
+                total -= size
+
+        # Forget digests of source files that no longer exist
+        with self._lock:
+            index = self._load_index()
+            stale = [p for p in index if not os.path.exists(p)]
+            for p in stale:
+                del index[p]
+            if stale:
+                self._save_index()
+
+    def clear(self):
+        for _, _, p in self.entries():
+            self._remove(p)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except OSError: # Still memory-mapped on Windows; it goes on a later pass
+            return False
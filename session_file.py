@@ -0,0 +1,182 @@
+import json
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+from event_store import EventStore, SCALAR_COLUMNS, POINTER_NAMES
+from motion_parser import PARSER_VERSION
+
+# --- FILE LAYOUT ---
+# MAGIC | uint64 header length | JSON header | padding | arrays, each ALIGN-byte aligned
+#
+# The header lists every array's dtype, shape and byte offset, so loading is
+# one mmap plus a zero-copy np.frombuffer per column. Arrays are
+# little-endian regardless of the machine that wrote them. The pointer
+# columns only hold rows up to the highest one used ("pointers" in the
+# header); loading fills in the rest up to max_pointers, as it does for
+# columns a file predates.
+MAGIC = b"TSES\x00\x00\x00\x01"
+FORMAT_VERSION = 2
+READ_VERSIONS = (1, 2) # 1: x/y stored with all max_pointers rows
+EXTENSION = ".tses"
+ALIGN = 64
+
+_LEN = struct.Struct("<Q")
+
+
+class SessionFormatError(ValueError):
+    pass
+
+
+class Session:
+    """A loaded session: the event store, the raw log lines, the metadata dict and any extra arrays.
+
+    `line_buf` / `line_offsets` are in LineStore layout (see log_view.LineStore.load):
+    after load_session the buffer is the whole mapped file and the offsets
+    point into it.
+    """
+
+    __slots__ = ("events", "line_buf", "line_offsets", "meta", "extras")
+
+    def __init__(self, events, line_buf, line_offsets, meta, extras=None):
+        self.events = events
+        self.line_buf = line_buf
+        self.line_offsets = line_offsets
+        self.meta = meta
+        self.extras = extras or {}
+
+
+def _pad(n):
+    return -n % ALIGN
+
+
+def save_session(path, events, line_buf, line_offsets, extra_arrays=None, **meta):
+    """Writes `events` plus the raw log lines to `path`. Extra keyword args go into the metadata.
+
+    `extra_arrays` ({name: ndarray}, e.g. the coverage heatmap) are stored
+    alongside and come back in Session.extras.
+
+    The file is written next to `path` and renamed over it, so a crash never
+    leaves a half-written session behind.
+    """
+    save_session_parts(path, [(events, line_buf, line_offsets)], extra_arrays, **meta)
+
+
+def save_session_parts(path, parts, extra_arrays=None, **meta):
+    """save_session for a session held in consecutive pieces: [(events, line_buf, line_offsets), ...].
+
+    The pieces (e.g. on-disk spill segments plus the in-memory tail) are
+    streamed into one file column by column without joining them in memory.
+    """
+    chunks = {}
+    for name, _, _ in SCALAR_COLUMNS:
+        chunks[name] = [events.column(name) for events, _, _ in parts]
+    used = [p for events, _, _ in parts for p in events.pointers_used()]
+    pointers = max(used) + 1 if used else 0
+    for name in POINTER_NAMES:
+        chunks[name] = [events.column(name)[:pointers] for events, _, _ in parts]
+    # Each piece's offsets start at 0 in its own buffer; shift them to their place in the joined one
+    offsets, shift = [], 0
+    for _, buf, line_offsets in parts:
+        line_offsets = np.asarray(line_offsets, dtype=np.int64)
+        offsets.append(line_offsets[:-1] + shift)
+        shift += int(line_offsets[-1])
+    chunks["line_offsets"] = offsets + [np.array([shift], dtype=np.int64)]
+    chunks["line_buf"] = [np.frombuffer(buf, dtype=np.uint8) for _, buf, _ in parts]
+    for name, arr in (extra_arrays or {}).items():
+        if name in chunks:
+            raise ValueError(f"extra array {name!r} clashes with a session column")
+        chunks[name] = [arr]
+
+    n = sum(len(events) for events, _, _ in parts)
+    started = None
+    for events, _, _ in parts:
+        pc_time = events.column('pc_time')
+        known = pc_time[~np.isnan(pc_time)]
+        if len(known):
+            started = float(known[0])
+            break
+    meta.setdefault("capture_start", started)
+    meta.update(saved_at=time.time(), parser_version=PARSER_VERSION)
+
+    layout, offset = {}, 0
+    for name, parts_of in chunks.items():
+        first = parts_of[0]
+        shape = list(first.shape[:-1]) + [sum(c.shape[-1] for c in parts_of)] if first.ndim else []
+        nbytes = int(np.prod(shape)) * first.dtype.itemsize
+        layout[name] = {"dtype": first.dtype.newbyteorder("<").str, "shape": shape, "offset": offset}
+        offset += nbytes + _pad(nbytes)
+    header = json.dumps({
+        "version": FORMAT_VERSION,
+        "events": n,
+        "max_pointers": parts[0][0].max_pointers,
+        "pointers": pointers,
+        "lines": sum(len(line_offsets) - 1 for _, _, line_offsets in parts),
+        "meta": meta,
+        "arrays": layout,
+    }).encode("utf-8")
+    data_start = len(MAGIC) + _LEN.size + len(header)
+    data_start += _pad(data_start)
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(_LEN.pack(len(header)))
+        f.write(header)
+        f.write(b"\0" * (data_start - f.tell()))
+        for name, parts_of in chunks.items():
+            dtype = layout[name]["dtype"]
+            written = 0
+            # Row-major: for (pointers, n) columns every pointer's row is written across all pieces in turn
+            rows = [()] if parts_of[0].ndim < 2 else [(r,) for r in range(parts_of[0].shape[0])]
+            for row in rows:
+                for chunk in parts_of:
+                    arr = np.ascontiguousarray(chunk[row], dtype=dtype)
+                    if arr.nbytes:
+                        f.write(arr)
+                    written += arr.nbytes
+            f.write(b"\0" * _pad(written))
+    os.replace(tmp, path)
+
+
+def read_header(path):
+    """Just the JSON header (cheap: no arrays are touched)."""
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+        if magic[:4] != MAGIC[:4]:
+            raise SessionFormatError(f"{os.path.basename(path)} is not a touch session file")
+        (length,) = _LEN.unpack(f.read(_LEN.size))
+        header = json.loads(f.read(length))
+    if header.get("version") not in READ_VERSIONS:
+        raise SessionFormatError(f"Unsupported session format version {header.get('version')}")
+    header["_data_start"] = len(MAGIC) + _LEN.size + length + _pad(len(MAGIC) + _LEN.size + length)
+    return header
+
+
+def load_session(path):
+    """Memory-maps a session file. Returns a Session whose arrays are views into the mapping.
+
+    The mapping is copy-on-write: appending to or editing the loaded session
+    never touches the file on disk.
+    """
+    header = read_header(path)
+    base = header["_data_start"]
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        shape = tuple(spec["shape"])
+        count = int(np.prod(shape)) if shape else 1
+        arrays[name] = np.frombuffer(mm, dtype=dtype, count=count, offset=base + spec["offset"]).reshape(shape)
+
+    events = EventStore.from_arrays(arrays, header["events"], max_pointers=header["max_pointers"])
+    # Line offsets are stored relative to line_buf; shift them so the mapping itself is the buffer
+    line_offsets = arrays["line_offsets"] + (base + header["arrays"]["line_buf"]["offset"])
+    standard = {name for name, _, _ in SCALAR_COLUMNS} | set(POINTER_NAMES) | {"line_offsets", "line_buf"}
+    extras = {name: arr for name, arr in arrays.items() if name not in standard}
+    return Session(events, mm, line_offsets, header["meta"], extras)
@@ -0,0 +1,151 @@
+"""Chunk sources for the ingest pipeline besides the file/pipe tailers in tailer.py.
+
+Every source is an iterable of bytes chunks (plus optional TailReset markers)
+with a stop() method, so IngestPipeline can read any of them on its thread.
+"""
+import atexit
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from motion_parser import parse_lines
+from playback import build_timeline
+from tailer import PipeTailer, TailReset
+
+LOGCAT_TAG = "MicroXrInputService"
+
+
+class AdbLogcatSource:
+    """Runs `adb logcat -s <tag>:*` itself and reads its stdout in large chunks.
+
+    This replaces the `adb logcat > live_data.txt` + file tail hop: lines
+    arrive as soon as adb writes them, with no disk write or poll delay in
+    between. If adb exits (device unplugged, adb server restarted) it is
+    started again after `retry` seconds and a TailReset marks the gap in the
+    log. The child process is killed on stop() and at interpreter exit.
+    """
+
+    def __init__(self, serial=None, tag=LOGCAT_TAG, adb="adb", chunk_size=1 << 16, retry=2.0):
+        self.serial = serial
+        self.tag = tag
+        self.adb = adb
+        self.chunk_size = chunk_size
+        self.retry = retry
+        self.proc = None
+        self._reader = None
+        self._stopped = False
+        atexit.register(self.stop)
+
+    def command(self):
+        cmd = [self.adb]
+        if self.serial:
+            cmd += ["-s", self.serial]
+        return cmd + ["logcat", "-s", f"{self.tag}:*"]
+
+    def stop(self):
+        self._stopped = True
+        if self._reader:
+            self._reader.stop()
+        if self.proc and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+    def _spawn(self):
+        # No console window for adb when the GUI itself was started without one
+        flags = subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
+        self.proc = subprocess.Popen(self.command(), stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                     stdin=subprocess.DEVNULL, creationflags=flags)
+        self._reader = PipeTailer(self.proc.stdout, chunk_size=self.chunk_size)
+
+    def __iter__(self):
+        first = True
+        while not self._stopped:
+            try:
+                self._spawn()
+            except OSError as e:
+                yield f"--- COULD NOT START {' '.join(self.command())}: {e} ---\n".encode()
+                return
+            if not first:
+                yield TailReset("restarted")
+            first = False
+            yield from self._reader
+            self.proc.wait()
+            if self._stopped:
+                return
+            yield f"--- ADB LOGCAT EXITED ({self.proc.returncode}), RETRYING IN {self.retry:g}s ---\n".encode()
+            end = time.monotonic() + self.retry
+            while not self._stopped and time.monotonic() < end:
+                time.sleep(0.1)
+
+
+class ReplaySource:
+    """Feeds a recorded log at its original timing, `speed` times faster, or as fast as possible.
+
+    Timing comes from the device eventTime of the MotionEvent lines (the
+    same timeline playback uses, so pauses are capped at MAX_GAP_MS); other
+    lines go out together with the next event. speed=0 disables pacing, for
+    load-testing the pipeline. With loop=True the log starts over at the end,
+    preceded by a TailReset like a restarted logcat.
+    """
+
+    def __init__(self, path, speed=1.0, loop=False, tick=0.005):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.tick = tick
+        self._stopped = False
+
+    def stop(self):
+        self._stopped = True
+
+    def _schedule(self):
+        """(lines, due time in seconds from the start for each line)."""
+        with open(self.path, "rb") as f:
+            lines = f.read().splitlines(keepends=True)
+        cols = parse_lines(lines, max_pointers=1)
+        due = np.zeros(len(lines))
+        if len(cols['action']):
+            event_due = build_timeline(cols['eventTime'], cols['log_time']) / 1000.0
+            # Each line is due with the first event at or after it
+            pos = np.searchsorted(cols['source_line'], np.arange(len(lines)))
+            due = event_due[np.minimum(pos, len(event_due) - 1)]
+        return lines, due
+
+    def __iter__(self):
+        lines, due = self._schedule()
+        if self.speed:
+            due = due / self.speed
+        while not self._stopped:
+            start = time.perf_counter()
+            sent = 0
+            while sent < len(lines) and not self._stopped:
+                if not self.speed:
+                    k = min(len(lines), sent + 4096)
+                else:
+                    now = time.perf_counter() - start
+                    k = int(np.searchsorted(due, now, side="right"))
+                    if k <= sent:
+                        time.sleep(min(self.tick * 10, max(self.tick, due[sent] - now)))
+                        continue
+                yield b"".join(lines[sent:k])
+                sent = k
+            if not self.loop:
+                return
+            yield TailReset("restarted")
+
+
+def source_from_args(args):
+    """The chunk source selected on the command line, or None for the default (stdin / live_data.txt)."""
+    if args.replay:
+        if not os.path.exists(args.replay):
+            raise SystemExit(f"No such log: {args.replay}")
+        return ReplaySource(args.replay, speed=args.speed, loop=args.loop)
+    if args.adb is not None:
+        return AdbLogcatSource(serial=args.adb or None, tag=args.tag)
+    return None
@@ -0,0 +1,183 @@
+import math
+import numpy as np
+
+from event_store import mask_pointers
+
+
+class _Cell:
+    """Points in one grid cell. New batches are kept as chunks and merged on first read."""
+
+    __slots__ = ("chunks", "order", "pointer", "xy")
+
+    def __init__(self):
+        self.chunks = []
+        self.order = self.pointer = self.xy = None
+
+    def add(self, order, pointer, xy):
+        self.chunks.append((order, pointer, xy))
+
+    def arrays(self):
+        if self.chunks:
+            parts = self.chunks if self.order is None else [(self.order, self.pointer, self.xy)] + self.chunks
+            self.order = np.concatenate([c[0] for c in parts])
+            self.pointer = np.concatenate([c[1] for c in parts])
+            self.xy = np.concatenate([c[2] for c in parts])
+            self.chunks = []
+        return self.order, self.pointer, self.xy
+
+
+class SpatialIndex:
+    """Uniform-grid index over every pointer's (x, y) in an EventStore.
+
+    sync() only bins events appended since the previous call. Queries take a
+    slider limit and ignore events past it; because events are appended in
+    timestamp order, each cell's indices are sorted and the limit is a
+    binary search per cell.
+    """
+
+    def __init__(self, cell_size=32.0):
+        self.cell_size = float(cell_size)
+        self._cells = {}
+        self._bounds = None
+        self._store = None
+        self._indexed = 0
+
+    def __len__(self):
+        return self._indexed
+
+    def clear(self):
+        self._cells = {}
+        self._bounds = None
+        self._store = None
+        self._indexed = 0
+
+    def _key(self, x, y):
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def sync(self, store):
+        """Bins events added to `store` since the last call (rebuilds if the store was swapped or cleared)."""
+        if store is not self._store or len(store) < self._indexed:
+            self.clear()
+            self._store = store
+        start, stop = self._indexed, len(store)
+        if stop <= start:
+            return
+
+        orders, pointers, xys = [], [], []
+        for p in mask_pointers(np.bitwise_or.reduce(store.column('pointer_mask', stop)[start:])):
+            xs = store.x(p, stop)[start:]
+            ys = store.y(p, stop)[start:]
+            present = np.flatnonzero(~np.isnan(xs))
+            if len(present):
+                orders.append(present + start)
+                pointers.append(np.full(len(present), p, dtype=np.int8))
+                xys.append(np.column_stack((xs[present], ys[present])))
+        self._indexed = stop
+        if not orders:
+            return
+
+        order = np.concatenate(orders)
+        pointer = np.concatenate(pointers)
+        xy = np.concatenate(xys)
+
+        # Keep each cell's indices ascending: sort the batch by (cell, order) before splitting
+        cells = np.floor(xy / self.cell_size).astype(np.int64)
+        sort = np.lexsort((order, cells[:, 1], cells[:, 0]))
+        order, pointer, xy, cells = order[sort], pointer[sort], xy[sort], cells[sort]
+        lo, hi = cells.min(axis=0).tolist(), cells.max(axis=0).tolist()
+        if self._bounds is not None:
+            lo = [min(a, b) for a, b in zip(lo, self._bounds[0])]
+            hi = [max(a, b) for a, b in zip(hi, self._bounds[1])]
+        self._bounds = (lo, hi)
+
+        uniq, starts = np.unique(cells, axis=0, return_index=True)
+        bounds = list(starts[1:]) + [len(order)]
+        for (cx, cy), a, b in zip(uniq.tolist(), starts.tolist(), bounds):
+            cell = self._cells.get((cx, cy))
+            if cell is None:
+                cell = self._cells[(cx, cy)] = _Cell()
+            cell.add(order[a:b], pointer[a:b], xy[a:b])
+
+    def _candidates(self, key, limit):
+        cell = self._cells.get(key)
+        if cell is None:
+            return None
+        order, pointer, xy = cell.arrays()
+        k = int(np.searchsorted(order, limit, side='right'))
+        if k == 0:
+            return None
+        return order[:k], pointer[:k], xy[:k]
+
+    def nearest(self, x, y, limit, scale=(1.0, 1.0), max_dist=math.inf):
+        """Closest point among events [0, limit] as (timestamp_order, pointer, distance), or None.
+
+        `scale` weights the axes (e.g. pixels per data unit) so the metric can
+        match what the user sees; max_dist is in the same scaled units.
+        """
+        if not self._cells:
+            return None
+        sx, sy = scale
+        cx, cy = self._key(x, y)
+        step = self.cell_size * min(sx, sy)
+        best = None
+
+        # Ring r holds the cells at Chebyshev distance r from the query cell. Any
+        # point in ring r is at least (r - 1) * step away, so stop once that
+        # exceeds the best hit so far.
+        max_ring = self._max_ring(cx, cy)
+        for r in range(max_ring + 1):
+            floor = (r - 1) * step
+            if best is not None and floor > best[2]:
+                break
+            if floor > max_dist:
+                break
+            for key in self._ring(cx, cy, r):
+                found = self._candidates(key, limit)
+                if found is None:
+                    continue
+                order, pointer, xy = found
+                d = np.hypot((xy[:, 0] - x) * sx, (xy[:, 1] - y) * sy)
+                i = int(np.argmin(d))
+                if best is None or d[i] < best[2]:
+                    best = (int(order[i]), int(pointer[i]), float(d[i]))
+
+        if best is None or best[2] > max_dist:
+            return None
+        return best
+
+    def box(self, x0, y0, x1, y1, limit):
+        """Sorted, de-duplicated timestamp_orders of events with any pointer inside the box."""
+        if self._bounds is None:
+            return np.empty(0, dtype=np.int64)
+        x0, x1 = sorted((x0, x1))
+        y0, y1 = sorted((y0, y1))
+        (ax, ay), (bx, by) = self._key(x0, y0), self._key(x1, y1)
+        (lx, ly), (hx, hy) = self._bounds
+        hits = []
+        for kx in range(max(ax, lx), min(bx, hx) + 1):
+            for ky in range(max(ay, ly), min(by, hy) + 1):
+                found = self._candidates((kx, ky), limit)
+                if found is None:
+                    continue
+                order, _, xy = found
+                inside = (xy[:, 0] >= x0) & (xy[:, 0] <= x1) & (xy[:, 1] >= y0) & (xy[:, 1] <= y1)
+                hits.append(order[inside])
+        if not hits:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(hits))
+
+    def _max_ring(self, cx, cy):
+        (lx, ly), (hx, hy) = self._bounds
+        return max(cx - lx, hx - cx, cy - ly, hy - cy, 0)
+
+    @staticmethod
+    def _ring(cx, cy, r):
+        if r == 0:
+            yield (cx, cy)
+            return
+        for dx in range(-r, r + 1):
+            yield (cx + dx, cy - r)
+            yield (cx + dx, cy + r)
+        for dy in range(-r + 1, r):
+            yield (cx - r, cy + dy)
+            yield (cx + r, cy + dy)
@@ -0,0 +1,182 @@
+"""Rolling retention for long live captures: old events and log lines move to disk, the tail stays in RAM."""
+import atexit
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+
+from event_store import EventStore, MAX_POINTERS, SCALAR_COLUMNS, POINTER_NAMES
+from session_file import save_session, load_session
+
+# Retention kicks in once the window is this much over its limit, then trims back to the limit,
+# so spilling (and the index rebuilds it causes) happens in large, infrequent steps
+SLACK = 0.25
+
+# Size of a window of spilled history loaded back for scrubbing, when only a time limit is set
+HISTORY_EVENTS = 100_000
+
+# Spilled segments kept memory-mapped at once
+OPEN_SEGMENTS = 4
+
+
+class RetentionPolicy:
+    """How much of a live capture stays in memory: the last `max_events` events and/or `max_minutes` minutes."""
+
+    def __init__(self, max_events=None, max_minutes=None):
+        self.max_events = max_events or None
+        self.max_minutes = max_minutes or None
+
+    def __bool__(self):
+        return bool(self.max_events or self.max_minutes)
+
+    def __str__(self):
+        parts = []
+        if self.max_events:
+            parts.append(f"{self.max_events:,} events")
+        if self.max_minutes:
+            parts.append(f"{self.max_minutes:g} min")
+        return " / ".join(parts)
+
+    @property
+    def history_window(self):
+        return self.max_events or HISTORY_EVENTS
+
+    def excess(self, store):
+        """Number of oldest events to spill from `store` now (0 until it is SLACK over a limit)."""
+        n = len(store)
+        drop = 0
+        if self.max_events and n > self.max_events * (1 + SLACK):
+            drop = n - self.max_events
+        if self.max_minutes and n:
+            # Arrival time of live events; imported ones have none and never age out
+            pc_time = store.column('pc_time')
+            newest = pc_time[-1]
+            if not np.isnan(newest) and newest - pc_time[0] > self.max_minutes * 60 * (1 + SLACK):
+                drop = max(drop, int(np.searchsorted(pc_time, newest - self.max_minutes * 60)))
+        return min(drop, n)
+
+
+class SpillArchive:
+    """Append-only on-disk segments with the events (and their raw log lines) spilled from memory.
+
+    Each spill writes one .tses segment covering the next run of event and
+    line numbers, so the archive plus the in-memory tail is always the
+    whole capture. load() reads any range back from memory-mapped segments;
+    parts() hands every segment to save_session_parts for export. The
+    directory is temporary and removed on clear() and at exit.
+    """
+
+    def __init__(self, directory=None):
+        self._directory = directory
+        self.segments = []  # (first event, events, first line, lines, path)
+        self._open = OrderedDict()
+        atexit.register(self.clear)
+
+    def __len__(self):
+        """Events spilled so far."""
+        if not self.segments:
+            return 0
+        first, count = self.segments[-1][:2]
+        return first + count
+
+    @property
+    def lines(self):
+        if not self.segments:
+            return 0
+        _, _, first, count, _ = self.segments[-1]
+        return first + count
+
+    @property
+    def directory(self):
+        if self._directory is None:
+            self._directory = tempfile.mkdtemp(prefix="touchviz-spill-")
+        return self._directory
+
+    def append(self, events, line_buf, line_offsets):
+        """Writes a segment: `events` (a store whose base is len(self)) and the lines that come with them."""
+        if events.base != len(self):
+            raise ValueError(f"segment starts at event {events.base}, archive ends at {len(self)}")
+        path = os.path.join(self.directory, f"segment_{len(self.segments):06d}.tses")
+        save_session(path, events, line_buf, line_offsets, first_event=events.base, first_line=self.lines)
+        self.segments.append((events.base, len(events), self.lines, len(line_offsets) - 1, path))
+
+    def _session(self, k):
+        path = self.segments[k][4]
+        if path in self._open:
+            self._open.move_to_end(path)
+        else:
+            self._open[path] = load_session(path)
+            while len(self._open) > OPEN_SEGMENTS:
+                self._open.popitem(last=False)
+        return self._open[path]
+
+    def _overlapping(self, start, stop):
+        firsts = [seg[0] for seg in self.segments]
+        a = max(0, int(np.searchsorted(firsts, start, side='right')) - 1)
+        b = int(np.searchsorted(firsts, stop, side='left'))
+        return range(a, b)
+
+    def load(self, start, stop):
+        """Spilled events [start, stop) as a store with base=start, plus (line_buf, line_offsets, first_line).
+
+        Lines come whole per segment, so they cover at least every event loaded.
+        """
+        stop = min(stop, len(self))
+        pieces, bufs, offsets, shift, first_line = [], [], [], 0, None
+        for k in self._overlapping(start, stop):
+            first, count, line0, _, _ = self.segments[k]
+            session = self._session(k)
+            pieces.append(session.events.slice(max(start, first) - first, min(stop, first + count) - first))
+            if first_line is None:
+                first_line = line0
+            line_offsets = session.line_offsets
+            bufs.append(memoryview(session.line_buf)[int(line_offsets[0]):int(line_offsets[-1])])
+            offsets.append(line_offsets[:-1] - line_offsets[0] + shift)
+            shift += int(line_offsets[-1] - line_offsets[0])
+        events = EventStore(max_pointers=pieces[0].max_pointers if pieces else MAX_POINTERS,
+                            capacity=max(1, stop - start))
+        names = [name for name, _, _ in SCALAR_COLUMNS] + POINTER_NAMES
+        for piece in pieces:
+            events.extend({name: piece.column(name) for name in names})
+        events.base = start
+        line_offsets = np.concatenate(offsets + [np.array([shift], dtype=np.int64)])
+        return events, b"".join(bufs), line_offsets, first_line or 0
+
+    def parts(self):
+        """[(events, line_buf, line_offsets)] per segment, memory-mapped, for save_session_parts."""
+        parts = []
+        for k in range(len(self.segments)):
+            session = load_session(self.segments[k][4])
+            offsets = session.line_offsets
+            parts.append((session.events, memoryview(session.line_buf)[int(offsets[0]):int(offsets[-1])],
+                          offsets - offsets[0]))
+        return parts
+
+    def clear(self):
+        self.segments = []
+        self._open.clear()
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
+
+
+def spill(events, lines, archive, count):
+    """Writes the oldest `count` events of `events` and their log lines (a LineStore) to `archive`.
+
+    Returns (store holding the rest with its base moved along, number of
+    lines spilled); the caller then drops that many lines from the LineStore.
+    """
+    if count <= 0:
+        return events, 0
+    log_line = events.column('log_line')
+    # Lines up to the first kept event go with the spilled ones (lines between events belong to the earlier one)
+    cut = int(log_line[count]) - lines.base if count < len(events) and log_line[count] >= 0 else len(lines)
+    cut = max(0, min(cut, len(lines)))
+    buf, offsets = lines.raw(0, cut)
+    archive.append(events.slice(0, count), buf, offsets)
+    del buf
+    # Room to grow back up to the retention trigger without reallocating
+    rest = events.slice(count, copy=True, capacity=int((len(events) - count) * (1 + SLACK)) + EventStore.CHUNK)
+    return rest, cut
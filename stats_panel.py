@@ -0,0 +1,105 @@
+import os
+import tkinter as tk
+from tkinter import filedialog, messagebox
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from plot_renderer import POINTER_COLORS
+from timing_stats import RATE_BINS, LATENCY_BINS
+
+REFRESH_MS = 1000
+
+
+class StatsPanel(tk.Toplevel):
+    """Timing analytics window: summary text plus report-rate and latency histograms.
+
+    Re-syncs the TimingStats from `get_events()` once a second while open,
+    so it keeps up with a live capture without touching the main plot loop.
+    """
+
+    def __init__(self, parent, stats, get_events, default_name="TimingStats.csv"):
+        super().__init__(parent)
+        self.title("Timing Analytics")
+        self.geometry("760x640")
+        self.configure(bg="#f1f3f4")
+        self.stats = stats
+        self.get_events = get_events
+        self.default_name = default_name
+        self._job = None
+
+        bar = tk.Frame(self, bg="#f1f3f4", padx=10, pady=8)
+        bar.pack(fill=tk.X)
+        tk.Button(bar, text="Export…", command=self.export, font=("Segoe UI", 10, "bold")).pack(side=tk.RIGHT)
+        self.text = tk.Label(bar, text="", justify=tk.LEFT, anchor=tk.W, font=("Consolas", 10), bg="#f1f3f4")
+        self.text.pack(side=tk.LEFT, fill=tk.X)
+
+        self.fig = Figure(figsize=(7, 5))
+        self.ax_rate, self.ax_lat = self.fig.subplots(2, 1)
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.refresh()
+
+    def close(self):
+        if self._job:
+            self.after_cancel(self._job)
+        self.destroy()
+
+    def refresh(self):
+        self.stats.sync(self.get_events())
+        summary = self.stats.summary()
+        self._show_text(summary)
+        self._show_plots(summary)
+        self._job = self.after(REFRESH_MS, self.refresh)
+
+    def _show_text(self, summary):
+        lines = [f"events: {summary['events']:,}"]
+        for p, s in summary["pointers"].items():
+            iv = s["interval_ms"]
+            lines.append(f"P{p}: {s['rate_hz']:.1f} Hz | interval p50 {iv['p50']:.1f} / p95 {iv['p95']:.1f} / "
+                         f"p99 {iv['p99']:.1f} ms | jitter σ {s['jitter_ms']:.2f} ms, "
+                         f"successive {s['jitter_successive_ms']:.2f} ms")
+        for name, label in (("device_to_logcat", "device→logcat (excess)"), ("logcat_to_pc", "logcat→PC")):
+            s = summary["latency_ms"].get(name)
+            if s is None:
+                lines.append(f"{label}: n/a")
+            else:
+                lines.append(f"{label}: p50 {s['p50']:.0f} / p95 {s['p95']:.0f} / p99 {s['p99']:.0f} ms")
+        self.text.config(text="\n".join(lines))
+
+    def _show_plots(self, summary):
+        centers = (RATE_BINS[:-1] + RATE_BINS[1:]) / 2
+        self.ax_rate.clear()
+        for p, s in summary["pointers"].items():
+            self.ax_rate.bar(centers, s["rate_histogram"], width=np.diff(RATE_BINS), alpha=0.6,
+                             color=POINTER_COLORS[p], label=f"Pointer {p}")
+        self.ax_rate.set_title("Report rate", fontweight='bold')
+        self.ax_rate.set_xlabel("Hz")
+        if summary["pointers"]:
+            self.ax_rate.legend(fontsize=8)
+
+        centers = (LATENCY_BINS[:-1] + LATENCY_BINS[1:]) / 2
+        self.ax_lat.clear()
+        for name, color in (("device_to_logcat", "#4285f4"), ("logcat_to_pc", "#f4b400")):
+            s = summary["latency_ms"].get(name)
+            if s is not None:
+                self.ax_lat.bar(centers, s["histogram"], width=np.diff(LATENCY_BINS), alpha=0.6, color=color,
+                                label=name.replace("_to_", " → "))
+        self.ax_lat.set_title("Latency", fontweight='bold')
+        self.ax_lat.set_xlabel("ms")
+        if any(summary["latency_ms"].values()):
+            self.ax_lat.legend(fontsize=8)
+        self.fig.tight_layout()
+        self.canvas.draw_idle()
+
+    def export(self):
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".csv", initialfile=self.default_name,
+                                            filetypes=[("CSV Files", "*.csv")], title="Export Timing Stats")
+        if not path:
+            return
+        json_path = self.stats.export(path)
+        messagebox.showinfo("Success", f"Exported {os.path.basename(path)} and {os.path.basename(json_path)}",
+                            parent=self)
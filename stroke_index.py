@@ -0,0 +1,294 @@
+import numpy as np
+
+from event_store import (ACTION_DOWN, ACTION_UP, ACTION_CANCEL, ACTION_POINTER_DOWN, ACTION_POINTER_UP)
+
+BOUNDARY_CODES = (ACTION_DOWN, ACTION_UP, ACTION_CANCEL, ACTION_POINTER_DOWN, ACTION_POINTER_UP)
+
+# (name, dtype, fill) per stroke
+STROKE_COLUMNS = [
+    ("pointer", np.int8, -1),      # Pointer index the stroke started on
+    ("start", np.int64, -1),       # timestamp_order of its first event
+    ("end", np.int64, -1),         # timestamp_order of its UP, -1 while still down
+    ("t0", np.int64, 0),           # eventTime at start / latest sample (ms)
+    ("t1", np.int64, 0),
+    ("length", np.float64, 0.0),   # Path length in sensor units
+    ("xmin", np.float32, np.inf),
+    ("ymin", np.float32, np.inf),
+    ("xmax", np.float32, -np.inf),
+    ("ymax", np.float32, -np.inf),
+    ("samples", np.int32, 0),
+]
+
+# A segment is a run of events during which a stroke sat on one pointer index
+SEGMENT_COLUMNS = [("stroke", np.int64, -1), ("slot", np.int8, 0), ("a", np.int64, 0), ("b", np.int64, 0)]
+
+NO_SLOT = np.iinfo(np.int8).max
+
+
+class _Table:
+    """Growable set of equal-length NumPy columns."""
+
+    def __init__(self, layout, capacity=256):
+        self.layout = layout
+        self.size = 0
+        self.cols = {name: np.full(capacity, fill, dtype=dtype) for name, dtype, fill in layout}
+
+    def add(self):
+        if self.size == len(self.cols[self.layout[0][0]]):
+            for name, dtype, fill in self.layout:
+                col = self.cols[name]
+                grown = np.full(len(col) * 2, fill, dtype=dtype)
+                grown[:len(col)] = col
+                self.cols[name] = grown
+        self.size += 1
+        return self.size - 1
+
+    def __getitem__(self, name):
+        return self.cols[name][:self.size]
+
+
+class StrokeIndex:
+    """Strokes (DOWN ... UP of one finger) built incrementally from an EventStore.
+
+    Pointer indices follow Android's rules: ACTION_POINTER_DOWN(k) inserts a
+    pointer at index k and shifts the ones above it up, ACTION_POINTER_UP(k)
+    removes index k and shifts the rest down, ACTION_UP / ACTION_CANCEL end
+    everything. A stroke therefore stays the same finger even when its index
+    changes, and its samples are kept as segments (stroke, index, first, last).
+    Fingers already down when the log starts get a stroke from their first sample.
+
+    Only the few DOWN/UP events are visited in Python; samples between them
+    are summarized with NumPy per segment.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.strokes = _Table(STROKE_COLUMNS)
+        self.segments = _Table(SEGMENT_COLUMNS)
+        # Stroke per event: of the segments covering it, the one on the lowest pointer index. A fixed rule,
+        # so the answer doesn't depend on the order segments were cut in (i.e. on how syncs were batched)
+        self.event_stroke = np.full(4096, -1, dtype=np.int64)
+        self._event_slot = np.full(4096, NO_SLOT, dtype=np.int8)
+        self._segments_of = {} # Stroke id -> its segment rows, in time order
+        self._store = None
+        self._indexed = 0
+        self._open = []        # Stroke id per pointer index, -1 if none
+        self._seg_start = []   # Event where the open stroke's current segment began
+        self._gap_start = []   # First event not yet checked for an implicit (already-down) stroke
+        self._last_xy = {}     # Last sample of each open stroke, for path length across segments
+
+    def __len__(self):
+        return self.strokes.size
+
+    # --- BUILDING ---
+    def sync(self, store):
+        """Indexes events appended to `store` since the last call (rebuilds if the store was swapped or cleared)."""
+        if store is not self._store or len(store) < self._indexed:
+            self.clear()
+            self._store = store
+            n = store.max_pointers
+            self._open, self._seg_start, self._gap_start = [-1] * n, [0] * n, [0] * n
+        start, stop = self._indexed, len(store)
+        if stop <= start:
+            return
+        if stop > len(self.event_stroke):
+            cap = len(self.event_stroke)
+            while cap < stop:
+                cap *= 2
+            grown = np.full(cap, -1, dtype=np.int64)
+            grown[:len(self.event_stroke)] = self.event_stroke
+            self.event_stroke = grown
+            grown = np.full(cap, NO_SLOT, dtype=np.int8)
+            grown[:len(self._event_slot)] = self._event_slot
+            self._event_slot = grown
+
+        action = store.column('action', stop)
+        index = store.column('action_index', stop)
+        bounds = np.flatnonzero(np.isin(action[start:], BOUNDARY_CODES)) + start
+        for i in bounds.tolist():
+            self._open_implicit(i)
+            self._boundary(i, int(action[i]), int(index[i]))
+        self._open_implicit(stop)
+        for p, sid in enumerate(self._open):
+            if sid >= 0:
+                self._cut(p, stop - 1)
+                self._seg_start[p] = stop
+        self._indexed = stop
+
+    def _begin(self, p, i):
+        sid = self.strokes.add()
+        s = self.strokes.cols
+        s['pointer'][sid] = p
+        s['start'][sid] = i
+        s['t0'][sid] = s['t1'][sid] = self._store.column('eventTime')[i]
+        self._open[p] = sid
+        self._seg_start[p] = i
+        return sid
+
+    def _cut(self, p, last):
+        """Closes the open stroke's current segment on index p at event `last` and folds it into the stats."""
+        sid, a = self._open[p], self._seg_start[p]
+        if sid < 0 or last < a:
+            return
+        seg = self.segments.add()
+        g = self.segments.cols
+        g['stroke'][seg], g['slot'][seg], g['a'][seg], g['b'][seg] = sid, p, a, last
+        self._segments_of.setdefault(sid, []).append(seg)
+        slots = self._event_slot[a:last + 1]
+        wins = p <= slots
+        slots[wins] = p
+        self.event_stroke[a:last + 1][wins] = sid
+
+        xs = self._store.x(p)[a:last + 1]
+        ys = self._store.y(p)[a:last + 1]
+        present = ~np.isnan(xs)
+        if not present.any():
+            return
+        xs, ys = xs[present], ys[present]
+        s = self.strokes.cols
+        s['samples'][sid] += len(xs)
+        s['xmin'][sid] = min(s['xmin'][sid], xs.min())
+        s['xmax'][sid] = max(s['xmax'][sid], xs.max())
+        s['ymin'][sid] = min(s['ymin'][sid], ys.min())
+        s['ymax'][sid] = max(s['ymax'][sid], ys.max())
+        length = float(np.hypot(np.diff(xs), np.diff(ys)).sum())
+        prev = self._last_xy.get(sid)
+        if prev is not None:
+            length += float(np.hypot(xs[0] - prev[0], ys[0] - prev[1]))
+        s['length'][sid] += length
+        self._last_xy[sid] = (xs[-1], ys[-1])
+        s['t1'][sid] = self._store.column('eventTime')[last]
+
+    def _end(self, p, i):
+        sid = self._open[p]
+        if sid < 0:
+            return
+        self._cut(p, i)
+        self.strokes.cols['end'][sid] = i
+        self._last_xy.pop(sid, None)
+        self._open[p] = -1
+        self._gap_start[p] = i + 1
+
+    def _open_implicit(self, i):
+        """Gives fingers that show samples without a DOWN (log started mid-gesture) a stroke."""
+        found = []
+        for p, sid in enumerate(self._open):
+            a = self._gap_start[p]
+            if sid >= 0 or a >= i:
+                continue
+            present = np.flatnonzero(~np.isnan(self._store.x(p)[a:i]))
+            self._gap_start[p] = i
+            if len(present):
+                found.append((a + int(present[0]), p))
+        for first, p in sorted(found):
+            self._begin(p, first)
+
+    def _shift(self, i, k, up):
+        """Re-slots open strokes above index k when a pointer is inserted (up) or removed at k."""
+        n = len(self._open)
+        moving = [p for p in range(k if up else k + 1, n) if self._open[p] >= 0]
+        for p in moving:
+            self._cut(p, i - 1 if up else i)
+        order = range(n - 1, k - 1, -1) if up else range(k + 1, n)
+        for p in order:
+            q = p + 1 if up else p - 1
+            if 0 <= q < n:
+                self._open[q] = self._open[p]
+                self._seg_start[q] = i if up else i + 1
+                self._gap_start[q] = i if up else i + 1
+            elif self._open[p] >= 0:
+                # Pushed past max_pointers: we can no longer follow it, so end it here
+                self.strokes.cols['end'][self._open[p]] = i - 1
+                self._last_xy.pop(self._open[p], None)
+            self._open[p] = -1
+            self._gap_start[p] = i if up else i + 1
+
+    def _boundary(self, i, code, k):
+        n = len(self._open)
+        if code == ACTION_DOWN:
+            for p in range(n):
+                self._end(p, i - 1) # A stroke still open here lost its UP
+            self._begin(0, i)
+        elif code == ACTION_POINTER_DOWN and k < n:
+            self._shift(i, k, up=True)
+            self._begin(k, i)
+        elif code == ACTION_POINTER_UP and k < n:
+            self._end(k, i)
+            self._shift(i, k, up=False)
+        elif code in (ACTION_UP, ACTION_CANCEL):
+            for p in range(n):
+                self._end(p, i)
+
+    # --- QUERIES (O(1) per call) ---
+    def stroke_of(self, event):
+        """Stroke id containing `event`, or -1."""
+        if not 0 <= event < self._indexed:
+            return -1
+        return int(self.event_stroke[event])
+
+    def info(self, sid):
+        """Per-stroke stats as a dict (duration in ms, path length in sensor units)."""
+        s = self.strokes
+        return {
+            'stroke': sid,
+            'pointer': int(s['pointer'][sid]),
+            'start': int(s['start'][sid]),
+            'end': int(s['end'][sid]),
+            'duration_ms': int(s['t1'][sid] - s['t0'][sid]),
+            'length': float(s['length'][sid]),
+            'bbox': (float(s['xmin'][sid]), float(s['ymin'][sid]), float(s['xmax'][sid]), float(s['ymax'][sid])),
+            'samples': int(s['samples'][sid]),
+        }
+
+    def stroke_near(self, event):
+        """Stroke containing `event`, else the last one started before it, else -1."""
+        sid = self.stroke_of(event)
+        if sid < 0:
+            sid = int(np.searchsorted(self.strokes['start'], event, side='right')) - 1
+        return sid
+
+    def next_start(self, event):
+        """First event of the stroke after the one at `event` (or the first stroke after it), or None."""
+        sid = self.stroke_near(event)
+        starts = self.strokes['start']
+        nxt = sid + 1
+        return int(starts[nxt]) if nxt < len(starts) else None
+
+    def prev_start(self, event):
+        """Start of the current stroke if `event` is past it, else of the previous stroke, or None."""
+        sid = self.stroke_of(event)
+        starts = self.strokes['start']
+        if sid < 0:
+            sid = int(np.searchsorted(starts, event, side='right')) - 1
+            if sid < 0:
+                return None
+            return int(starts[sid])
+        if event > starts[sid]:
+            return int(starts[sid])
+        return int(starts[sid - 1]) if sid > 0 else None
+
+    def last_event(self, sid):
+        """UP event of a finished stroke, or its latest sample while it is still down."""
+        end = int(self.strokes['end'][sid])
+        if end >= 0:
+            return end
+        segs = self._segments_of.get(sid)
+        return int(self.segments.cols['b'][segs[-1]]) if segs else int(self.strokes['start'][sid])
+
+    def path(self, sid, limit=None):
+        """(N, 2) samples of a stroke in time order, optionally only events <= limit."""
+        g = self.segments.cols
+        parts = []
+        for r in self._segments_of.get(sid, ()):
+            a, b, p = int(g['a'][r]), int(g['b'][r]), int(g['slot'][r])
+            if limit is not None:
+                b = min(b, limit)
+            if b < a:
+                continue
+            xs = self._store.x(p)[a:b + 1]
+            ys = self._store.y(p)[a:b + 1]
+            keep = ~np.isnan(xs)
+            parts.append(np.column_stack((xs[keep], ys[keep])))
+        return np.concatenate(parts) if parts else np.empty((0, 2), dtype=np.float32)
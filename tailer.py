@@ -0,0 +1,173 @@
+import os
+import stat
+import sys
+import time
+
+from profiler import PROFILER
+
+CHUNK_SIZE = 1 << 20
+
+
+class TailReset:
+    """Yielded in place of a chunk when the followed file was truncated or replaced."""
+
+    def __init__(self, reason):
+        self.reason = reason
+
+    def __repr__(self):
+        return f"TailReset({self.reason!r})"
+
+
+class PipeTailer:
+    """Chunks from a pipe (e.g. `adb logcat | py log_parser.py`), ending cleanly at EOF.
+
+    On POSIX the fd is polled with a selector so stop() is honoured within
+    `poll` seconds; on Windows, where select() only takes sockets, a blocking
+    read1() is used instead. Neither spins once the writer goes quiet or
+    closes the pipe. A regular file (`py log_parser.py < log.txt`) can't be
+    polled (epoll refuses it) and never blocks, so it is read straight through.
+    """
+
+    def __init__(self, stream, chunk_size=1 << 16, poll=0.5):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.poll = poll
+        self._stopped = False
+
+    def stop(self):
+        self._stopped = True
+
+    def __iter__(self):
+        if sys.platform == "win32" or stat.S_ISREG(os.fstat(self.stream.fileno()).st_mode):
+            yield from self._blocking()
+        else:
+            yield from self._selected()
+
+    def _blocking(self):
+        # read1 on a buffered stream; an unbuffered one (Popen bufsize=0) is raw, where read() is one read already
+        read = getattr(self.stream, "read1", self.stream.read)
+        while not self._stopped:
+            with PROFILER.stage("read"):
+                chunk = read(self.chunk_size)
+            if not chunk:
+                return
+            PROFILER.count("bytes", len(chunk))
+            yield chunk
+
+    def _selected(self):
+        import selectors
+        fd = self.stream.fileno()
+        with selectors.DefaultSelector() as sel:
+            sel.register(fd, selectors.EVENT_READ)
+            while not self._stopped:
+                if not sel.select(self.poll):
+                    continue
+                with PROFILER.stage("read"):
+                    chunk = os.read(fd, self.chunk_size)
+                if not chunk:
+                    return
+                PROFILER.count("bytes", len(chunk))
+                yield chunk
+
+
+class FileTailer:
+    """Follows a growing file (live_data.txt) in large chunks.
+
+    Idle polling backs off from `min_wait` to `max_wait` and snaps back as
+    soon as data arrives. The file is checked for truncation (size dropped
+    below our offset, or the first bytes changed, as when controller.ps1
+    restarts `adb logcat > live_data.txt`) and for replacement (different
+    inode / file index); either way reading restarts at offset 0 after a
+    TailReset is yielded.
+    """
+
+    HEAD_BYTES = 64
+    HEAD_CHECK_EVERY = 1.0  # seconds
+
+    def __init__(self, path, from_end=True, chunk_size=CHUNK_SIZE, min_wait=0.002, max_wait=0.25):
+        self.path = path
+        self.from_end = from_end
+        self.chunk_size = chunk_size
+        self.min_wait = min_wait
+        self.max_wait = max_wait
+        self._stopped = False
+        self._f = None
+        self._head = b''
+        self._last_head_check = 0.0
+
+    def stop(self):
+        self._stopped = True
+
+    # --- FILE STATE ---
+    def _open(self, at_end):
+        if not os.path.exists(self.path):
+            open(self.path, "a").close()
+        self._f = open(self.path, "rb")
+        self._f.seek(0, 2 if at_end else 0)
+        self._head = self._read_head()
+
+    def _read_head(self):
+        pos = self._f.tell()
+        self._f.seek(0)
+        head = self._f.read(self.HEAD_BYTES)
+        self._f.seek(pos)
+        return head
+
+    def _changed(self):
+        """Returns a reason string if the file we're holding is no longer the one at `path`."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None # Deleted and not yet recreated: keep waiting on the old handle
+        own = os.fstat(self._f.fileno())
+        if (st.st_ino, st.st_dev) != (own.st_ino, own.st_dev):
+            return "replaced"
+        if st.st_size < self._f.tell():
+            return "truncated"
+
+        # A restart that rewrote more than we had read leaves the size check blind; compare the head
+        now = time.monotonic()
+        if now - self._last_head_check >= self.HEAD_CHECK_EVERY:
+            self._last_head_check = now
+            head = self._read_head()
+            if self._head and head[:len(self._head)] != self._head[:len(head)]:
+                return "truncated"
+            if len(head) > len(self._head):
+                self._head = head
+        return None
+
+    # --- ITERATION ---
+    def __iter__(self):
+        self._open(self.from_end)
+        wait = self.min_wait
+        try:
+            while not self._stopped:
+                chunk = self._f.read(self.chunk_size)
+                if chunk:
+                    PROFILER.count("bytes", len(chunk))
+                busy_check = chunk and time.monotonic() - self._last_head_check >= self.HEAD_CHECK_EVERY
+                if chunk and not busy_check:
+                    wait = self.min_wait
+                    if len(self._head) < self.HEAD_BYTES:
+                        self._head = self._read_head()
+                    yield chunk
+                    continue
+
+                # Idle, or a busy stream due for its periodic check
+                reason = self._changed()
+                if chunk and not reason:
+                    yield chunk
+                    continue
+                if reason:
+                    # Anything read from the old file position is stale; start over from byte 0
+                    self._f.close()
+                    self._open(at_end=False)
+                    wait = self.min_wait
+                    yield TailReset(reason)
+                    continue
+
+                time.sleep(wait)
+                wait = min(wait * 2, self.max_wait)
+        finally:
+            if self._f:
+                self._f.close()
@@ -0,0 +1,38 @@
+import os
+
+import numpy as np
+
+from event_store import EventStore
+from motion_parser import parse_lines
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def sample_lines(name='input_two_touch_new.txt'):
+    with open(os.path.join(ROOT, name), 'rb') as f:
+        return f.read().splitlines()
+
+
+def parsed_batches(lines, size):
+    """(columns with log_line set, lines) per `size` lines, numbered the way apply_batch numbers them."""
+    for i in range(0, len(lines), size):
+        part = lines[i:i + size]
+        cols = parse_lines(part)
+        cols['log_line'] = i + cols['source_line']
+        yield cols, part
+
+
+def store_of(lines):
+    events = EventStore()
+    for cols, _ in parsed_batches(lines, len(lines)):
+        events.extend(cols)
+    return events
+
+
+def assert_same_events(a, b):
+    assert len(a) == len(b)
+    assert np.array_equal(a.column('action'), b.column('action'))
+    assert np.array_equal(a.column('log_line'), b.column('log_line'))
+    for p in range(max(a.pointers_used() + b.pointers_used(), default=-1) + 1):
+        assert np.array_equal(a.x(p), b.x(p), equal_nan=True)
+        assert np.array_equal(a.y(p), b.y(p), equal_nan=True)
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import numpy as np
+from matplotlib.image import imread
+
+from batch_render import load_events, render_png
+
+from helpers import ROOT
+
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+from gen_motion_log import write_log
+
+
+def test_png_does_not_depend_on_previous_file(tmp_path):
+    many = str(tmp_path / "four_fingers.txt")
+    write_log(many, pointers=4, lines=400, seed=1)
+    four = load_events(many)
+    one = load_events(os.path.join(ROOT, 'input_two_touch_new.txt'))
+    assert max(four.pointers_used()) > max(one.pointers_used())
+
+    render_png(one, str(tmp_path / "alone.png"), 1600, 306, dpi=50)
+    render_png(four, str(tmp_path / "first.png"), 1600, 306, dpi=50)
+    render_png(one, str(tmp_path / "after.png"), 1600, 306, dpi=50)
+    assert np.array_equal(imread(tmp_path / "alone.png"), imread(tmp_path / "after.png"))
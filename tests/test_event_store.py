@@ -0,0 +1,49 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from event_store import EventStore
+from motion_parser import MARKER, _empty, _fast, _slow
+
+from helpers import sample_lines, store_of
+
+
+def test_csv_keeps_every_motionevent_field():
+    events = store_of(sample_lines())
+    buf = io.StringIO()
+    events.to_frame().to_csv(buf, index=False)
+    df = pd.read_csv(io.StringIO(buf.getvalue()))
+
+    for name in ("id_0", "toolType_0", "id_1", "toolType_1", "actionButton", "buttonState", "classification",
+                 "metaState", "flags", "edgeFlags", "historySize", "deviceId", "source", "displayId"):
+        assert name in df
+    first = df.iloc[0]
+    assert first["id_0"] == 0 and first["toolType_0"] == "TOOL_TYPE_FINGER"
+    assert first["flags"] == "0x0" and first["source"] == "0x300008" and first["displayId"] == -1
+    # Cells of pointers without a sample stay empty
+    assert df["id_1"].isna().sum() == np.isnan(events.x(1)).sum()
+
+    loaded = EventStore.from_frame(df)
+    # log_line isn't exported, and the float64 times only keep what the CSV prints
+    for name in set(events._cols) - {'log_line', 'pc_time', 'log_time'}:
+        a, b = events.column(name), loaded.column(name)
+        assert np.array_equal(a, b, equal_nan=a.dtype.kind == 'f'), name
+
+
+def test_fast_path_matches_slow_path_on_varying_fields():
+    lines = [l for l in sample_lines() if MARKER in l][:300]
+    for i, l in enumerate(lines):
+        if i % 3 == 0:
+            l = l.replace(b'TOOL_TYPE_FINGER', b'TOOL_TYPE_STYLUS', 1)
+        if i % 5 == 0:
+            l = l.replace(b'buttonState=0', b'buttonState=BUTTON_PRIMARY|BUTTON_BACK').replace(b'flags=0x0', b'flags=0x2')
+        if i % 7 == 0:
+            l = l.replace(b'deviceId=4', b'deviceId=9')
+        lines[i] = l
+    fast, slow = _empty(len(lines), 10), _empty(len(lines), 10)
+    assert _fast(b'\n'.join(lines), fast, 10)
+    _slow(lines, slow, 10)
+    for name in ("id", "toolType", "x", "y", "buttonState", "flags", "deviceId", "source", "eventId"):
+        assert np.array_equal(fast[name], slow[name], equal_nan=fast[name].dtype.kind == 'f'), name
+    assert set(np.unique(fast['toolType'][0])) == {1, 2}
@@ -0,0 +1,65 @@
+import time
+
+import ingest
+from ingest import IngestPipeline
+
+from helpers import sample_lines
+
+
+def wait_for(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return cond()
+
+
+def test_reader_blocks_on_full_queue_and_resumes(monkeypatch):
+    monkeypatch.setattr(ingest, 'MAX_BATCH_LINES', 10)
+    lines = sample_lines()[:200]
+    read = []
+
+    def chunks():
+        for i in range(0, len(lines), 10):
+            read.append(i)
+            yield b''.join(l + b'\n' for l in lines[i:i + 10])
+
+    pipeline = IngestPipeline(chunks())
+    pipeline.queue.maxsize = 3
+    pipeline.start()
+    assert wait_for(lambda: pipeline.queue_depth == 3)
+    time.sleep(0.2)
+    assert len(read) < 10 # the reader stopped pulling chunks
+
+    applied = []
+
+    def drained():
+        pipeline.drain(applied.append, budget_ms=50)
+        return sum(len(b.lines) for b in applied) == len(lines)
+
+    assert wait_for(drained)
+    assert [l for b in applied for l in b.lines] == lines
+
+
+def test_cancel_releases_blocked_reader(monkeypatch):
+    monkeypatch.setattr(ingest, 'MAX_BATCH_LINES', 10)
+    data = b'\n'.join(sample_lines()[:200])
+    pipeline = IngestPipeline(iter([data]))
+    pipeline.queue.maxsize = 1
+    pipeline.start()
+    assert wait_for(lambda: pipeline.queue_depth == 1)
+    pipeline.cancel()
+    pipeline._thread.join(2.0)
+    assert not pipeline._thread.is_alive()
+
+
+def test_source_error_reaches_the_log():
+    def chunks():
+        yield b"first line\n"
+        raise OSError("device gone")
+
+    pipeline = IngestPipeline(chunks()).start()
+    pipeline._thread.join(5)
+    applied = []
+    pipeline.drain(applied.append, budget_ms=50)
+    lines = [l for b in applied for l in b.lines]
+    assert lines[0] == b"first line" and b"LOG SOURCE FAILED: OSError: device gone" in lines[-1]
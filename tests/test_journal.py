@@ -0,0 +1,46 @@
+import os
+import time
+
+from journal import SessionJournal, read_info, recover_journal
+from session_file import load_session
+
+from helpers import assert_same_events, parsed_batches, sample_lines, store_of
+
+
+def journal_of(tmp_path, batches):
+    """A journal holding one record per batch, left open the way a crashed run leaves it."""
+    journal = SessionJournal(directory=str(tmp_path / "journal"), flush_interval=0.0).start()
+    for cols, lines in batches:
+        journal.append(cols, lines)
+        deadline = time.monotonic() + 5
+        while (journal.path is None or read_info(journal.path)["lines"] < journal.lines) \
+                and time.monotonic() < deadline:
+            time.sleep(0.005)
+    return journal
+
+
+def test_recover_matches_capture(tmp_path):
+    lines = sample_lines()
+    journal = journal_of(tmp_path, parsed_batches(lines, 300))
+    dest = str(tmp_path / "recovered.tses")
+    assert recover_journal(journal.path, dest) == len(store_of(lines))
+    session = load_session(dest)
+    assert_same_events(session.events, store_of(lines))
+    offsets = session.line_offsets
+    assert bytes(session.line_buf[offsets[0]:offsets[-1]]).splitlines() == lines
+    journal.close(5)
+
+
+def test_recover_stops_at_torn_record(tmp_path):
+    lines = sample_lines()
+    journal = journal_of(tmp_path, parsed_batches(lines, 300))
+    records = read_info(journal.path)
+    with open(journal.path, "r+b") as f:
+        f.truncate(os.path.getsize(journal.path) - 10) # Crash in the middle of the last write
+    kept = read_info(journal.path)["lines"]
+    assert 0 < kept < records["lines"]
+
+    dest = str(tmp_path / "recovered.tses")
+    recover_journal(journal.path, dest)
+    assert_same_events(load_session(dest).events, store_of(lines[:kept]))
+    journal.close(5)
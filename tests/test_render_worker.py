@@ -0,0 +1,100 @@
+import time
+
+import numpy as np
+
+from render_worker import KEYFRAMES, FrameRequest, KeyframeCache, RenderWorker
+
+from helpers import parsed_batches, sample_lines, store_of
+
+
+def test_renders_then_stops():
+    events = store_of(sample_lines())
+    worker = RenderWorker().start()
+    worker.request(FrameRequest(events, len(events) - 1, None, None, None, (1600, 306), (400, 250), 100))
+    deadline = time.monotonic() + 30
+    frame = None
+    while frame is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+        frame, _ = worker.results()
+    assert frame is not None and frame.rgba.shape == (250, 400, 4)
+
+    worker.stop()
+    assert not worker._thread.is_alive()
+
+
+def request(events, seek=True):
+    return FrameRequest(events, len(events) - 1, None, None, None, (1600, 306), (400, 250), 100, seek)
+
+
+def test_keyframes_survive_appends():
+    lines = sample_lines()
+    events = store_of(lines[:400])
+    cache = KeyframeCache()
+    cache.update(request(events), 400 * 250 * 4)
+    n0, interval = len(events), cache.interval
+    while cache.missing() is not None:
+        cache.add(cache.missing(), object())
+    kept = dict(cache.frames)
+
+    # A live batch: same data, more rows. Existing keyframes stay, new slots open past the end
+    for cols, _ in parsed_batches(lines[400:], len(lines) - 400):
+        events.extend(cols)
+    cache.update(request(events, seek=False), 400 * 250 * 4)
+    assert cache.count <= KEYFRAMES
+    step = cache.interval // interval
+    for i, frame in cache.frames.items():
+        assert kept[i * step] is frame
+        assert cache.nearest(i * cache.interval)[1] is frame[0]
+    assert cache.missing() is not None
+
+    # Colours fade by the session length: keyframes from the short session get redrawn eventually
+    while cache.missing() is not None and cache.missing() not in cache.frames:
+        cache.add(cache.missing(), object())
+    stale = cache.missing()
+    assert stale is not None and cache.frames[stale][1] == n0
+
+    # A cleared store is new data: nothing carries over
+    events.clear()
+    events.extend(next(parsed_batches(lines[:100], 100))[0])
+    cache.update(request(events), 400 * 250 * 4)
+    assert cache.frames == {}
+
+
+def test_keyframes_dropped_when_legend_grows():
+    lines = sample_lines()
+    events = store_of(lines[:400])
+    worker = RenderWorker()
+    worker._render(request(events))
+    while worker.keyframes.missing() is not None:
+        worker._render_keyframe(worker.keyframes.missing())
+    assert worker.keyframes.nearest(len(events)) is not None
+
+    # A third finger adds a legend entry and re-lays out the axes: the old bitmaps no longer line up
+    cols = next(parsed_batches(lines[400:410], 10))[0]
+    cols['x'][2], cols['y'][2] = cols['x'][0], cols['y'][0]
+    cols['pointer_mask'] |= 1 << 2
+    events.extend(cols)
+    layout = worker.renderer.layout_generation
+    worker._render(request(events))
+    assert worker.renderer.layout_generation > layout
+    assert worker.keyframes.frames == {} and worker.keyframes.nearest(len(events)) is None
+
+
+def test_appends_draw_over_the_last_frame():
+    lines = sample_lines()
+    events = store_of(lines[:1000])
+    worker = RenderWorker()
+    # The first frame is drawn in full, the second builds the background and keeps its moves
+    worker._render(request(events, seek=False))
+    worker._render(request(events, seek=False))
+    n = len(events)
+    for cols, _ in parsed_batches(lines[1000:1010], 10):
+        events.extend(cols)
+    frame = worker._render(request(events, seek=False))
+    assert worker._moves[2] == len(events) and worker._moves[3] == n # Drawn onto the moves of n events
+
+    reference = RenderWorker()
+    reference._prepare(request(events, seek=False))
+    reference.canvas.draw()
+    full = np.array(reference.canvas.buffer_rgba())
+    assert (np.abs(frame.rgba.astype(int) - full.astype(int)).max(axis=2) > 16).mean() < 0.005
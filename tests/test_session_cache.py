@@ -0,0 +1,54 @@
+import os
+import time
+
+from bulk_import import ParallelImport
+from event_store import EventStore
+from log_view import LineStore
+from session_cache import SessionCache
+
+from helpers import ROOT, assert_same_events, sample_lines, store_of
+
+LOG = os.path.join(ROOT, 'input_two_touch_new.txt')
+
+
+def imported(importer):
+    """(events, batches) once a ParallelImport has finished and its queue is drained."""
+    events, batches = EventStore(), []
+    deadline = time.monotonic() + 60
+    while not (importer.finished and not importer.queue_depth) and time.monotonic() < deadline:
+        importer.drain(batches.append, budget_ms=50)
+        time.sleep(0.005)
+    importer.drain(batches.append, budget_ms=50)
+    for batch in batches:
+        events.extend(batch.columns)
+    return events, batches
+
+
+def test_snapshot_survives_appends():
+    lines = LineStore()
+    lines.extend(sample_lines()[:100])
+    buf, offsets = lines.snapshot()
+    before = bytes(buf)
+    lines.extend(sample_lines()[100:]) # Would be a BufferError if it grew the exported buffer
+    assert bytes(buf) == before and len(offsets) == 101
+    assert lines.get(100) == sample_lines()[100].decode()
+    assert lines.get(0) == sample_lines()[0].decode()
+
+
+def test_background_import_uses_cache(tmp_path):
+    cache = SessionCache(directory=str(tmp_path), max_bytes=1 << 30)
+    first = ParallelImport(LOG, workers=1, cache=cache).start()
+    events, batches = imported(first)
+    assert first.cached is None and len(events) == len(store_of(sample_lines()))
+
+    lines = LineStore()
+    for batch in batches:
+        lines.extend(batch.lines)
+    cache.put(LOG, events, *lines.raw())
+
+    second = ParallelImport(LOG, workers=1, cache=cache).start()
+    _, queued = imported(second)
+    assert second.cached is not None and not queued
+    assert_same_events(second.cached.events, events)
+    offsets = second.cached.line_offsets
+    assert bytes(second.cached.line_buf[offsets[0]:offsets[-1]]).splitlines() == sample_lines()
@@ -0,0 +1,40 @@
+import numpy as np
+
+from event_store import EventStore, MAX_POINTERS
+from log_view import LineStore
+from session_file import load_session, read_header, save_session
+
+from helpers import assert_same_events, sample_lines, store_of
+
+
+def saved(tmp_path, events, lines=()):
+    store = LineStore()
+    store.extend(list(lines))
+    path = str(tmp_path / "session.tses")
+    save_session(path, events, *store.raw())
+    return path
+
+
+def test_stores_only_used_pointer_rows(tmp_path):
+    lines = sample_lines()
+    events = store_of(lines)
+    assert events.pointers_used() == [0, 1]
+    path = saved(tmp_path, events, lines)
+
+    header = read_header(path)
+    assert header["pointers"] == 2 and header["max_pointers"] == MAX_POINTERS
+    assert header["arrays"]["x"]["shape"] == [2, len(events)]
+
+    loaded = load_session(path).events
+    assert_same_events(loaded, events)
+    assert loaded.column('x').shape == (MAX_POINTERS, len(events))
+    assert np.isnan(loaded.x(MAX_POINTERS - 1)).all()
+    loaded.extend({name: events.column(name)[..., :5] for name in ('action', 'x', 'y', 'pointer_mask')})
+    assert len(loaded) == len(events) + 5
+
+
+def test_empty_session(tmp_path):
+    path = saved(tmp_path, EventStore())
+    assert read_header(path)["pointers"] == 0
+    loaded = load_session(path).events
+    assert len(loaded) == 0 and loaded.column('x').shape == (MAX_POINTERS, 0)
@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from sources import AdbLogcatSource
+from tailer import PipeTailer
+
+from helpers import ROOT
+
+FAKE_LOGCAT = [sys.executable, os.path.join(ROOT, 'benchmarks', 'fake_logcat.py'), '--out', '-',
+               '--rate', '1000000', '--lines', '1074']
+
+
+def expected():
+    with open(os.path.join(ROOT, 'input_two_touch_new.txt'), 'rb') as f:
+        return f.read()
+
+
+def test_adb_source_reads_child_stdout():
+    source = AdbLogcatSource()
+    source.command = lambda: FAKE_LOGCAT
+    want = expected()
+    data = b''
+    try:
+        for chunk in source:
+            assert isinstance(chunk, bytes)
+            data += chunk
+            if len(data) >= len(want):
+                break
+    finally:
+        source.stop()
+    assert data[:len(want)] == want
+
+
+@pytest.mark.parametrize("bufsize", [-1, 0])
+def test_blocking_read_on_pipe(bufsize):
+    # The path PipeTailer takes on Windows, with a buffered and a raw (bufsize=0) pipe
+    proc = subprocess.Popen(FAKE_LOGCAT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=bufsize)
+    try:
+        data = b''.join(PipeTailer(proc.stdout, chunk_size=4096)._blocking())
+    finally:
+        proc.stdout.close()
+        proc.wait(10)
+    assert data == expected()
+
+
+def test_pipe_tailer_on_redirected_file():
+    # `py log_parser.py < log.txt`: stdin is a regular file, which epoll won't register
+    with open(os.path.join(ROOT, 'input_two_touch_new.txt'), 'rb') as f:
+        data = b''.join(PipeTailer(f, chunk_size=4096))
+    assert data == expected()
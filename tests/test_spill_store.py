@@ -0,0 +1,33 @@
+import numpy as np
+
+from log_view import LineStore
+from spill_store import SpillArchive, spill
+
+from helpers import assert_same_events, sample_lines, store_of
+
+
+def test_load_window_across_segments(tmp_path):
+    lines = sample_lines()
+    whole = store_of(lines)
+    events = store_of(lines)
+    store = LineStore()
+    store.extend(lines)
+    archive = SpillArchive(directory=str(tmp_path))
+    try:
+        for _ in range(3):
+            events, cut = spill(events, store, archive, 200)
+            store.drop_head(cut)
+        assert len(archive) == 600 and events.base == 600
+
+        loaded, line_buf, line_offsets, first_line = archive.load(150, 450)
+        assert loaded.base == 150
+        assert_same_events(loaded, whole.slice(150, 450))
+
+        # Each event still points at its own raw line
+        for i in (0, 57, 299):
+            line = int(loaded.column('log_line')[i]) - first_line
+            text = bytes(line_buf[line_offsets[line]:line_offsets[line + 1]]).rstrip(b'\n')
+            assert text == lines[int(whole.column('log_line')[150 + i])]
+        assert np.array_equal(loaded.column('log_line'), whole.column('log_line')[150:450])
+    finally:
+        archive.clear()
@@ -0,0 +1,45 @@
+import os
+import sys
+
+import numpy as np
+
+from event_store import EventStore
+from stroke_index import StrokeIndex
+
+from helpers import ROOT, parsed_batches, sample_lines
+
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+from gen_motion_log import generate
+
+
+def synced(lines, batch):
+    """StrokeIndex after feeding the parsed lines `batch` at a time, syncing after each batch."""
+    store, strokes = EventStore(), StrokeIndex()
+    for cols, _ in parsed_batches(lines, batch):
+        store.extend(cols)
+        strokes.sync(store)
+    return strokes
+
+
+def assert_same_strokes(a, b):
+    assert len(a) == len(b)
+    assert np.array_equal(a.event_stroke[:a._indexed], b.event_stroke[:b._indexed])
+    for name in ('pointer', 'start', 'end', 'samples'):
+        assert np.array_equal(a.strokes[name], b.strokes[name])
+    assert np.allclose(a.strokes['length'], b.strokes['length'])
+
+
+def test_two_touch_incremental_matches_one_shot():
+    lines = sample_lines()
+    whole = synced(lines, len(lines))
+    assert len(whole) > 0
+    for batch in (1, 7, 53, 300):
+        assert_same_strokes(synced(lines, batch), whole)
+
+
+def test_many_pointers_incremental_matches_one_shot():
+    lines = [l.rstrip('\n').encode() for l in generate(pointers=4, lines=3000, seed=3)]
+    whole = synced(lines, len(lines))
+    for batch in (13, 211):
+        assert_same_strokes(synced(lines, batch), whole)
+
@@ -0,0 +1,97 @@
+import os
+import queue
+import threading
+
+from tailer import FileTailer, TailReset
+
+
+class Follower:
+    """Runs a FileTailer on a thread and hands its items back through a queue."""
+
+    def __init__(self, path):
+        self.tailer = FileTailer(path, from_end=False, min_wait=0.001, max_wait=0.01)
+        self.tailer.HEAD_CHECK_EVERY = 0.0
+        self.items = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        for item in self.tailer:
+            self.items.put(item)
+
+    def read(self, size):
+        """Bytes yielded until `size` of them have arrived; fails on a TailReset."""
+        data = b''
+        while len(data) < size:
+            item = self.items.get(timeout=5)
+            assert not isinstance(item, TailReset), item
+            data += item
+        return data
+
+    def reset(self):
+        item = self.items.get(timeout=5)
+        while not isinstance(item, TailReset):
+            item = self.items.get(timeout=5)
+        return item
+
+    def close(self):
+        self.tailer.stop()
+        self.thread.join(5)
+
+
+def write(path, data, mode="wb"):
+    with open(path, mode) as f:
+        f.write(data)
+
+
+def test_follows_appends(tmp_path):
+    path = tmp_path / "live_data.txt"
+    write(path, b"one\n")
+    follower = Follower(str(path))
+    try:
+        assert follower.read(4) == b"one\n"
+        write(path, b"two\n", "ab")
+        assert follower.read(4) == b"two\n"
+    finally:
+        follower.close()
+
+
+def test_truncated(tmp_path):
+    path = tmp_path / "live_data.txt"
+    write(path, b"old line\n" * 10)
+    follower = Follower(str(path))
+    try:
+        assert follower.read(90) == b"old line\n" * 10
+        write(path, b"new\n")
+        assert follower.reset().reason == "truncated"
+        assert follower.read(4) == b"new\n"
+    finally:
+        follower.close()
+
+
+def test_rewritten_with_same_size(tmp_path):
+    path = tmp_path / "live_data.txt"
+    write(path, b"A" * 99 + b"\n")
+    follower = Follower(str(path))
+    try:
+        assert follower.read(100) == b"A" * 99 + b"\n"
+        write(path, b"B" * 99 + b"\n", "r+b") # same inode, same size, different head
+        assert follower.reset().reason == "truncated"
+        assert follower.read(100) == b"B" * 99 + b"\n"
+    finally:
+        follower.close()
+
+
+def test_replaced(tmp_path):
+    path = tmp_path / "live_data.txt"
+    write(path, b"first file\n")
+    follower = Follower(str(path))
+    try:
+        assert follower.read(11) == b"first file\n"
+        other = tmp_path / "next.txt"
+        write(other, b"first file\nsecond file\n") # same head, new inode
+        os.replace(other, path)
+        assert follower.reset().reason == "replaced"
+        assert follower.read(23) == b"first file\nsecond file\n"
+    finally:
+        follower.close()
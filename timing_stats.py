@@ -0,0 +1,169 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from event_store import ACTION_DOWN, ACTION_POINTER_DOWN, mask_pointers
+
+# Intervals longer than this are pauses between gestures, not reports
+MAX_INTERVAL_MS = 250.0
+RATE_BINS = np.arange(0, 505, 5)         # Hz
+LATENCY_BINS = np.arange(0, 1005, 5)     # ms
+PERCENTILES = (50, 95, 99)
+
+# A median logcat->PC delay beyond this means pc_time is an import time, not an arrival time
+STALE_MS = 60_000.0
+
+
+class _Growable:
+    def __init__(self, dtype, capacity=4096):
+        self.data = np.empty(capacity, dtype=dtype)
+        self.size = 0
+
+    def extend(self, values):
+        n = len(values)
+        if self.size + n > len(self.data):
+            cap = len(self.data)
+            while cap < self.size + n:
+                cap *= 2
+            self.data = np.resize(self.data, cap)
+        self.data[self.size:self.size + n] = values
+        self.size += n
+
+    def view(self):
+        return self.data[:self.size]
+
+
+def _describe(values):
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return None
+    p = np.percentile(values, PERCENTILES)
+    out = {"count": int(len(values)), "mean": float(values.mean()), "std": float(values.std()),
+           "min": float(values.min()), "max": float(values.max())}
+    out.update({f"p{q}": float(v) for q, v in zip(PERCENTILES, p)})
+    return out
+
+
+class TimingStats:
+    """Report-timing analytics over an EventStore, kept up to date incrementally.
+
+    sync() only looks at new events: per pointer it appends the device
+    eventTime gaps between consecutive reports (skipping a finger's first
+    report and pauses over MAX_INTERVAL_MS). Latencies are per-event
+    differences of existing columns, so summary() reads them straight from
+    the store:
+
+      device->logcat  log_time - eventTime, relative to the smallest value
+                      seen (the device uptime clock has no absolute origin,
+                      so this measures delay on top of the fastest report)
+      logcat->PC      pc_time - log_time (assumes device and PC clocks agree)
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._store = None
+        self._indexed = 0
+        self._last = {}       # pointer -> eventTime of its previous report
+        self.intervals = {}   # pointer -> _Growable of ms
+        self.interval_events = {}  # pointer -> _Growable of the timestamp_order ending each interval
+
+    def sync(self, store):
+        if store is not self._store or len(store) < self._indexed:
+            self.clear()
+            self._store = store
+        start, stop = self._indexed, len(store)
+        if stop <= start:
+            return
+        event_time = store.column('eventTime', stop)[start:].astype(np.float64)
+        action = store.column('action', stop)[start:]
+        index = store.column('action_index', stop)[start:]
+        for p in mask_pointers(np.bitwise_or.reduce(store.column('pointer_mask', stop)[start:])):
+            present = np.flatnonzero(~np.isnan(store.x(p, stop)[start:]))
+            if not len(present):
+                continue
+            times = event_time[present]
+            prev = np.concatenate(([self._last.get(p, np.nan)], times[:-1]))
+            gaps = times - prev
+            # A finger's DOWN starts a new run of reports rather than continuing one
+            first = (action[present] == ACTION_DOWN) | ((action[present] == ACTION_POINTER_DOWN) & (index[present] == p))
+            keep = ~first & (gaps >= 0) & (gaps <= MAX_INTERVAL_MS)
+            if p not in self.intervals:
+                self.intervals[p] = _Growable(np.float64)
+                self.interval_events[p] = _Growable(np.int64)
+            self.intervals[p].extend(gaps[keep])
+            self.interval_events[p].extend(present[keep] + start)
+            self._last[p] = times[-1]
+        self._indexed = stop
+
+    # --- RESULTS ---
+    def latencies(self):
+        """Per-event (device->logcat, logcat->PC) latency arrays in ms (NaN where unknown)."""
+        store = self._store
+        if store is None or not len(store):
+            return np.empty(0), np.empty(0)
+        log_ms = store.column('log_time') * 1000.0
+        dev = log_ms - store.column('eventTime')
+        if np.isfinite(dev).any():
+            dev = dev - np.nanmin(dev)
+        pc = store.column('pc_time') * 1000.0 - log_ms
+        if np.isfinite(pc).any() and np.nanmedian(pc) > STALE_MS:
+            pc = np.full(len(pc), np.nan) # Imported, not captured live: arrival time says nothing
+        return dev, pc
+
+    def summary(self):
+        """Nested dict of interval, report-rate, jitter and latency statistics."""
+        result = {"events": self._indexed, "pointers": {}, "latency_ms": {}}
+        for p, grow in sorted(self.intervals.items()):
+            iv = grow.view()
+            stats = _describe(iv)
+            if stats is None:
+                continue
+            rates = 1000.0 / iv[iv > 0]
+            result["pointers"][p] = {
+                "interval_ms": stats,
+                "rate_hz": float(1000.0 / stats["mean"]) if stats["mean"] else None,
+                # Jitter: spread of the intervals, and how much consecutive intervals differ
+                "jitter_ms": stats["std"],
+                "jitter_successive_ms": float(np.abs(np.diff(iv)).mean()) if len(iv) > 1 else 0.0,
+                "rate_histogram": np.histogram(rates, bins=RATE_BINS)[0].tolist(),
+            }
+        dev, pc = self.latencies()
+        for name, values in (("device_to_logcat", dev), ("logcat_to_pc", pc)):
+            stats = _describe(values)
+            if stats is not None:
+                stats["histogram"] = np.histogram(values[~np.isnan(values)], bins=LATENCY_BINS)[0].tolist()
+            result["latency_ms"][name] = stats
+        return result
+
+    def to_frame(self):
+        """One row per report interval, with the event's latencies alongside."""
+        dev, pc = self.latencies()
+        frames = []
+        for p, grow in sorted(self.intervals.items()):
+            events = self.interval_events[p].view()
+            frames.append(pd.DataFrame({
+                "pointer": p,
+                "timestamp_order": events,
+                "eventTime": self._store.column('eventTime')[events],
+                "interval_ms": grow.view(),
+                "device_to_logcat_ms": dev[events],
+                "logcat_to_pc_ms": pc[events],
+            }))
+        if not frames:
+            return pd.DataFrame(columns=["pointer", "timestamp_order", "eventTime", "interval_ms",
+                                         "device_to_logcat_ms", "logcat_to_pc_ms"])
+        return pd.concat(frames, ignore_index=True).sort_values("timestamp_order", kind="stable")
+
+    def export(self, csv_path):
+        """Writes the per-interval CSV and a .json summary next to it."""
+        self.to_frame().to_csv(csv_path, index=False)
+        json_path = csv_path.rsplit('.', 1)[0] + ".json"
+        summary = self.summary()
+        summary["rate_bins_hz"] = RATE_BINS.tolist()
+        summary["latency_bins_ms"] = LATENCY_BINS.tolist()
+        with open(json_path, "w") as f:
+            json.dump(summary, f, indent=2)
+        return json_path